@@ -110,6 +110,7 @@ def deploy_bridge(
         aergo.disconnect()
         return
     aergo_bridge = result.contract_address
+    aergo_deploy_height = result.block_no
 
     print("------ Deploy Ethereum SC -----------")
     receipt = deploy_contract(
@@ -126,6 +127,11 @@ def deploy_bridge(
         ['addr']) = eth_bridge
     (config_data['networks'][aergo_net]['bridges'][eth_net]
         ['addr']) = aergo_bridge
+    # bridge events are scanned from the deployment height
+    (config_data['networks'][eth_net]['bridges'][aergo_net]
+        ['deploy_height']) = receipt.blockNumber
+    (config_data['networks'][aergo_net]['bridges'][eth_net]
+        ['deploy_height']) = aergo_deploy_height
 
     with open(config_path, "w") as f:
         json.dump(config_data, f, indent=4, sort_keys=True)
@@ -0,0 +1,171 @@
+import json
+import logging
+import os
+import threading
+import time
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Set,
+)
+
+from ethaergo_bridge_operator.op_utils import (
+    load_config_data,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class FrozenDict(dict):
+    """ Read-only dict used for config snapshots """
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("Config snapshots are read-only")
+
+    __setitem__ = __delitem__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+
+class FrozenList(list):
+    """ Read-only list used for config snapshots """
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("Config snapshots are read-only")
+
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _readonly
+    append = extend = insert = pop = remove = _readonly
+    clear = reverse = sort = _readonly
+
+
+def freeze(value: Any) -> Any:
+    """ Recursively make a parsed json value read-only. Frozen values still
+    compare equal to the original dicts and lists.
+    """
+    if isinstance(value, dict):
+        return FrozenDict((k, freeze(v)) for k, v in value.items())
+    if isinstance(value, list):
+        return FrozenList(freeze(v) for v in value)
+    return value
+
+
+def changed_keys(old: Any, new: Any, prefix: str = '') -> Set[str]:
+    """ Dotted paths of the config keys that differ between old and new """
+    if not isinstance(old, dict) or not isinstance(new, dict):
+        if old != new:
+            return {prefix}
+        return set()
+    changed: Set[str] = set()
+    for key in set(old) | set(new):
+        path = prefix + '.' + key if prefix else key
+        if key not in old or key not in new:
+            changed.add(path)
+        else:
+            changed |= changed_keys(old[key], new[key], path)
+    return changed
+
+
+Subscriber = Callable[[FrozenDict, Set[str]], None]
+
+
+class ConfigWatcher():
+    """ Parses the config file once and reloads it only when its
+    modification time changes.
+    Readers get immutable snapshots, subscribers are notified with the new
+    snapshot and the dotted paths of the keys that changed.
+
+    """
+
+    def __init__(
+        self,
+        config_file_path: str,
+        check_interval: float = 1,
+    ) -> None:
+        self.config_file_path = config_file_path
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._subscribers: List[Subscriber] = []
+        self._mtime = os.stat(config_file_path).st_mtime_ns
+        self._snapshot = freeze(load_config_data(config_file_path))
+        self._last_check = time.monotonic()
+        self._thread: Optional[threading.Thread] = None
+
+    def snapshot(self) -> FrozenDict:
+        """ Current config, the file's mtime is checked at most once every
+        check_interval seconds.
+        """
+        if time.monotonic() - self._last_check >= self.check_interval:
+            self.reload()
+        return self._snapshot
+
+    def reload(self) -> Set[str]:
+        """ Reload the config file if it changed and notify subscribers.
+        Return the changed keys.
+        """
+        with self._lock:
+            self._last_check = time.monotonic()
+            mtime = os.stat(self.config_file_path).st_mtime_ns
+            if mtime == self._mtime:
+                return set()
+            try:
+                config_data = freeze(load_config_data(self.config_file_path))
+            except json.JSONDecodeError:
+                # the file is being written, retry on next check
+                logger.warning(
+                    "\"Failed to parse %s, keeping previous config\"",
+                    self.config_file_path
+                )
+                return set()
+            changed = changed_keys(self._snapshot, config_data)
+            self._mtime = mtime
+            self._snapshot = config_data
+            subscribers = list(self._subscribers)
+        if changed:
+            for callback in subscribers:
+                try:
+                    callback(config_data, changed)
+                except Exception:
+                    logger.exception("\"Config subscriber failed\"")
+        return changed
+
+    def subscribe(self, callback: Subscriber) -> None:
+        with self._lock:
+            self._subscribers.append(callback)
+
+    def unsubscribe(self, callback: Subscriber) -> None:
+        with self._lock:
+            self._subscribers.remove(callback)
+
+    def start(self) -> None:
+        """ Poll the config file in the background so that subscribers are
+        notified even when nobody reads a snapshot.
+        """
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(
+                target=self._poll, name="ConfigWatcher", daemon=True)
+        self._thread.start()
+
+    def _poll(self) -> None:
+        while True:
+            time.sleep(self.check_interval)
+            try:
+                self.reload()
+            except OSError:
+                logger.exception("\"Failed to stat config file\"")
+
+
+_watchers: Dict[str, ConfigWatcher] = {}
+_watchers_lock = threading.Lock()
+
+
+def get_config_watcher(config_file_path: str) -> ConfigWatcher:
+    """ Config watcher shared by all components using the same file """
+    path = os.path.abspath(config_file_path)
+    with _watchers_lock:
+        if path not in _watchers:
+            _watchers[path] = ConfigWatcher(path)
+        return _watchers[path]
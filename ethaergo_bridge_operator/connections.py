@@ -0,0 +1,235 @@
+import threading
+from typing import (
+    Any,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+)
+
+import aergo.herapy as herapy
+from aergo.herapy.account import (
+    Account,
+)
+from aergo.herapy.obj.transaction import (
+    Transaction,
+)
+from aergo.herapy.obj.tx_result import (
+    TxResult,
+)
+from eth_account.signers.local import (
+    LocalAccount,
+)
+import grpc
+from hexbytes import (
+    HexBytes,
+)
+from web3 import (
+    Web3,
+)
+from web3.exceptions import (
+    TimeExhausted,
+)
+from web3.middleware import (
+    geth_poa_middleware,
+)
+
+from ethaergo_bridge_operator.proposer.block_scheduler import (
+    AergoBlockScheduler,
+)
+
+
+class EthAccountSigner():
+    """ Ethereum account used by all the proposers of a process on one
+    network. Transactions are signed and sent one at a time with a locally
+    managed nonce, so proposers of several bridges anchoring at the same
+    time don't use the same nonce.
+    After a receipt timeout, the next tx reuses the first nonce not mined so
+    it replaces the stuck tx (or fails as underpriced so the sender can
+    raise its gas price).
+    """
+
+    def __init__(self, web3: Web3, account: LocalAccount) -> None:
+        self.web3 = web3
+        self.account = account
+        self.address = account.address
+        self._lock = threading.Lock()
+        self._nonce: Optional[int] = None
+        self._replace_stuck = False
+
+    def send(self, tx: Dict[str, Any]) -> HexBytes:
+        """ Sign tx with the next nonce of the account and broadcast it """
+        with self._lock:
+            if self._replace_stuck:
+                nonce = self.web3.eth.getTransactionCount(
+                    self.address, 'latest')
+            else:
+                nonce = self.web3.eth.getTransactionCount(
+                    self.address, 'pending')
+                if self._nonce is not None:
+                    # the node may not list our last txs as pending yet
+                    nonce = max(nonce, self._nonce)
+            signed = self.account.sign_transaction(dict(tx, nonce=nonce))
+            try:
+                tx_hash = self.web3.eth.sendRawTransaction(
+                    signed.rawTransaction)
+            except Exception:
+                self._nonce = None
+                raise
+            self._replace_stuck = False
+            self._nonce = nonce + 1
+            return tx_hash
+
+    def wait_receipt(self, tx_hash: HexBytes, timeout: int = 300) -> Any:
+        """ Wait for the receipt of a tx sent by this signer. Raise
+        web3.exceptions.TimeExhausted if the tx is not mined in time: the
+        next tx sent will then replace it.
+        """
+        try:
+            return self.web3.eth.waitForTransactionReceipt(
+                tx_hash, timeout=timeout, poll_latency=1)
+        except TimeExhausted:
+            with self._lock:
+                self._nonce = None
+                self._replace_stuck = True
+            raise
+
+
+class AergoAccountSigner():
+    """ Aergo account used by all the proposers of a process on one network.
+    Contract calls are signed and sent one at a time, the nonce of txs still
+    in the mempool is kept locally so proposers of several bridges anchoring
+    at the same time don't use the same nonce.
+    """
+
+    def __init__(self, hera: herapy.Aergo) -> None:
+        self.hera = hera
+        self._lock = threading.Lock()
+
+    def call_sc(
+        self,
+        sc_address: str,
+        func_name: str,
+        args: List[Any],
+    ) -> Tuple[Transaction, TxResult]:
+        with self._lock:
+            local_nonce = self.hera.account.nonce
+            self.hera.get_account()
+            # herapy increments the local nonce of txs accepted in the mempool
+            self.hera.account.nonce = max(self.hera.account.nonce, local_nonce)
+            tx, result = self.hera.call_sc(sc_address, func_name, args=args)
+            if result.status in (herapy.CommitStatus.TX_NONCE_TOO_LOW,
+                                 herapy.CommitStatus.TX_HAS_SAME_NONCE):
+                # the account was used by another process: retry with the
+                # nonce on chain
+                self.hera.get_account()
+                tx, result = self.hera.call_sc(
+                    sc_address, func_name, args=args)
+            return tx, result
+
+
+class ProviderPool():
+    """ Provider connections and validator channels shared by the proposers
+    of a process, so that anchoring several bridge pairs doesn't open one
+    connection per pair to the same node or validator.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._aergo: Dict[str, herapy.Aergo] = {}
+        self._aergo_blocks: Dict[str, AergoBlockScheduler] = {}
+        self._web3: Dict[str, Web3] = {}
+        self._channels: Dict[str, grpc.Channel] = {}
+        # keystores are decrypted once per process
+        self._eth_accounts: Dict[str, LocalAccount] = {}
+        self._aergo_keys: Dict[str, bytes] = {}
+        self._eth_signers: Dict[Tuple[str, str], EthAccountSigner] = {}
+        self._aergo_signers: Dict[Tuple[str, str], AergoAccountSigner] = {}
+
+    def aergo(self, ip: str) -> herapy.Aergo:
+        """ Aergo connection for reading state (no account imported) """
+        with self._lock:
+            if ip not in self._aergo:
+                hera = herapy.Aergo()
+                hera.connect(ip)
+                self._aergo[ip] = hera
+            return self._aergo[ip]
+
+    def aergo_blocks(self, ip: str) -> AergoBlockScheduler:
+        """ Aergo new block scheduler following the node at ip """
+        hera = self.aergo(ip)
+        with self._lock:
+            if ip not in self._aergo_blocks:
+                self._aergo_blocks[ip] = AergoBlockScheduler(hera)
+            return self._aergo_blocks[ip]
+
+    def web3(self, ip: str, is_poa: bool) -> Web3:
+        with self._lock:
+            if ip not in self._web3:
+                w3 = Web3(Web3.HTTPProvider(ip))
+                if is_poa:
+                    w3.middleware_onion.inject(geth_poa_middleware, layer=0)
+                assert w3.isConnected()
+                self._web3[ip] = w3
+            return self._web3[ip]
+
+    def validator_channel(self, ip: str) -> grpc.Channel:
+        with self._lock:
+            if ip not in self._channels:
+                self._channels[ip] = grpc.insecure_channel(ip)
+            return self._channels[ip]
+
+    def eth_signer(
+        self,
+        ip: str,
+        is_poa: bool,
+        keystore: str,
+        privkey_pwd: str = None,
+    ) -> Optional[EthAccountSigner]:
+        """ Signer of the keystore account on the Ethereum network at ip.
+        The keystore is decrypted with privkey_pwd the first time (ValueError
+        if the password is wrong), return None if it wasn't decrypted yet and
+        privkey_pwd is None.
+        """
+        w3 = self.web3(ip, is_poa)
+        with self._lock:
+            if (ip, keystore) not in self._eth_signers:
+                account = self._eth_accounts.get(keystore)
+                if account is None:
+                    if privkey_pwd is None:
+                        return None
+                    privkey = w3.eth.account.decrypt(keystore, privkey_pwd)
+                    account = w3.eth.account.from_key(privkey)
+                    self._eth_accounts[keystore] = account
+                self._eth_signers[(ip, keystore)] = EthAccountSigner(
+                    w3, account)
+            return self._eth_signers[(ip, keystore)]
+
+    def aergo_signer(
+        self,
+        ip: str,
+        keystore: str,
+        privkey_pwd: str = None,
+    ) -> Optional[AergoAccountSigner]:
+        """ Signer of the keystore account on the Aergo network at ip.
+        The keystore is decrypted with privkey_pwd the first time
+        (HeraException if the password is wrong), return None if it wasn't
+        decrypted yet and privkey_pwd is None.
+        """
+        with self._lock:
+            if (ip, keystore) not in self._aergo_signers:
+                private_key = self._aergo_keys.get(keystore)
+                if private_key is None:
+                    if privkey_pwd is None:
+                        return None
+                    account = Account.decrypt_from_keystore(
+                        keystore, privkey_pwd)
+                    private_key = bytes(account.private_key)
+                    self._aergo_keys[keystore] = private_key
+                # the account is imported in a dedicated connection so the
+                # shared one stays read only
+                hera = herapy.Aergo()
+                hera.connect(ip)
+                hera.new_account(private_key=private_key)
+                self._aergo_signers[(ip, keystore)] = AergoAccountSigner(hera)
+            return self._aergo_signers[(ip, keystore)]
@@ -0,0 +1,177 @@
+from bisect import (
+    bisect_left,
+)
+from concurrent import (
+    futures,
+)
+from eth_utils import (
+    event_abi_to_log_topic,
+)
+import json
+import logging
+import os
+import threading
+from typing import (
+    Callable,
+    List,
+    Optional,
+    Tuple,
+)
+
+import aergo.herapy as herapy
+from web3.contract import (
+    Contract,
+)
+
+logger = logging.getLogger(__name__)
+
+# max block range of event queries (hera.get_events limit)
+EVENTS_CHUNK = 10000
+
+# fetch_heights(start, end) returns the heights of the events in
+# [start, end], end - start < EVENTS_CHUNK
+HeightsFetcher = Callable[[int, int], List[int]]
+
+AERGO_DEPOSIT_EVENTS = {"lock", "burn", "freeze"}
+ETH_DEPOSIT_EVENTS = ["lockEvent", "burnEvent"]
+
+
+def checkpoint_file(
+    directory: Optional[str],
+    network: str,
+    bridge: str,
+) -> Optional[str]:
+    """ Path of the checkpoint of the deposit events of bridge on network,
+    None if checkpoints are not saved.
+    """
+    if directory is None:
+        return None
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, "{}-{}.json".format(network, bridge))
+
+
+def aergo_deposit_heights(hera: herapy.Aergo, bridge: str) -> HeightsFetcher:
+    """ Fetcher of lock, burn and freeze event heights of an Aergo bridge """
+    def fetch_heights(start: int, end: int) -> List[int]:
+        # an empty event name queries all the events of the bridge at once
+        events = hera.get_events(
+            bridge, "", start_block_no=start, end_block_no=end)
+        return [event.block_height for event in events
+                if event.name in AERGO_DEPOSIT_EVENTS]
+    return fetch_heights
+
+
+def eth_deposit_heights(bridge: Contract) -> HeightsFetcher:
+    """ Fetcher of lock and burn event heights of an Ethereum bridge """
+    # logs matching any of the deposit topics are queried at once
+    topics = [
+        event_abi_to_log_topic(
+            getattr(bridge.events, name)._get_event_abi()).hex()
+        for name in ETH_DEPOSIT_EVENTS
+    ]
+
+    def fetch_heights(start: int, end: int) -> List[int]:
+        logs = bridge.web3.eth.getLogs({
+            'address': bridge.address,
+            'fromBlock': start,
+            'toBlock': end,
+            'topics': [topics],
+        })
+        return [log['blockNumber'] for log in logs]
+    return fetch_heights
+
+
+class DepositEventIndex():
+    """ Sorted heights of the deposit events of a bridge contract in the
+    range of blocks (first, last) already fetched.
+
+    Queried ranges are only fetched once: has_deposits fetches the blocks
+    outside the indexed range and answers with a binary search. Ranges
+    larger than EVENTS_CHUNK are fetched in chunks by max_workers threads.
+    If a checkpoint file is given, the indexed range and heights are saved
+    after each update so that restarting a proposer doesn't fetch them
+    again.
+    """
+
+    def __init__(
+        self,
+        fetch_heights: HeightsFetcher,
+        checkpoint_file: str = None,
+        max_workers: int = 4,
+    ) -> None:
+        self.fetch_heights = fetch_heights
+        self.max_workers = max_workers
+        self.checkpoint_file = checkpoint_file
+        self._lock = threading.Lock()
+        self.indexed: Optional[Tuple[int, int]] = None
+        self.heights: List[int] = []
+        if checkpoint_file is not None and os.path.exists(checkpoint_file):
+            with open(checkpoint_file, 'r') as f:
+                checkpoint = json.load(f)
+            self.indexed = (checkpoint['first'], checkpoint['last'])
+            self.heights = sorted(checkpoint['heights'])
+            logger.info(
+                "\"Loaded deposit events checkpoint at block %s\"",
+                checkpoint['last']
+            )
+
+    def _fetch(self, start: int, end: int) -> None:
+        chunks = [
+            (chunk_start, min(chunk_start + EVENTS_CHUNK - 1, end))
+            for chunk_start in range(start, end + 1, EVENTS_CHUNK)
+        ]
+        if len(chunks) == 1:
+            heights = self.fetch_heights(start, end)
+        else:
+            heights = []
+            with futures.ThreadPoolExecutor(
+                    max_workers=self.max_workers) as executor:
+                for chunk_heights in executor.map(
+                        lambda chunk: self.fetch_heights(*chunk), chunks):
+                    heights.extend(chunk_heights)
+        self.heights = sorted(self.heights + heights)
+
+    def _save(self) -> None:
+        if self.checkpoint_file is None or self.indexed is None:
+            return
+        first, last = self.indexed
+        tmp_file = self.checkpoint_file + '.tmp'
+        with open(tmp_file, 'w') as f:
+            json.dump({'first': first, 'last': last,
+                       'heights': self.heights}, f)
+        os.replace(tmp_file, self.checkpoint_file)
+
+    def update(self, start: int, end: int) -> None:
+        """ Fetch the deposit events of [start, end] not indexed yet """
+        with self._lock:
+            if self.indexed is None or start > self.indexed[1] + 1:
+                # discontinuous ranges are not indexed
+                self.heights = []
+                self._fetch(start, end)
+                self.indexed = (start, end)
+            else:
+                first, last = self.indexed
+                if start < first:
+                    self._fetch(start, first - 1)
+                    first = start
+                if end > last:
+                    self._fetch(last + 1, end)
+                    last = end
+                self.indexed = (first, last)
+            self._save()
+
+    def prune(self, height: int) -> None:
+        """ Forget deposit events before height """
+        with self._lock:
+            if self.indexed is None or height <= self.indexed[0]:
+                return
+            del self.heights[:bisect_left(self.heights, height)]
+            last = self.indexed[1]
+            self.indexed = (min(height, last + 1), last)
+
+    def has_deposits(self, start: int, end: int) -> bool:
+        """ Return True if a deposit event happened in [start, end] """
+        self.update(start, end)
+        with self._lock:
+            i = bisect_left(self.heights, start)
+            return i < len(self.heights) and self.heights[i] <= end
@@ -1,11 +1,29 @@
 import json
 from typing import (
+    Any,
     List,
     Dict,
+    NamedTuple,
+    Tuple,
+    Union,
 )
 from web3 import (
     Web3,
 )
+from web3._utils.abi import (
+    get_abi_output_types,
+    map_abi_data,
+)
+from web3._utils.normalizers import (
+    BASE_RETURN_NORMALIZERS,
+)
+from web3._utils.request import (
+    make_post_request,
+)
+from web3.contract import (
+    Contract,
+    ContractFunction,
+)
 
 import aergo.herapy as herapy
 
@@ -19,6 +37,36 @@ def query_aergo_tempo(
     return result
 
 
+class AergoOracleState(NamedTuple):
+    """ Anchoring state of an oracle on Aergo """
+    nonce: int
+    anchor_height: int
+    anchor_root: str  # hex string
+    t_anchor: int
+    t_final: int
+
+
+def query_aergo_oracle_state(
+    aergo: herapy.Aergo,
+    oracle: str,
+) -> AergoOracleState:
+    """ Snapshot of the oracle anchoring state in a single query. """
+    state_q = aergo.query_sc_state(
+        oracle,
+        ["_sv__nonce", "_sv__anchorHeight", "_sv__anchorRoot",
+         "_sv__tAnchor", "_sv__tFinal"]
+    )
+    nonce, height, root, t_anchor, t_final = \
+        [proof.value for proof in state_q.var_proofs]
+    return AergoOracleState(
+        nonce=int(nonce),
+        anchor_height=int(height),
+        anchor_root=root.decode('utf-8')[1:-1],
+        t_anchor=int(t_anchor),
+        t_final=int(t_final),
+    )
+
+
 def query_aergo_validators(aergo: herapy.Aergo, bridge: str) -> List[str]:
     nb_validators_q = aergo.query_sc_state(bridge,
                                            ["_sv__validatorsCount"])
@@ -73,6 +121,115 @@ def query_eth_id(w3: Web3, address: str, abi: str):
     return bridge_contract.functions._contractId().call()
 
 
+def eth_call_batch(
+    w3: Web3,
+    calls: List[ContractFunction],
+    block_identifier: Union[str, int] = 'latest',
+) -> List[Any]:
+    """ Make several eth_call in a single json rpc batch request.
+
+    Providers that don't speak http fall back to one request per call.
+    Results are decoded and normalized like ContractFunction.call().
+    """
+    if not isinstance(w3.provider, Web3.HTTPProvider):
+        return [call.call(block_identifier=block_identifier)
+                for call in calls]
+    if isinstance(block_identifier, int):
+        block_identifier = hex(block_identifier)
+    batch = [
+        {
+            'jsonrpc': '2.0',
+            'method': 'eth_call',
+            'params': [
+                {'to': call.address,
+                 'data': call._encode_transaction_data()},
+                block_identifier
+            ],
+            'id': i,
+        }
+        for i, call in enumerate(calls)
+    ]
+    raw_response = make_post_request(
+        w3.provider.endpoint_uri,
+        json.dumps(batch).encode('utf-8'),
+        **dict(w3.provider.get_request_kwargs())
+    )
+    responses = json.loads(raw_response)
+    if isinstance(responses, dict):
+        # the whole batch was rejected
+        raise ValueError(responses.get('error', responses))
+    responses = sorted(responses, key=lambda r: r['id'])
+    results = []
+    for call, response in zip(calls, responses):
+        if 'error' in response:
+            raise ValueError(response['error'])
+        output_types = get_abi_output_types(call.abi)
+        output_data = w3.codec.decode_abi(
+            output_types, bytes.fromhex(response['result'][2:]))
+        normalized_data = map_abi_data(
+            BASE_RETURN_NORMALIZERS, output_types, output_data)
+        if len(normalized_data) == 1:
+            results.append(normalized_data[0])
+        else:
+            results.append(normalized_data)
+    return results
+
+
+class EthOracleState(NamedTuple):
+    """ Anchoring state of an oracle on Ethereum """
+    nonce: int
+    anchor_height: int
+    anchor_root: bytes  # bytes32
+    t_anchor: int
+    t_final: int
+
+
+def query_eth_oracle_state(
+    w3: Web3,
+    oracle: Contract,
+    block_identifier: Union[str, int] = 'latest',
+) -> EthOracleState:
+    """ Snapshot of the oracle anchoring state in a single batch request. """
+    nonce, height, root, t_anchor, t_final = eth_call_batch(
+        w3,
+        [oracle.functions._nonce(), oracle.functions._anchorHeight(),
+         oracle.functions._anchorRoot(), oracle.functions._tAnchor(),
+         oracle.functions._tFinal()],
+        block_identifier
+    )
+    return EthOracleState(
+        nonce=nonce,
+        anchor_height=height,
+        anchor_root=root,
+        t_anchor=t_anchor,
+        t_final=t_final,
+    )
+
+
+def bridge_id(aergo_net: str, eth_net: str) -> str:
+    """ Identifier of a bridge pair, sent to validators to select which
+    bridge a request is for.
+    """
+    return aergo_net + '/' + eth_net
+
+
+def list_bridge_pairs(config_data: Dict) -> List[Tuple[str, str]]:
+    """ List the (aergo_net, eth_net) bridge pairs registered in both
+    networks of the config file.
+    """
+    pairs = []
+    networks = config_data['networks']
+    for aergo_net, net in networks.items():
+        if net.get('type') != 'aergo':
+            continue
+        for eth_net in net.get('bridges', {}):
+            eth = networks.get(eth_net, {})
+            if (eth.get('type') == 'ethereum'
+                    and aergo_net in eth.get('bridges', {})):
+                pairs.append((aergo_net, eth_net))
+    return pairs
+
+
 def load_config_data(config_file_path: str) -> Dict:
     with open(config_file_path, "r") as f:
         config_data = json.load(f)
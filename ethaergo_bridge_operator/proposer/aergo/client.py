@@ -1,4 +1,7 @@
 import argparse
+from concurrent import (
+    futures,
+)
 from getpass import getpass
 import json
 import requests
@@ -8,6 +11,7 @@ import traceback
 from typing import (
     Tuple,
     List,
+    Optional,
 )
 
 import aergo.herapy as herapy
@@ -15,21 +19,30 @@ from aergo.herapy.errors.general_exception import (
     GeneralException as HeraException,
 )
 
+from ethaergo_bridge_operator.config_watcher import (
+    get_config_watcher,
+)
 from ethaergo_bridge_operator.op_utils import (
+    bridge_id,
     query_aergo_tempo,
     query_aergo_validators,
     query_unfreeze_fee,
-    load_config_data,
     query_aergo_oracle,
+    query_aergo_oracle_state,
 )
-from ethaergo_bridge_operator.proposer.exceptions import (
-    ValidatorMajorityError,
+from ethaergo_bridge_operator.proposer.block_scheduler import (
+    EthBlockScheduler,
+)
+from ethaergo_bridge_operator.connections import (
+    ProviderPool,
 )
-from web3 import (
-    Web3,
+from ethaergo_bridge_operator.event_index import (
+    DepositEventIndex,
+    eth_deposit_heights,
+    checkpoint_file,
 )
-from web3.middleware import (
-    geth_poa_middleware,
+from ethaergo_bridge_operator.proposer.exceptions import (
+    ValidatorMajorityError,
 )
 from ethaergo_bridge_operator.proposer.aergo.validator_connect import (
     AergoValConnect,
@@ -81,33 +94,55 @@ class AergoProposerClient(threading.Thread):
         aergo_gas_price: int = None,
         bridge_anchoring: bool = True,
         root_path: str = './',
-        eco: bool = False
+        eco: bool = False,
+        validator_timeout: float = None,
+        pipeline: bool = False,
+        providers: ProviderPool = None,
+        event_index_dir: str = None,
     ) -> None:
         threading.Thread.__init__(self, name="AergoProposerClient")
         if aergo_gas_price is None:
             aergo_gas_price = 0
+        if validator_timeout is None:
+            validator_timeout = 30
         self.aergo_gas_price = aergo_gas_price
         self.config_file_path = config_file_path
-        config_data = load_config_data(self.config_file_path)
+        self.config = get_config_watcher(config_file_path)
+        config_data = self.config.snapshot()
         self.eth_block_time = eth_block_time
+        # block time of the anchored chain
+        self.block_time = eth_block_time
         self.eth_net = eth_net
         self.aergo_net = aergo_net
         self.anchoring_on = anchoring_on
         self.auto_update = auto_update
+        self.settings_changed = threading.Event()
+        if auto_update:
+            self.config.subscribe(self.on_config_change)
+            self.config.start()
         self.oracle_update = oracle_update
         self.bridge_anchoring = bridge_anchoring
         self.eco = eco
+        # in pipeline mode, the root and bridge proof of the next anchor
+        # are fetched while waiting for it to be finalized
+        self.pipeline = pipeline
+        self.prefetched: Optional[Tuple[int, futures.Future]] = None
+        self.prefetch_executor = futures.ThreadPoolExecutor(max_workers=1)
 
         logger.info("\"Connect Aergo and Ethereum providers\"")
-        self.hera = herapy.Aergo()
-        self.hera.connect(config_data['networks'][aergo_net]['ip'])
+        # connections can be shared with proposers of other bridges
+        if providers is None:
+            providers = ProviderPool()
+        self.providers = providers
+        aergo_ip = config_data['networks'][aergo_net]['ip']
+        self.hera = providers.aergo(aergo_ip)
 
         ip = config_data['networks'][eth_net]['ip']
-        self.web3 = Web3(Web3.HTTPProvider(ip))
         eth_poa = config_data['networks'][eth_net]['isPOA']
-        if eth_poa:
-            self.web3.middleware_onion.inject(geth_poa_middleware, layer=0)
-        assert self.web3.isConnected()
+        self.web3 = providers.web3(ip, eth_poa)
+        # a block filter's new entries are consumed by the reader so each
+        # proposer follows blocks with its own filter
+        self.eth_blocks = EthBlockScheduler(self.web3)
 
         eth_bridge_abi_path = (config_data['networks'][eth_net]['bridges']
                                [aergo_net]['bridge_abi'])
@@ -120,6 +155,12 @@ class AergoProposerClient(threading.Thread):
             abi=eth_bridge_abi
         )
 
+        # deposit events on ethereum are indexed for eco mode
+        self.deposit_events = DepositEventIndex(
+            eth_deposit_heights(self.eth_bridge),
+            checkpoint_file(event_index_dir, eth_net, self.eth_bridge_addr)
+        )
+
         self.aergo_bridge = (config_data['networks'][aergo_net]['bridges']
                              [eth_net]['addr'])
         self.aergo_oracle = (config_data['networks'][aergo_net]['bridges']
@@ -144,30 +185,29 @@ class AergoProposerClient(threading.Thread):
         keystore_path = config_data["wallet"][privkey_name]['keystore']
         with open(root_path + keystore_path, "r") as f:
             keystore = f.read()
-        if privkey_pwd is None:
-            while True:
-                try:
-                    privkey_pwd = getpass(
-                        "Decrypt Aergo keystore: '{}'\nPassword: "
-                        .format(privkey_name)
-                    )
-                    self.aergo_tx = AergoTx(
-                        self.hera, keystore, privkey_pwd,
-                        self.aergo_oracle, aergo_gas_price, self.t_anchor,
-                        eth_block_time
-                    )
-                    break
-                except HeraException:
-                    logger.info("\"Wrong password, try again\"")
-        else:
-            self.aergo_tx = AergoTx(
-                self.hera, keystore, privkey_pwd, self.aergo_oracle,
-                aergo_gas_price, self.t_anchor, eth_block_time
-            )
+        # the account is decrypted once and shared by the proposers of all
+        # bridges on the network
+        signer = providers.aergo_signer(aergo_ip, keystore, privkey_pwd)
+        while signer is None:
+            try:
+                privkey_pwd = getpass(
+                    "Decrypt Aergo keystore: '{}'\nPassword: "
+                    .format(privkey_name)
+                )
+                signer = providers.aergo_signer(
+                    aergo_ip, keystore, privkey_pwd)
+            except HeraException:
+                logger.info("\"Wrong password, try again\"")
+        self.aergo_tx = AergoTx(
+            signer, self.aergo_oracle, aergo_gas_price, self.t_anchor,
+            eth_block_time
+        )
 
         logger.info("\"Connect to AergoValidators\"")
         self.val_connect = AergoValConnect(
-            config_data, self.hera, self.aergo_oracle)
+            config_data, self.hera, self.aergo_oracle, validator_timeout,
+            providers, bridge_id(aergo_net, eth_net)
+        )
 
     def wait_next_anchor(
         self,
@@ -176,179 +216,237 @@ class AergoProposerClient(threading.Thread):
         """ Wait until t_anchor has passed after merged height.
         Return the next finalized block after t_anchor to be the next anchor
         """
-        best_height = self.web3.eth.blockNumber
-        lib = best_height - self.t_final
-        # wait for merged_height + t_anchor > lib
-        wait = (merged_height + self.t_anchor) - lib + 1
-        while wait > 0:
+        next_anchor_height = merged_height + self.t_anchor + 1
+        lib = self.finalized_height()
+        if lib < next_anchor_height:
             logger.info(
                 "\"\u23F0 waiting new anchor time : %ss ...\"",
-                wait * self.eth_block_time
+                (next_anchor_height - lib) * self.eth_block_time
             )
-            self.monitor_settings_and_sleep(wait * self.eth_block_time)
-            # Wait lib > last merged block height + t_anchor
-            best_height = self.web3.eth.blockNumber
+        while lib < next_anchor_height:
+            if self.pipeline and self.prefetched is None:
+                # prefetch as soon as the next anchor block is mined
+                best_height = self.eth_blocks.wait_height(
+                    next_anchor_height, 10)
+                if best_height >= next_anchor_height:
+                    self.prefetched = (
+                        next_anchor_height,
+                        self.prefetch_executor.submit(
+                            self.prefetch_anchor, next_anchor_height)
+                    )
+            else:
+                # Wake up on the block where lib > last merged block height
+                # + t_anchor and check settings every 10s meanwhile
+                best_height = self.eth_blocks.wait_height(
+                    next_anchor_height + self.t_final, 10)
             lib = best_height - self.t_final
-            wait = (merged_height + self.t_anchor) - lib + 1
+            if lib < next_anchor_height and self.auto_update:
+                self.monitor_settings()
         return lib
 
-    def run(
+    def finalized_height(self) -> int:
+        """ Last Ethereum block considered final (lib) """
+        return self.web3.eth.blockNumber - self.t_final
+
+    def prefetch_anchor(
         self,
-    ) -> None:
+        height: int,
+    ) -> Tuple[str, Optional[Tuple[List[str], List[str]]]]:
+        """ Fetch the root and bridge proof of an anchor before the anchor
+        height is finalized. The oracle nonce isn't prefetched: settings
+        updates applied meanwhile increment it.
+        """
+        root = self.web3.eth.getBlock(height).stateRoot.hex()
+        bridge_args = None
+        if self.bridge_anchoring and len(root) != 0:
+            bridge_args = self.buildBridgeAnchorArgs(height)
+        return root, bridge_args
+
+    def collect_prefetch(
+        self,
+        lib: int,
+    ) -> Optional[Tuple[int, str, Optional[Tuple]]]:
+        """ Return the prefetched anchor height, root and bridge proof if the
+        anchor height is finalized and its root didn't change.
+        """
+        if self.prefetched is None:
+            return None
+        height, prefetch = self.prefetched
+        self.prefetched = None
+        if height > lib:
+            prefetch.cancel()
+            return None
+        try:
+            root, bridge_args = prefetch.result()
+        except Exception:
+            logger.warning(
+                "%s", {"Prefetch failed": json.dumps(traceback.format_exc())})
+            return None
+        # the prefetched block may have been replaced by a reorg
+        if self.web3.eth.getBlock(height).stateRoot.hex() != root:
+            logger.info("\"Prefetched anchor root changed, fetching again\"")
+            return None
+        return height, root, bridge_args
+
+    def current_anchor(self) -> int:
+        """ Query the last anchor on the oracle and return its height."""
+        oracle_state = query_aergo_oracle_state(self.hera, self.aergo_oracle)
+        merged_height_from = oracle_state.anchor_height
+        self.t_anchor = oracle_state.t_anchor
+        self.t_final = oracle_state.t_final
+
+        logger.info(
+            "\"Current Eth -> Aergo \u2693 anchor: "
+            "height: %s, root: %s, nonce: %s\"",
+            merged_height_from, oracle_state.anchor_root,
+            oracle_state.nonce
+        )
+        return merged_height_from
+
+    def anchor(
+        self,
+        merged_height_from: int,
+        next_anchor_height: int,
+    ) -> Tuple[float, bool]:
         """ Gathers signatures from validators, verifies them, and if 2/3 majority
         is acquired, set the new anchored root in aergo_bridge.
+        Return how long to sleep before the next anchor and if settings
+        should be monitored meanwhile: the next anchor block is waited for
+        by wait_next_anchor so there is no sleep after an anchor or a skip.
         """
-        logger.info("\"Run Aergo proposer\"")
-        while True:  # anchor a new root
-            try:
-                # Get last merge information
-                bridge_status = self.hera.query_sc_state(
-                    self.aergo_oracle,
-                    ["_sv__anchorHeight", "_sv__anchorRoot", "_sv__tAnchor",
-                     "_sv__tFinal"]
-                )
-                height_from, root_from, t_anchor, t_final = \
-                    [proof.value for proof in bridge_status.var_proofs]
-                merged_height_from = int(height_from)
-                self.t_anchor = int(t_anchor)
-                self.t_final = int(t_final)
-                nonce_to = int(
-                    self.hera.query_sc_state(
-                        self.aergo_oracle, ["_sv__nonce"]).var_proofs[0].value
-                )
-
+        prefetched = self.collect_prefetch(next_anchor_height)
+        bridge_args = None
+        if prefetched is not None:
+            next_anchor_height, root, bridge_args = prefetched
+
+        if self.eco:
+            # only anchor if a lock / burn event happened on ethereum
+            if self.skip_anchor(merged_height_from, next_anchor_height):
                 logger.info(
-                    "\"Current Eth -> Aergo \u2693 anchor: "
-                    "height: %s, root: %s, nonce: %s\"",
-                    merged_height_from, root_from.decode('utf-8')[1:-1],
-                    nonce_to
+                    "\"Anchor skipped (no lock/burn events occured), "
+                    "wait until next anchor time: %ss...\"",
+                    self.t_anchor * self.eth_block_time
                 )
+                return 0, True
 
-                # Wait for the next anchor time
-                next_anchor_height = self.wait_next_anchor(merged_height_from)
+        if prefetched is None:
+            # Get root of next anchor to broadcast
+            root = self.web3.eth.getBlock(next_anchor_height).stateRoot.hex()
+        if len(root) == 0:
+            logger.info("\"waiting deployment finalization...\"")
+            return 5, False
 
-                if self.eco:
-                    # only anchor if a lock / burn event happened on ethereum
-                    if self.skip_anchor(
-                            merged_height_from, next_anchor_height):
-                        logger.info(
-                            "\"Anchor skipped (no lock/burn events occured), "
-                            "wait until next anchor time: %ss...\"",
-                            self.t_anchor * self.eth_block_time
-                        )
-                        self.monitor_settings_and_sleep(
-                            self.t_anchor * self.eth_block_time)
-                        continue
-
-                # Get root of next anchor to broadcast
-                root = \
-                    self.web3.eth.getBlock(next_anchor_height).stateRoot.hex()
-                if len(root) == 0:
-                    logger.info("\"waiting deployment finalization...\"")
-                    time.sleep(5)
-                    continue
-
-                if not self.anchoring_on and not self.auto_update:
-                    # monitoring
-                    logger.info(
-                        "\"Anchoring height reached waiting for anchor...\""
-                    )
-                    time.sleep(30)
-                    continue
+        if not self.anchoring_on and not self.auto_update:
+            # monitoring
+            logger.info("\"Anchoring height reached waiting for anchor...\"")
+            return 30, False
 
-                if self.anchoring_on:
-                    logger.info(
-                        "\"\U0001f58b Gathering validator signatures for: "
-                        "root: %s, height: %s'\"", root, next_anchor_height
-                    )
+        if self.anchoring_on:
+            logger.info(
+                "\"\U0001f58b Gathering validator signatures for: "
+                "root: %s, height: %s'\"", root, next_anchor_height
+            )
 
-                    nonce_to = int(
-                        self.hera.query_sc_state(
-                            self.aergo_oracle, ["_sv__nonce"]
-                        ).var_proofs[0].value
-                    )
+            # read after monitor_settings may have updated the oracle
+            nonce_to = int(
+                self.hera.query_sc_state(
+                    self.aergo_oracle, ["_sv__nonce"]
+                ).var_proofs[0].value
+            )
 
-                    try:
-                        sigs, validator_indexes = \
-                            self.val_connect.get_anchor_signatures(
-                                root[2:], next_anchor_height, nonce_to)
-                    except ValidatorMajorityError:
-                        logger.warning(
-                            "\"Failed to gather 2/3 validators signatures, "
-                            "\u23F0 waiting for next anchor...\""
-                        )
-                        self.monitor_settings_and_sleep(
-                            self.t_anchor * self.eth_block_time)
-                        continue
-
-                    # don't broadcast if somebody else already did
-                    merged_height = int(
-                        self.hera.query_sc_state(
-                            self.aergo_bridge, ["_sv__anchorHeight"]
-                        ).var_proofs[0].value
-                    )
-                    if merged_height + self.t_anchor >= next_anchor_height:
-                        logger.warning(
-                            "\"Not yet anchor time, maybe another proposer "
-                            "already anchored\""
-                        )
-                        wait = \
-                            merged_height + self.t_anchor - next_anchor_height
-                        self.monitor_settings_and_sleep(
-                            wait * self.eth_block_time)
-                        continue
-
-                    if self.bridge_anchoring:
-                        # broadcast the general state root and relay the bridge
-                        # root with a merkle proof
-                        bridge_contract_state, merkle_proof = \
-                            self.buildBridgeAnchorArgs(next_anchor_height)
-                        self.aergo_tx.new_state_and_bridge_anchor(
-                            root, next_anchor_height, validator_indexes, sigs,
-                            bridge_contract_state, merkle_proof
-                        )
-                    else:
-                        # only broadcast the general state root
-                        self.aergo_tx.new_state_anchor(
-                            root, next_anchor_height, validator_indexes, sigs)
-
-                self.monitor_settings_and_sleep(
-                    self.t_anchor * self.eth_block_time)
-
-            except requests.exceptions.ConnectionError:
+            try:
+                sigs, validator_indexes = \
+                    self.val_connect.get_anchor_signatures(
+                        root[2:], next_anchor_height, nonce_to)
+            except ValidatorMajorityError:
                 logger.warning(
-                    "%s",
-                    {"Web3 ConnectionError":
-                        json.dumps(traceback.format_exc())}
+                    "\"Failed to gather 2/3 validators signatures, "
+                    "\u23F0 retrying soon...\""
                 )
-                time.sleep(self.t_anchor / 10)
-            except herapy.errors.exception.CommunicationException:
+                return self.t_anchor * self.eth_block_time / 10, True
+
+            # don't broadcast if somebody else already did
+            merged_height = int(
+                self.hera.query_sc_state(
+                    self.aergo_bridge, ["_sv__anchorHeight"]
+                ).var_proofs[0].value
+            )
+            if merged_height + self.t_anchor >= next_anchor_height:
                 logger.warning(
-                    "%s",
-                    {
-                        "Hera CommunicationException":
-                            json.dumps(traceback.format_exc())
-                    }
+                    "\"Not yet anchor time, maybe another proposer "
+                    "already anchored\""
                 )
-                time.sleep(self.t_anchor / 10)
-            except:
-                logger.warning(
-                    "%s",
-                    {"UNKNOWN ERROR": json.dumps(traceback.format_exc())}
+                return 0, True
+
+            if self.bridge_anchoring:
+                # broadcast the general state root and relay the bridge
+                # root with a merkle proof
+                if bridge_args is None:
+                    bridge_args = \
+                        self.buildBridgeAnchorArgs(next_anchor_height)
+                bridge_contract_state, merkle_proof = bridge_args
+                self.aergo_tx.new_state_and_bridge_anchor(
+                    root, next_anchor_height, validator_indexes, sigs,
+                    bridge_contract_state, merkle_proof
                 )
-                time.sleep(self.t_anchor / 10)
+            else:
+                # only broadcast the general state root
+                self.aergo_tx.new_state_anchor(
+                    root, next_anchor_height, validator_indexes, sigs)
 
-    def skip_anchor(self, last_anchor, next_anchor):
-        lock_events = self.eth_bridge.events.lockEvent.createFilter(
-            fromBlock=last_anchor, toBlock=next_anchor).get_all_entries()
-        if len(lock_events) > 0:
-            return False
+        return 0, True
 
-        burn_events = self.eth_bridge.events.burnEvent.createFilter(
-            fromBlock=last_anchor, toBlock=next_anchor).get_new_entries()
-        if len(burn_events) > 0:
-            return False
-        return True
+    def handle_error(self) -> float:
+        """ Log the exception being handled by the anchoring loop and return
+        how long to wait before retrying.
+        """
+        try:
+            raise
+        except requests.exceptions.ConnectionError:
+            logger.warning(
+                "%s",
+                {"Web3 ConnectionError": json.dumps(traceback.format_exc())}
+            )
+            return self.t_anchor / 10
+        except herapy.errors.exception.CommunicationException:
+            logger.warning(
+                "%s",
+                {
+                    "Hera CommunicationException":
+                        json.dumps(traceback.format_exc())
+                }
+            )
+            return self.t_anchor / 10
+        except:
+            logger.warning(
+                "%s",
+                {"UNKNOWN ERROR": json.dumps(traceback.format_exc())}
+            )
+            return self.t_anchor / 10
+
+    def run(
+        self,
+    ) -> None:
+        """ Anchor a new root every t_anchor."""
+        logger.info("\"Run Aergo proposer\"")
+        while True:  # anchor a new root
+            try:
+                merged_height_from = self.current_anchor()
+                # Wait for the next anchor time
+                next_anchor_height = self.wait_next_anchor(merged_height_from)
+                sleeping_time, monitor = self.anchor(
+                    merged_height_from, next_anchor_height)
+                if monitor:
+                    self.monitor_settings_and_sleep(sleeping_time)
+                else:
+                    time.sleep(sleeping_time)
+            except:
+                time.sleep(self.handle_error())
+
+    def skip_anchor(self, last_anchor, next_anchor):
+        # events before the last anchor are not needed anymore
+        self.deposit_events.prune(last_anchor)
+        return not self.deposit_events.has_deposits(last_anchor, next_anchor)
 
     def monitor_settings_and_sleep(self, sleeping_time):
         """While sleeping, periodicaly check changes to the config
@@ -361,8 +459,10 @@ class AergoProposerClient(threading.Thread):
             start = time.time()
             self.monitor_settings()
             while time.time() - start < sleeping_time - 10:
-                # check the config file every 10 seconds
-                time.sleep(10)
+                # check the config file every 10 seconds or as soon as it
+                # changed
+                self.settings_changed.wait(10)
+                self.settings_changed.clear()
                 self.monitor_settings()
             remaining = sleeping_time - (time.time() - start)
             if remaining > 0:
@@ -370,13 +470,18 @@ class AergoProposerClient(threading.Thread):
         else:
             time.sleep(sleeping_time)
 
+    def on_config_change(self, config_data, changed_keys):
+        """Wake up monitor_settings_and_sleep when the config file changed."""
+        logger.info('\"Config file changed: %s\"', sorted(changed_keys))
+        self.settings_changed.set()
+
     def monitor_settings(self):
         """Check if a modification of bridge settings is requested by seeing
         if the config file has been changed and try to update the bridge
         contract (gather 2/3 validators signatures).
 
         """
-        config_data = load_config_data(self.config_file_path)
+        config_data = self.config.snapshot()
         t_anchor, t_final = query_aergo_tempo(self.hera, self.aergo_bridge)
         unfreeze_fee = query_unfreeze_fee(self.hera, self.aergo_bridge)
         config_t_anchor = (config_data['networks'][self.aergo_net]['bridges']
@@ -604,6 +709,16 @@ if __name__ == '__main__':
         help="In eco mode, anchoring will be skipped when lock/burn "
         "events don't happen in the bridge contract"
     )
+    parser.add_argument(
+        '--validator_timeout', type=float,
+        help='Seconds to wait for a validator signature (default 30)',
+        required=False
+    )
+    parser.add_argument(
+        '--pipeline', dest='pipeline', action='store_true',
+        help='Prefetch the next anchor root and bridge proof while waiting '
+        'for it to be finalized'
+    )
 
     args = parser.parse_args()
 
@@ -615,5 +730,7 @@ if __name__ == '__main__':
         oracle_update=args.oracle_update,
         aergo_gas_price=args.aergo_gas_price,
         eco=args.eco,
+        validator_timeout=args.validator_timeout,
+        pipeline=args.pipeline,
     )
     proposer.run()
@@ -3,6 +3,10 @@ from typing import (
 )
 
 import aergo.herapy as herapy
+
+from ethaergo_bridge_operator.connections import (
+    AergoAccountSigner,
+)
 import logging
 
 logger = logging.getLogger(__name__)
@@ -13,9 +17,7 @@ class AergoTx():
 
     def __init__(
         self,
-        hera: herapy.Aergo,
-        keystore: str,
-        privkey_pwd: str,
+        signer: AergoAccountSigner,
         aergo_oracle: str,
         aergo_gas_price: int,
         t_anchor: int,
@@ -24,10 +26,11 @@ class AergoTx():
         self.aergo_gas_price = aergo_gas_price
         self.t_anchor = t_anchor
         self.eth_block_time = eth_block_time
-        self.hera = hera
+        # the proposer account can be shared with proposers of other bridges
+        self.signer = signer
+        self.hera = signer.hera
         self.aergo_oracle = aergo_oracle
 
-        self.hera.import_account_from_keystore(keystore, privkey_pwd)
         logger.info(
             "\"Proposer Address: %s\"", self.hera.account.address)
 
@@ -39,8 +42,7 @@ class AergoTx():
         sigs: List[str],
     ) -> None:
         """Anchor a new state root on chain"""
-        self.hera.get_account()
-        tx, result = self.hera.call_sc(
+        tx, result = self.signer.call_sc(
             self.aergo_oracle, "newStateAnchor",
             args=[root, next_anchor_height, validator_indexes, sigs]
         )
@@ -79,8 +81,7 @@ class AergoTx():
         """Anchor a new state root and update bridge anchor on chain"""
         bridge_nonce, bridge_balance, bridge_root, bridge_code_hash = \
             bridge_contract_state
-        self.hera.get_account()
-        tx, result = self.hera.call_sc(
+        tx, result = self.signer.call_sc(
             self.aergo_oracle, "newStateAndBridgeAnchor",
             args=[stateRoot, next_anchor_height, validator_indexes, sigs,
                   bridge_nonce, bridge_balance, bridge_root, bridge_code_hash,
@@ -111,8 +112,7 @@ class AergoTx():
 
     def set_validators(self, new_validators, validator_indexes, sigs):
         """Update validators on chain"""
-        self.hera.get_account()
-        tx, result = self.hera.call_sc(
+        tx, result = self.signer.call_sc(
             self.aergo_oracle, "validatorsUpdate",
             args=[new_validators, validator_indexes, sigs]
         )
@@ -147,8 +147,7 @@ class AergoTx():
         emoticon
     ) -> bool:
         """Call contract_function with num"""
-        self.hera.get_account()
-        tx, result = self.hera.call_sc(
+        tx, result = self.signer.call_sc(
             self.aergo_oracle, contract_function,
             args=[num, validator_indexes, sigs]
         )
@@ -178,8 +177,7 @@ class AergoTx():
 
     def set_oracle(self, new_oracle, validator_indexes, sigs):
         """Update oracle on chain"""
-        self.hera.get_account()
-        tx, result = self.hera.call_sc(
+        tx, result = self.signer.call_sc(
             self.aergo_oracle, "oracleUpdate",
             args=[new_oracle, validator_indexes, sigs]
         )
@@ -3,8 +3,8 @@ from functools import (
 )
 import grpc
 import hashlib
-from multiprocessing.dummy import (
-    Pool,
+from queue import (
+    Queue,
 )
 
 from typing import (
@@ -35,6 +35,9 @@ from ethaergo_bridge_operator.op_utils import (
     query_aergo_validators,
     query_aergo_id,
 )
+from ethaergo_bridge_operator.connections import (
+    ProviderPool,
+)
 from ethaergo_bridge_operator.proposer.exceptions import (
     ValidatorMajorityError,
 )
@@ -54,9 +57,23 @@ class AergoValConnect():
         config_data: Dict,
         hera: herapy.Aergo,
         aergo_oracle: str,
+        validator_timeout: float = 30,
+        providers: ProviderPool = None,
+        bridge_id: str = None,
     ):
         self.hera = hera
         self.config_data = config_data
+        # deadline of each validator rpc so a hanging validator cannot
+        # hold the proposer once the other validators have answered
+        self.validator_timeout = validator_timeout
+        # channels to validators can be shared with proposers of other
+        # bridges, requests then name the bridge they are for.
+        if providers is None:
+            providers = ProviderPool()
+        self.providers = providers
+        self.metadata = None
+        if bridge_id is not None:
+            self.metadata = (('bridge', bridge_id),)
         self.aergo_oracle = aergo_oracle
         self.aergo_id = query_aergo_id(self.hera, self.aergo_oracle)
 
@@ -77,13 +94,11 @@ class AergoValConnect():
                 "when starting (current validators connection needed to make "\
                 "updates).\nExpected validators: {}".format(current_validators)
             ip = validator['ip']
-            channel = grpc.insecure_channel(ip)
+            channel = self.providers.validator_channel(ip)
             stub = BridgeOperatorStub(channel)
             self.channels.append(channel)
             self.stubs.append(stub)
 
-        self.pool = Pool(len(self.stubs))
-
     def get_anchor_signatures(
         self,
         root: str,
@@ -103,26 +118,69 @@ class AergoValConnect():
             destination_nonce=nonce
         )
 
-        # get validator signatures and verify sig in worker
-        validator_indexes = [i for i in range(len(self.stubs))]
-        worker = partial(self.get_signature_worker, "GetEthAnchorSignature",
-                         anchor, h)
-        approvals = self.pool.map(worker, validator_indexes)
+        # get validator signatures and verify them as they arrive
+        approvals = self.gather_approvals(
+            "GetEthAnchorSignature", anchor, h)
 
         sigs, validator_indexes = self.extract_signatures(approvals)
 
         return sigs, validator_indexes
 
-    def get_signature_worker(
+    def gather_approvals(
         self,
         rpc_service: str,
         request,
         h: bytes,
-        idx: int
+    ) -> List[Optional[Any]]:
+        """ Query all validators in parallel and return as soon as 2/3 of
+        them gave a valid signature.
+        Rpcs still pending when the quorum is reached are cancelled so a slow
+        validator doesn't delay the anchor.
+        """
+        total_validators = len(self.stubs)
+        two_thirds = ((total_validators * 2) // 3
+                      + ((total_validators * 2) % 3 > 0))
+        approvals: List[Optional[Any]] = [None] * total_validators
+        answered: Queue = Queue()
+        calls = []
+        for idx, stub in enumerate(self.stubs):
+            call = getattr(stub, rpc_service).future(
+                request, timeout=self.validator_timeout,
+                metadata=self.metadata
+            )
+            call.add_done_callback(partial(self._on_answer, answered, idx))
+            calls.append(call)
+        nb_valid = 0
+        try:
+            # every call completes (answer, error or deadline) so this
+            # doesn't block forever
+            for _ in range(total_validators):
+                idx, call = answered.get()
+                approval = self.verify_approval(h, idx, call)
+                if approval is None:
+                    continue
+                approvals[idx] = approval
+                nb_valid += 1
+                if nb_valid >= two_thirds:
+                    break
+        finally:
+            for call in calls:
+                call.cancel()
+        return approvals
+
+    @staticmethod
+    def _on_answer(answered: Queue, idx: int, call) -> None:
+        answered.put((idx, call))
+
+    def verify_approval(
+        self,
+        h: bytes,
+        idx: int,
+        call,
     ) -> Optional[Any]:
         """ Get a validator's (index) signature and verify it"""
         try:
-            approval = getattr(self.stubs[idx], rpc_service)(request)
+            approval = call.result()
         except grpc.RpcError as e:
             logger.warning(
                 "\"Failed to connect to validator %s (RpcError: %s)\"", idx,
@@ -179,13 +237,9 @@ class AergoValConnect():
         data += str(nonce) + self.aergo_id + "V"
         data_bytes = bytes(data, 'utf-8')
         h = hashlib.sha256(data_bytes).digest()
-        # get validator signatures and verify sig in worker
-        validator_indexes = [i for i in range(len(self.stubs))]
-        worker = partial(
-            self.get_signature_worker, "GetEthValidatorsSignature",
-            new_validators_msg, h
-        )
-        approvals = self.pool.map(worker, validator_indexes)
+        # get validator signatures and verify them as they arrive
+        approvals = self.gather_approvals(
+            "GetEthValidatorsSignature", new_validators_msg, h)
         sigs, validator_indexes = self.extract_signatures(approvals)
         return sigs, validator_indexes
 
@@ -201,12 +255,8 @@ class AergoValConnect():
             'utf-8'
         )
         h = hashlib.sha256(msg).digest()
-        validator_indexes = [i for i in range(len(self.stubs))]
-        worker = partial(
-            self.get_signature_worker, rpc_service,
-            new_tempo_msg, h
-        )
-        approvals = self.pool.map(worker, validator_indexes)
+        # get validator signatures and verify them as they arrive
+        approvals = self.gather_approvals(rpc_service, new_tempo_msg, h)
         sigs, validator_indexes = self.extract_signatures(approvals)
         return sigs, validator_indexes
 
@@ -222,12 +272,9 @@ class AergoValConnect():
             'utf-8'
         )
         h = hashlib.sha256(msg).digest()
-        validator_indexes = [i for i in range(len(self.stubs))]
-        worker = partial(
-            self.get_signature_worker, "GetAergoUnfreezeFeeSignature",
-            new_fee_msg, h
-        )
-        approvals = self.pool.map(worker, validator_indexes)
+        # get validator signatures and verify them as they arrive
+        approvals = self.gather_approvals(
+            "GetAergoUnfreezeFeeSignature", new_fee_msg, h)
         sigs, validator_indexes = self.extract_signatures(approvals)
         return sigs, validator_indexes
 
@@ -241,13 +288,11 @@ class AergoValConnect():
         self.stubs = []
         for validator in self.config_data['validators']:
             ip = validator['ip']
-            channel = grpc.insecure_channel(ip)
+            channel = self.providers.validator_channel(ip)
             stub = BridgeOperatorStub(channel)
             self.channels.append(channel)
             self.stubs.append(stub)
 
-        self.pool = Pool(len(self.stubs))
-
     def get_new_oracle_signatures(self, oracle):
         """Request approvals of validators for the new oracle."""
         nonce = int(
@@ -259,12 +304,8 @@ class AergoValConnect():
         data = oracle + str(nonce) + self.aergo_id + "O"
         data_bytes = bytes(data, 'utf-8')
         h = hashlib.sha256(data_bytes).digest()
-        # get validator signatures and verify sig in worker
-        validator_indexes = [i for i in range(len(self.stubs))]
-        worker = partial(
-            self.get_signature_worker, "GetEthOracleSignature",
-            new_oracle_msg, h
-        )
-        approvals = self.pool.map(worker, validator_indexes)
+        # get validator signatures and verify them as they arrive
+        approvals = self.gather_approvals(
+            "GetEthOracleSignature", new_oracle_msg, h)
         sigs, validator_indexes = self.extract_signatures(approvals)
         return sigs, validator_indexes
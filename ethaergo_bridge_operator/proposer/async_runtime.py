@@ -0,0 +1,138 @@
+import asyncio
+from concurrent import (
+    futures,
+)
+import json
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    Union,
+)
+
+from ethaergo_bridge_operator.proposer.eth.client import (
+    EthProposerClient,
+)
+from ethaergo_bridge_operator.proposer.aergo.client import (
+    AergoProposerClient,
+)
+import logging
+
+logger = logging.getLogger(__name__)
+
+Proposer = Union[EthProposerClient, AergoProposerClient]
+
+
+class AsyncProposerRuntime():
+    """ Runs the anchoring loops and settings monitoring of any number of
+    proposers as coroutines on a single event loop.
+
+    Web3 5.x and herapy only provide blocking clients so chain queries,
+    transactions and waiting for the next anchor block are run in a thread
+    pool with a thread per proposer: a proposer blocked on a tx receipt
+    doesn't delay the others. Proposers spend most of their time in
+    wait_next_anchor, blocked on their block scheduler which wakes up on
+    new blocks and prefetches the next anchor in pipeline mode, so each
+    proposer holds a thread of the pool while idle. Validator signatures are
+    gathered with grpc futures (see gather_approvals) and don't need a
+    thread per validator.
+    Metrics are kept per proposer: anchoring rounds, errors, height of the
+    last anchor found on chain and duration of the last anchor. They are
+    logged every metrics_interval seconds if set.
+    """
+
+    def __init__(
+        self,
+        proposers: List[Proposer],
+        max_workers: int = None,
+        metrics_interval: float = None,
+    ) -> None:
+        self.proposers = proposers
+        # each proposer makes one blocking call at a time
+        if max_workers is None or max_workers < len(proposers):
+            max_workers = len(proposers)
+        self.executor = futures.ThreadPoolExecutor(max_workers=max_workers)
+        self.metrics_interval = metrics_interval
+        self._metrics: Dict[str, Dict[str, Any]] = {
+            proposer.name: {
+                'rounds': 0,
+                'errors': 0,
+                'anchored_height': None,
+                'last_anchor_duration': None,
+            } for proposer in proposers
+        }
+
+    def metrics(self) -> Dict[str, Dict[str, Any]]:
+        """ Copy of the metrics of each proposer, by proposer name """
+        return {name: dict(m) for name, m in self._metrics.items()}
+
+    def run(self) -> None:
+        """ Run all proposers until interrupted """
+        asyncio.run(self.main())
+
+    async def main(self) -> None:
+        tasks = [self.run_proposer(proposer) for proposer in self.proposers]
+        if self.metrics_interval:
+            tasks.append(self.log_metrics(self.metrics_interval))
+        await asyncio.gather(*tasks)
+
+    async def log_metrics(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            logger.info("\"Proposer metrics\": %s", json.dumps(self.metrics()))
+
+    async def call(self, fn: Callable, *args) -> Any:
+        """ Run a blocking call in the shared thread pool """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, fn, *args)
+
+    async def run_proposer(self, proposer: Proposer) -> None:
+        """ Coroutine version of the proposer's run loop """
+        logger.info("\"Run %s\"", proposer.name)
+        metrics = self._metrics[proposer.name]
+        loop = asyncio.get_running_loop()
+        while True:  # anchor a new root
+            try:
+                merged_height_from = await self.call(proposer.current_anchor)
+                metrics['anchored_height'] = merged_height_from
+                # Wait for the next anchor time
+                next_anchor_height = await self.call(
+                    proposer.wait_next_anchor, merged_height_from)
+                start = loop.time()
+                sleeping_time, monitor = await self.call(
+                    proposer.anchor, merged_height_from, next_anchor_height)
+                metrics['rounds'] += 1
+                metrics['last_anchor_duration'] = loop.time() - start
+                if monitor:
+                    await self.monitor_settings_and_sleep(
+                        proposer, sleeping_time)
+                else:
+                    await asyncio.sleep(sleeping_time)
+            except asyncio.CancelledError:
+                raise
+            except:
+                metrics['errors'] += 1
+                await asyncio.sleep(proposer.handle_error())
+
+    async def monitor_settings_and_sleep(
+        self,
+        proposer: Proposer,
+        sleeping_time: float,
+    ) -> None:
+        """ Coroutine version of the proposer's monitor_settings_and_sleep """
+        if not proposer.auto_update:
+            await asyncio.sleep(sleeping_time)
+            return
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        await self.call(proposer.monitor_settings)
+        while loop.time() - start < sleeping_time - 10:
+            # check the config file every 10 seconds or as soon as it
+            # changed
+            await self.call(proposer.settings_changed.wait, 10)
+            proposer.settings_changed.clear()
+            await self.call(proposer.monitor_settings)
+        remaining = sleeping_time - (loop.time() - start)
+        if remaining > 0:
+            await asyncio.sleep(remaining)
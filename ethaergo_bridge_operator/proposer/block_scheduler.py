@@ -0,0 +1,137 @@
+import threading
+import time
+from typing import (
+    Optional,
+)
+
+import aergo.herapy as herapy
+from web3 import (
+    Web3,
+)
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class AergoBlockScheduler():
+    """ Follows new Aergo blocks with the block metadata stream so that the
+    proposer wakes up on the block where LIB reaches the next anchor height.
+    """
+
+    def __init__(self, hera: herapy.Aergo) -> None:
+        self.hera = hera
+        self.best_height = 0
+        # best height - lib observed at the last status query
+        self.lib_lag = 0
+        self.new_block = threading.Condition()
+        self.stream_alive = False
+        self._stream_thread: Optional[threading.Thread] = None
+
+    def _start(self) -> None:
+        """ Start following blocks the first time they are waited for."""
+        with self.new_block:
+            if self._stream_thread is not None:
+                return
+            self._stream_thread = threading.Thread(
+                target=self._follow_blocks, name="AergoBlockStream",
+                daemon=True
+            )
+        self._stream_thread.start()
+
+    def _follow_blocks(self) -> None:
+        while True:
+            try:
+                stream = self.hera.receive_block_meta_stream()
+                self.stream_alive = True
+                for block in stream:
+                    with self.new_block:
+                        self.best_height = block.height
+                        self.new_block.notify_all()
+            except Exception:
+                logger.warning("\"Aergo block stream interrupted\"")
+            self.stream_alive = False
+            time.sleep(5)
+
+    def lib(self) -> int:
+        status = self.hera.get_status()
+        lib = status.consensus_info.status['LibNo']
+        self.lib_lag = status.best_block_height - lib
+        return lib
+
+    def wait_best(self, height: int, timeout: float) -> int:
+        """ Wait until the block at height is produced or timeout,
+        return the last best height.
+        """
+        self._start()
+        if self.stream_alive:
+            with self.new_block:
+                self.new_block.wait_for(
+                    lambda: self.best_height >= height, timeout)
+                return self.best_height
+        deadline = time.time() + timeout
+        best_height = self.hera.get_status().best_block_height
+        while best_height < height and time.time() < deadline:
+            time.sleep(max(min(deadline - time.time(), 1), 0))
+            best_height = self.hera.get_status().best_block_height
+        return best_height
+
+    def wait_lib(self, height: int, timeout: float) -> int:
+        """ Wait until LIB reaches height or timeout, return the last LIB."""
+        self._start()
+        deadline = time.time() + timeout
+        while True:
+            remaining = deadline - time.time()
+            if self.stream_alive:
+                # only query the status when a new best block can be
+                # finalized enough
+                with self.new_block:
+                    seen = self.best_height
+                    self.new_block.wait_for(
+                        lambda: (
+                            self.best_height > seen
+                            and self.best_height - self.lib_lag >= height
+                        ),
+                        max(remaining, 0)
+                    )
+            else:
+                time.sleep(max(min(remaining, 1), 0))
+            lib = self.lib()
+            if lib >= height or time.time() >= deadline:
+                return lib
+
+
+class EthBlockScheduler():
+    """ Follows new Ethereum blocks with a 'latest' block filter so that the
+    proposer wakes up on the block where the chain reaches the next anchor
+    height. Falls back to polling the block number if the node doesn't
+    support filters.
+    """
+
+    def __init__(self, web3: Web3, poll_interval: float = 1) -> None:
+        self.web3 = web3
+        self.poll_interval = poll_interval
+        self.block_filter = None
+
+    def _new_block(self) -> bool:
+        try:
+            if self.block_filter is None:
+                self.block_filter = self.web3.eth.filter('latest')
+                return True
+            return len(self.block_filter.get_new_entries()) > 0
+        except ValueError:
+            # filters are not supported or expired: poll the block number
+            self.block_filter = None
+            return True
+
+    def wait_height(self, height: int, timeout: float) -> int:
+        """ Wait until the best block reaches height or timeout,
+        return the last best height.
+        """
+        deadline = time.time() + timeout
+        best_height = self.web3.eth.blockNumber
+        while best_height < height and time.time() < deadline:
+            time.sleep(
+                max(min(self.poll_interval, deadline - time.time()), 0))
+            if self._new_block():
+                best_height = self.web3.eth.blockNumber
+        return best_height
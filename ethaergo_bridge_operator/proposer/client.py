@@ -6,6 +6,12 @@ from ethaergo_bridge_operator.proposer.eth.client import (
 from ethaergo_bridge_operator.proposer.aergo.client import (
     AergoProposerClient
 )
+from ethaergo_bridge_operator.proposer.async_runtime import (
+    AsyncProposerRuntime
+)
+from ethaergo_bridge_operator.connections import (
+    ProviderPool
+)
 
 
 class ProposerClient:
@@ -29,19 +35,32 @@ class ProposerClient:
         root_path: str = './',
         eco: bool = False,
         eth_eco: bool = False,
+        validator_timeout: float = None,
+        pipeline: bool = False,
+        use_asyncio: bool = False,
+        event_index_dir: str = None,
     ) -> None:
+        self.use_asyncio = use_asyncio
+        providers = ProviderPool()
         self.t_eth_client = EthProposerClient(
             config_file_path, aergo_net, eth_net, privkey_name,
             privkey_pwd, anchoring_on, auto_update, oracle_update,
-            root_path, eth_gas_price, bridge_anchoring, eco or eth_eco
+            root_path, eth_gas_price, bridge_anchoring, eco or eth_eco,
+            validator_timeout, pipeline, providers, event_index_dir
         )
         self.t_aergo_client = AergoProposerClient(
             config_file_path, aergo_net, eth_net, eth_block_time, privkey_name,
             privkey_pwd, anchoring_on, auto_update, oracle_update,
-            aergo_gas_price, bridge_anchoring, root_path, eco
+            aergo_gas_price, bridge_anchoring, root_path, eco,
+            validator_timeout, pipeline, providers, event_index_dir
         )
 
     def run(self):
+        if self.use_asyncio:
+            # run both directions as coroutines on one event loop
+            AsyncProposerRuntime(
+                [self.t_eth_client, self.t_aergo_client]).run()
+            return
         self.t_eth_client.start()
         self.t_aergo_client.start()
 
@@ -106,6 +125,25 @@ if __name__ == '__main__':
         help="In eco mode, anchoring on Ethereum will be skipped when "
         "lock/burn/freeze events don't happen in the bridge contracts on Aergo"
     )
+    parser.add_argument(
+        '--validator_timeout', type=float,
+        help='Seconds to wait for a validator signature (default 30)',
+        required=False
+    )
+    parser.add_argument(
+        '--pipeline', dest='pipeline', action='store_true',
+        help='Prefetch the next anchor root and bridge proof while waiting '
+        'for it to be finalized'
+    )
+    parser.add_argument(
+        '--asyncio', dest='asyncio', action='store_true',
+        help='Run both proposers as coroutines on one asyncio event loop'
+    )
+    parser.add_argument(
+        '--event_index_dir', type=str, required=False,
+        help='Directory where checkpoints of the bridge deposit events used '
+        'in eco mode are saved (default: not saved)'
+    )
 
     args = parser.parse_args()
 
@@ -118,6 +156,10 @@ if __name__ == '__main__':
         auto_update=args.auto_update,
         oracle_update=args.oracle_update,
         eco=args.eco,
-        eth_eco=args.eth_eco
+        eth_eco=args.eth_eco,
+        validator_timeout=args.validator_timeout,
+        pipeline=args.pipeline,
+        event_index_dir=args.event_index_dir,
+        use_asyncio=args.asyncio,
     )
     proposer.run()
@@ -1,4 +1,7 @@
 import argparse
+from concurrent import (
+    futures,
+)
 from getpass import getpass
 import json
 import requests
@@ -8,20 +11,27 @@ import traceback
 from typing import (
     Tuple,
     List,
+    Optional,
 )
 
 
 import aergo.herapy as herapy
 import web3
-from web3 import (
-    Web3,
-)
-from web3.middleware import (
-    geth_poa_middleware,
-)
 
+from ethaergo_bridge_operator.config_watcher import (
+    get_config_watcher,
+)
 from ethaergo_bridge_operator.op_utils import (
-    load_config_data,
+    bridge_id,
+    query_eth_oracle_state,
+)
+from ethaergo_bridge_operator.connections import (
+    ProviderPool,
+)
+from ethaergo_bridge_operator.event_index import (
+    DepositEventIndex,
+    aergo_deposit_heights,
+    checkpoint_file,
 )
 from ethaergo_bridge_operator.proposer.exceptions import (
     ValidatorMajorityError,
@@ -77,32 +87,52 @@ class EthProposerClient(threading.Thread):
         eth_gas_price: int = None,
         bridge_anchoring: bool = True,
         eco: bool = False,
+        validator_timeout: float = None,
+        pipeline: bool = False,
+        providers: ProviderPool = None,
+        event_index_dir: str = None,
     ) -> None:
         threading.Thread.__init__(self, name="EthProposerClient")
         if eth_gas_price is None:
             eth_gas_price = 10
+        if validator_timeout is None:
+            validator_timeout = 30
         self.config_file_path = config_file_path
-        config_data = load_config_data(config_file_path)
+        self.config = get_config_watcher(config_file_path)
+        config_data = self.config.snapshot()
         self.eth_net = eth_net
         self.aergo_net = aergo_net
         self.anchoring_on = anchoring_on
         self.auto_update = auto_update
+        self.settings_changed = threading.Event()
+        if auto_update:
+            self.config.subscribe(self.on_config_change)
+            self.config.start()
         self.oracle_update = oracle_update
         self.bridge_anchoring = bridge_anchoring
         self.eco = eco
+        # block time of the anchored chain
+        self.block_time = 1
+        # in pipeline mode, the root and bridge proof of the next anchor
+        # are fetched while waiting for it to be finalized
+        self.pipeline = pipeline
+        self.prefetched: Optional[Tuple[int, futures.Future]] = None
+        self.prefetch_executor = futures.ThreadPoolExecutor(max_workers=1)
 
         logger.info("\"Connect Aergo and Ethereum providers\"")
-        self.hera = herapy.Aergo()
-        self.hera.connect(config_data['networks'][aergo_net]['ip'])
+        # connections can be shared with proposers of other bridges
+        if providers is None:
+            providers = ProviderPool()
+        self.providers = providers
+        aergo_ip = config_data['networks'][aergo_net]['ip']
+        self.hera = providers.aergo(aergo_ip)
+        self.aergo_blocks = providers.aergo_blocks(aergo_ip)
 
         # Web3 instance for reading blockchains state, shared with
         # EthValConnect.
         ip = config_data['networks'][eth_net]['ip']
-        self.web3 = Web3(Web3.HTTPProvider(ip))
         eth_poa = config_data['networks'][eth_net]['isPOA']
-        if eth_poa:
-            self.web3.middleware_onion.inject(geth_poa_middleware, layer=0)
-        assert self.web3.isConnected()
+        self.web3 = providers.web3(ip, eth_poa)
 
         # bridge contract
         bridge_abi_path = (config_data['networks'][eth_net]['bridges']
@@ -128,6 +158,11 @@ class EthProposerClient(threading.Thread):
         )
         self.aergo_bridge = (config_data['networks'][aergo_net]['bridges']
                              [eth_net]['addr'])
+        # deposit events on aergo are indexed for eco mode
+        self.deposit_events = DepositEventIndex(
+            aergo_deposit_heights(self.hera, self.aergo_bridge),
+            checkpoint_file(event_index_dir, aergo_net, self.aergo_bridge)
+        )
 
         # get the current t_anchor and t_final for anchoring on etherem
         self.t_anchor = self.eth_bridge.functions._tAnchor().call()
@@ -146,29 +181,27 @@ class EthProposerClient(threading.Thread):
         keystore_path = config_data["wallet-eth"][privkey_name]['keystore']
         with open(root_path + keystore_path, "r") as f:
             keystore = f.read()
-        if privkey_pwd is None:
-            while True:
-                try:
-                    privkey_pwd = getpass("Decrypt Ethereum keystore '{}'\n"
-                                          "Password: ".format(privkey_name))
-                    self.eth_tx = EthTx(
-                        self.web3, keystore, privkey_pwd,
-                        eth_oracle_address, oracle_abi, eth_gas_price,
-                        self.t_anchor
-                    )
-                    break
-                except ValueError:
-                    logger.info("\"Wrong password, try again\"")
-        else:
-            self.eth_tx = EthTx(
-                self.web3, keystore, privkey_pwd, eth_oracle_address,
-                oracle_abi, eth_gas_price, self.t_anchor
-            )
+        # the account is decrypted once and shared by the proposers of all
+        # bridges on the network
+        signer = providers.eth_signer(ip, eth_poa, keystore, privkey_pwd)
+        while signer is None:
+            try:
+                privkey_pwd = getpass("Decrypt Ethereum keystore '{}'\n"
+                                      "Password: ".format(privkey_name))
+                signer = providers.eth_signer(
+                    ip, eth_poa, keystore, privkey_pwd)
+            except ValueError:
+                logger.info("\"Wrong password, try again\"")
+        self.eth_tx = EthTx(
+            self.web3, signer, eth_oracle_address, oracle_abi,
+            eth_gas_price, self.t_anchor
+        )
 
         logger.info("\"Connect to EthValidators\"")
         self.val_connect = EthValConnect(
             config_data, self.web3, eth_oracle_address,
-            oracle_abi
+            oracle_abi, validator_timeout, providers,
+            bridge_id(aergo_net, eth_net)
         )
 
     def wait_next_anchor(
@@ -178,205 +211,265 @@ class EthProposerClient(threading.Thread):
         """ Wait until t_anchor has passed after merged height.
         Return the next finalized block after t_anchor to be the next anchor
         """
-        lib = self.hera.get_status().consensus_info.status['LibNo']
-        wait = (merged_height + self.t_anchor) - lib + 1
-        while wait > 0:
-            logger.info("\"\u23F0 waiting new anchor time : %ss ...\"", wait)
-            self.monitor_settings_and_sleep(wait)
-            # Wait lib > last merged block height + t_anchor
-            lib = self.hera.get_status().consensus_info.status['LibNo']
-            wait = (merged_height + self.t_anchor) - lib + 1
+        next_anchor_height = merged_height + self.t_anchor + 1
+        lib = self.finalized_height()
+        if lib < next_anchor_height:
+            logger.info(
+                "\"\u23F0 waiting new anchor time : %ss ...\"",
+                next_anchor_height - lib
+            )
+        while lib < next_anchor_height:
+            if self.pipeline and self.prefetched is None:
+                # prefetch as soon as the next anchor block is produced
+                best_height = self.aergo_blocks.wait_best(
+                    next_anchor_height, 10)
+                if best_height >= next_anchor_height:
+                    self.prefetched = (
+                        next_anchor_height,
+                        self.prefetch_executor.submit(
+                            self.prefetch_anchor, next_anchor_height)
+                    )
+                lib = self.aergo_blocks.lib()
+            else:
+                # Wake up on the block where lib > last merged block height
+                # + t_anchor and check settings every 10s meanwhile
+                lib = self.aergo_blocks.wait_lib(next_anchor_height, 10)
+            if lib < next_anchor_height and self.auto_update:
+                self.monitor_settings()
         return lib
 
-    def run(
+    def finalized_height(self) -> int:
+        """ Last irreversible Aergo block """
+        return self.aergo_blocks.lib()
+
+    def prefetch_anchor(
         self,
-    ) -> None:
+        height: int,
+    ) -> Tuple[bytes, Optional[Tuple[bytes, List[bytes], bytes, int]]]:
+        """ Fetch the root and bridge proof of an anchor before the anchor
+        height is finalized. The oracle nonce isn't prefetched: settings
+        updates applied meanwhile increment it.
+        """
+        block = self.hera.get_block_headers(block_height=height, list_size=1)
+        root = block[0].blocks_root_hash
+        bridge_args = None
+        if self.bridge_anchoring and len(root) != 0:
+            bridge_args = self.buildBridgeAnchorArgs(root)
+        return root, bridge_args
+
+    def collect_prefetch(
+        self,
+        lib: int,
+    ) -> Optional[Tuple[int, bytes, Optional[Tuple]]]:
+        """ Return the prefetched anchor height, root and bridge proof if the
+        anchor height is finalized and its root didn't change.
+        """
+        if self.prefetched is None:
+            return None
+        height, prefetch = self.prefetched
+        self.prefetched = None
+        if height > lib:
+            prefetch.cancel()
+            return None
+        try:
+            root, bridge_args = prefetch.result()
+        except Exception:
+            logger.warning(
+                "%s", {"Prefetch failed": json.dumps(traceback.format_exc())})
+            return None
+        # the prefetched block may have been replaced before finalization
+        block = self.hera.get_block_headers(block_height=height, list_size=1)
+        if block[0].blocks_root_hash != root:
+            logger.info("\"Prefetched anchor root changed, fetching again\"")
+            return None
+        return height, root, bridge_args
+
+    def current_anchor(self) -> int:
+        """ Query the last anchor on the oracle and return its height."""
+        oracle_state = query_eth_oracle_state(self.web3, self.eth_oracle)
+        merged_height_from = oracle_state.anchor_height
+        self.t_anchor = oracle_state.t_anchor
+
+        logger.info(
+            "\"Current Aergo -> Eth \u2693 anchor: "
+            "height: %s, root: 0x%s, nonce: %s\"",
+            merged_height_from, oracle_state.anchor_root.hex(),
+            oracle_state.nonce
+        )
+        return merged_height_from
+
+    def anchor(
+        self,
+        merged_height_from: int,
+        next_anchor_height: int,
+    ) -> Tuple[float, bool]:
         """ Gathers signatures from validators, verifies them, and if 2/3 majority
         is acquired, set the new anchored root in eth_bridge.
+        Return how long to sleep before the next anchor and if settings
+        should be monitored meanwhile: the next anchor block is waited for
+        by wait_next_anchor so there is no sleep after an anchor or a skip.
         """
-        logger.info("\"Run Eth proposer\"")
-        while True:  # anchor a new root
-            try:
-                # Get last merge information
-                merged_height_from = \
-                    self.eth_oracle.functions._anchorHeight().call()
-                merged_root_from = \
-                    self.eth_oracle.functions._anchorRoot().call()
-                nonce_to = self.eth_oracle.functions._nonce().call()
-                self.t_anchor = self.eth_oracle.functions._tAnchor().call()
-
+        prefetched = self.collect_prefetch(next_anchor_height)
+        bridge_args = None
+        if prefetched is not None:
+            next_anchor_height, root, bridge_args = prefetched
+
+        if self.eco:
+            # only anchor if a lock / burn event happened on ethereum
+            if self.skip_anchor(merged_height_from, next_anchor_height):
                 logger.info(
-                    "\"Current Aergo -> Eth \u2693 anchor: "
-                    "height: %s, root: 0x%s, nonce: %s\"",
-                    merged_height_from, merged_root_from.hex(), nonce_to
+                    "\"Anchor skipped (no lock/burn/freeze events "
+                    "occured), wait until next anchor time: %ss...\"",
+                    self.t_anchor
                 )
+                return 0, True
+
+        if prefetched is None:
+            # Get root of next anchor to broadcast
+            block = self.hera.get_block_headers(
+                block_height=next_anchor_height, list_size=1)
+            root = block[0].blocks_root_hash
+        if len(root) == 0:
+            logger.info("\"waiting deployment finalization...\"")
+            return 5, False
+
+        if not self.anchoring_on and not self.auto_update:
+            # monitoring
+            logger.info("\"Anchoring height reached waiting for anchor...\"")
+            return 30, False
+
+        if self.anchoring_on:
+            logger.info(
+                "\"\U0001f58b Gathering validator signatures for: "
+                "root: 0x%s, height: %s'\"", root.hex(), next_anchor_height
+            )
 
-                # Wait for the next anchor time
-                next_anchor_height = self.wait_next_anchor(merged_height_from)
-
-                if self.eco:
-                    # only anchor if a lock / burn event happened on ethereum
-                    if self.skip_anchor(
-                            merged_height_from, next_anchor_height):
-                        logger.info(
-                            "\"Anchor skipped (no lock/burn/freeze events "
-                            "occured), wait until next anchor time: %ss...\"",
-                            self.t_anchor
-                        )
-                        self.monitor_settings_and_sleep(self.t_anchor)
-                        continue
-
-                # Get root of next anchor to broadcast
-                block = self.hera.get_block_headers(
-                    block_height=next_anchor_height, list_size=1)
-                root = block[0].blocks_root_hash
-                if len(root) == 0:
-                    logger.info("\"waiting deployment finalization...\"")
-                    time.sleep(5)
-                    continue
-
-                if not self.anchoring_on and not self.auto_update:
-                    # monitoring
-                    logger.info(
-                        "\"Anchoring height reached waiting for anchor...\""
-                    )
-                    time.sleep(30)
-                    continue
-
-                if self.anchoring_on:
-                    logger.info(
-                        "\"\U0001f58b Gathering validator signatures for: "
-                        "root: 0x%s, height: %s'\"", root.hex(),
-                        next_anchor_height
-                    )
-
-                    try:
-                        nonce_to = self.eth_oracle.functions._nonce().call()
-                        sigs, validator_indexes = \
-                            self.val_connect.get_anchor_signatures(
-                                root, next_anchor_height, nonce_to)
-                    except ValidatorMajorityError:
-                        logger.warning(
-                            "\"Failed to gather 2/3 validators signatures, "
-                            "\u23F0 waiting for next anchor...\""
-                        )
-                        self.monitor_settings_and_sleep(self.t_anchor)
-                        continue
-
-                    # don't broadcast if somebody else already did
-                    merged_height = \
-                        self.eth_oracle.functions._anchorHeight().call()
-                    if merged_height + self.t_anchor >= next_anchor_height:
-                        logger.warning(
-                            "\"Not yet anchor time, maybe another proposer "
-                            "already anchored\""
-                        )
-                        self.monitor_settings_and_sleep(
-                            merged_height + self.t_anchor - next_anchor_height)
-                        continue
-
-                    if self.bridge_anchoring:
-                        # broadcast the general state root and relay the bridge
-                        # root with a merkle proof
-                        bridge_state_proto, merkle_proof, bitmap, \
-                            leaf_height = self.buildBridgeAnchorArgs(root)
-                        self.eth_tx.new_state_and_bridge_anchor(
-                            root, next_anchor_height, validator_indexes, sigs,
-                            bridge_state_proto, merkle_proof, bitmap,
-                            leaf_height
-                        )
-                    else:
-                        # only broadcast the general state root
-                        self.eth_tx.new_state_anchor(
-                            root, next_anchor_height, validator_indexes, sigs)
-                    # lower gas price by 10% after every successful anchor
-                    # until min_gas_price is reached
-                    self.eth_tx.change_gas_price(0.9)
-
-                self.monitor_settings_and_sleep(self.t_anchor)
-
-            except requests.exceptions.ConnectionError:
+            try:
+                # read after monitor_settings may have updated the oracle
+                nonce_to = self.eth_oracle.functions._nonce().call()
+                sigs, validator_indexes = \
+                    self.val_connect.get_anchor_signatures(
+                        root, next_anchor_height, nonce_to)
+            except ValidatorMajorityError:
                 logger.warning(
-                    "%s",
-                    {"Web3 ConnectionError":
-                        json.dumps(traceback.format_exc())}
+                    "\"Failed to gather 2/3 validators signatures, "
+                    "\u23F0 retrying soon...\""
                 )
-                time.sleep(self.t_anchor / 10)
-            except herapy.errors.exception.CommunicationException:
+                return self.t_anchor / 10, True
+
+            # don't broadcast if somebody else already did
+            merged_height = self.eth_oracle.functions._anchorHeight().call()
+            if merged_height + self.t_anchor >= next_anchor_height:
                 logger.warning(
-                    "%s",
-                    {"Hera CommunicationException":
-                        json.dumps(traceback.format_exc())}
+                    "\"Not yet anchor time, maybe another proposer "
+                    "already anchored\""
                 )
-                time.sleep(self.t_anchor / 10)
-            except web3.exceptions.TimeExhausted:
-                logger.warning(
-                    "%s",
-                    {"Web3 receipt TimeExhausted":
-                        json.dumps(traceback.format_exc())}
+                return 0, True
+
+            if self.bridge_anchoring:
+                # broadcast the general state root and relay the bridge
+                # root with a merkle proof
+                if bridge_args is None:
+                    bridge_args = self.buildBridgeAnchorArgs(root)
+                bridge_state_proto, merkle_proof, bitmap, leaf_height = \
+                    bridge_args
+                self.eth_tx.new_state_and_bridge_anchor(
+                    root, next_anchor_height, validator_indexes, sigs,
+                    bridge_state_proto, merkle_proof, bitmap, leaf_height
                 )
-                time.sleep(self.t_anchor)
-            except ValueError as e:
-                underpriced_err = "{'code': -32000, 'message': 'replacement " \
-                    "transaction underpriced'}"
-                if str(e) == underpriced_err:
-                    logger.warning(
-                        "%s",
-                        {"Eth tx underpriced":
-                            json.dumps(traceback.format_exc())}
-                    )
-                    self.eth_tx.change_gas_price(1.4)
-                else:
-                    logger.warning(
-                        "%s",
-                        {"UNKNOWN ValueError":
-                         json.dumps(traceback.format_exc())}
-                    )
-                # skip to the next anchor if tx not mined
-                # users will also wait for lower gas fees to transfer assets
-                time.sleep(self.t_anchor)
-            except TypeError:
-                # This TypeError can be raised when the aergo node is
-                # restarting and lib is None
+            else:
+                # only broadcast the general state root
+                self.eth_tx.new_state_anchor(
+                    root, next_anchor_height, validator_indexes, sigs)
+            # lower gas price by 10% after every successful anchor
+            # until min_gas_price is reached
+            self.eth_tx.change_gas_price(0.9)
+
+        return 0, True
+
+    def handle_error(self) -> float:
+        """ Log the exception being handled by the anchoring loop and return
+        how long to wait before retrying.
+        """
+        try:
+            raise
+        except requests.exceptions.ConnectionError:
+            logger.warning(
+                "%s",
+                {"Web3 ConnectionError": json.dumps(traceback.format_exc())}
+            )
+            return self.t_anchor / 10
+        except herapy.errors.exception.CommunicationException:
+            logger.warning(
+                "%s",
+                {"Hera CommunicationException":
+                    json.dumps(traceback.format_exc())}
+            )
+            return self.t_anchor / 10
+        except web3.exceptions.TimeExhausted:
+            logger.warning(
+                "%s",
+                {"Web3 receipt TimeExhausted":
+                    json.dumps(traceback.format_exc())}
+            )
+            return self.t_anchor
+        except ValueError as e:
+            underpriced_err = "{'code': -32000, 'message': 'replacement " \
+                "transaction underpriced'}"
+            if str(e) == underpriced_err:
                 logger.warning(
                     "%s",
-                    {"LIB == None?": json.dumps(traceback.format_exc())}
+                    {"Eth tx underpriced": json.dumps(traceback.format_exc())}
                 )
-                time.sleep(self.t_anchor / 10)
-            except:
+                self.eth_tx.change_gas_price(1.4)
+            else:
                 logger.warning(
                     "%s",
-                    {"UNKNOWN ERROR": json.dumps(traceback.format_exc())}
+                    {"UNKNOWN ValueError": json.dumps(traceback.format_exc())}
                 )
-                time.sleep(self.t_anchor / 10)
-
-    def skip_anchor(self, last_anchor, next_anchor):
-        if next_anchor - last_anchor > 10000:
-            # prevent aergo's too large block range error when anchor on eth
-            # didn't happen for over 10.000 blocks (max block range of
-            # get_events is 10.000) -> happens on 1st wait_next_anchor()
-            last_anchor = next_anchor - 10000
-        lock_events = self.hera.get_events(
-            self.aergo_bridge, "lock", start_block_no=last_anchor,
-            end_block_no=next_anchor
-        )
-        if len(lock_events) > 0:
-            return False
+            # skip to the next anchor if tx not mined
+            # users will also wait for lower gas fees to transfer assets
+            return self.t_anchor
+        except TypeError:
+            # This TypeError can be raised when the aergo node is
+            # restarting and lib is None
+            logger.warning(
+                "%s",
+                {"LIB == None?": json.dumps(traceback.format_exc())}
+            )
+            return self.t_anchor / 10
+        except:
+            logger.warning(
+                "%s",
+                {"UNKNOWN ERROR": json.dumps(traceback.format_exc())}
+            )
+            return self.t_anchor / 10
 
-        burn_events = self.hera.get_events(
-            self.aergo_bridge, "burn", start_block_no=last_anchor,
-            end_block_no=next_anchor
-        )
-        if len(burn_events) > 0:
-            return False
+    def run(
+        self,
+    ) -> None:
+        """ Anchor a new root every t_anchor."""
+        logger.info("\"Run Eth proposer\"")
+        while True:  # anchor a new root
+            try:
+                merged_height_from = self.current_anchor()
+                # Wait for the next anchor time
+                next_anchor_height = self.wait_next_anchor(merged_height_from)
+                sleeping_time, monitor = self.anchor(
+                    merged_height_from, next_anchor_height)
+                if monitor:
+                    self.monitor_settings_and_sleep(sleeping_time)
+                else:
+                    time.sleep(sleeping_time)
+            except:
+                time.sleep(self.handle_error())
 
-        freeze_events = self.hera.get_events(
-            self.aergo_bridge, "freeze", start_block_no=last_anchor,
-            end_block_no=next_anchor
-        )
-        if len(freeze_events) > 0:
-            return False
-        return True
+    def skip_anchor(self, last_anchor, next_anchor):
+        # ranges over the 10.000 blocks limit of get_events (anchor on eth
+        # didn't happen for a long time) are fetched in chunks
+        # events before the last anchor are not needed anymore
+        self.deposit_events.prune(last_anchor)
+        return not self.deposit_events.has_deposits(last_anchor, next_anchor)
 
     def monitor_settings_and_sleep(self, sleeping_time):
         """While sleeping, periodicaly check changes to the config
@@ -389,8 +482,10 @@ class EthProposerClient(threading.Thread):
             start = time.time()
             self.monitor_settings()
             while time.time() - start < sleeping_time - 10:
-                # check the config file every 10 seconds
-                time.sleep(10)
+                # check the config file every 10 seconds or as soon as it
+                # changed
+                self.settings_changed.wait(10)
+                self.settings_changed.clear()
                 self.monitor_settings()
             remaining = sleeping_time - (time.time() - start)
             if remaining > 0:
@@ -398,21 +493,27 @@ class EthProposerClient(threading.Thread):
         else:
             time.sleep(sleeping_time)
 
+    def on_config_change(self, config_data, changed_keys):
+        """Wake up monitor_settings_and_sleep when the config file changed."""
+        logger.info('\"Config file changed: %s\"', sorted(changed_keys))
+        self.settings_changed.set()
+
     def monitor_settings(self):
         """Check if a modification of bridge settings is requested by seeing
         if the config file has been changed and try to update the bridge
         contract (gather 2/3 validators signatures).
 
         """
-        config_data = load_config_data(self.config_file_path)
-        t_anchor = self.eth_oracle.functions._tAnchor().call()
+        config_data = self.config.snapshot()
+        oracle_state = query_eth_oracle_state(self.web3, self.eth_oracle)
+        t_anchor = oracle_state.t_anchor
         config_t_anchor = (config_data['networks'][self.eth_net]['bridges']
                            [self.aergo_net]['t_anchor'])
         if t_anchor != config_t_anchor:
             logger.info(
                 '\"Anchoring periode update requested: %s\"', config_t_anchor)
             self.update_t_anchor(config_t_anchor)
-        t_final = self.eth_oracle.functions._tFinal().call()
+        t_final = oracle_state.t_final
         config_t_final = (config_data['networks'][self.eth_net]['bridges']
                           [self.aergo_net]['t_final'])
         if t_final != config_t_final:
@@ -553,6 +654,16 @@ if __name__ == '__main__':
         help="In eco mode, anchoring will be skipped when lock/burn/freeze "
         "events don't happen in the bridge contract"
     )
+    parser.add_argument(
+        '--validator_timeout', type=float,
+        help='Seconds to wait for a validator signature (default 30)',
+        required=False
+    )
+    parser.add_argument(
+        '--pipeline', dest='pipeline', action='store_true',
+        help='Prefetch the next anchor root and bridge proof while waiting '
+        'for it to be finalized'
+    )
 
     args = parser.parse_args()
 
@@ -564,5 +675,7 @@ if __name__ == '__main__':
         oracle_update=args.oracle_update,
         eth_gas_price=args.eth_gas_price,
         eco=args.eco,
+        validator_timeout=args.validator_timeout,
+        pipeline=args.pipeline,
     )
     proposer.run()
@@ -6,6 +6,10 @@ from typing import (
 from web3 import (
     Web3,
 )
+
+from ethaergo_bridge_operator.connections import (
+    EthAccountSigner,
+)
 import logging
 
 logger = logging.getLogger(__name__)
@@ -17,8 +21,7 @@ class EthTx():
     def __init__(
         self,
         web3: Web3,
-        keystore: str,
-        privkey_pwd: str,
+        signer: EthAccountSigner,
         oracle_addr: str,
         oracle_abi: str,
         eth_gas_price: int,
@@ -36,8 +39,9 @@ class EthTx():
             abi=oracle_abi
         )
 
-        privkey = self.web3.eth.account.decrypt(keystore, privkey_pwd)
-        self.proposer_acct = self.web3.eth.account.from_key(privkey)
+        # the proposer account can be shared with proposers of other bridges
+        self.signer = signer
+        self.proposer_acct = signer.account
 
         logger.info("\"Proposer Address: %s\"", self.proposer_acct.address)
 
@@ -66,16 +70,11 @@ class EthTx():
         ).buildTransaction({
             'chainId': self.web3.eth.chainId,
             'from': self.proposer_acct.address,
-            'nonce': self.web3.eth.getTransactionCount(
-                self.proposer_acct.address
-            ),
             'gas': 500000,
             'gasPrice': self.web3.toWei(self.eth_gas_price, 'gwei')
         })
-        signed = self.proposer_acct.sign_transaction(construct_txn)
-        tx_hash = self.web3.eth.sendRawTransaction(signed.rawTransaction)
-        receipt = self.web3.eth.waitForTransactionReceipt(
-            tx_hash, timeout=300, poll_latency=1)
+        tx_hash = self.signer.send(construct_txn)
+        receipt = self.signer.wait_receipt(tx_hash)
 
         if receipt.status == 1:
             logger.info(
@@ -108,16 +107,11 @@ class EthTx():
         ).buildTransaction({
             'chainId': self.web3.eth.chainId,
             'from': self.proposer_acct.address,
-            'nonce': self.web3.eth.getTransactionCount(
-                self.proposer_acct.address
-            ),
             'gas': 500000,
             'gasPrice': self.web3.toWei(self.eth_gas_price, 'gwei')
         })
-        signed = self.proposer_acct.sign_transaction(construct_txn)
-        tx_hash = self.web3.eth.sendRawTransaction(signed.rawTransaction)
-        receipt = self.web3.eth.waitForTransactionReceipt(
-            tx_hash, timeout=300, poll_latency=1)
+        tx_hash = self.signer.send(construct_txn)
+        receipt = self.signer.wait_receipt(tx_hash)
 
         if receipt.status == 1:
             logger.info(
@@ -139,16 +133,11 @@ class EthTx():
         ).buildTransaction({
             'chainId': self.web3.eth.chainId,
             'from': self.proposer_acct.address,
-            'nonce': self.web3.eth.getTransactionCount(
-                self.proposer_acct.address
-            ),
             'gas': 500000,
             'gasPrice': self.web3.toWei(self.eth_gas_price, 'gwei')
         })
-        signed = self.proposer_acct.sign_transaction(construct_txn)
-        tx_hash = self.web3.eth.sendRawTransaction(signed.rawTransaction)
-        receipt = self.web3.eth.waitForTransactionReceipt(
-            tx_hash, timeout=300, poll_latency=1)
+        tx_hash = self.signer.send(construct_txn)
+        receipt = self.signer.wait_receipt(tx_hash)
 
         if receipt.status == 1:
             logger.info("\"\U0001f58b Set new validators update success\"")
@@ -168,16 +157,11 @@ class EthTx():
         ).buildTransaction({
             'chainId': self.web3.eth.chainId,
             'from': self.proposer_acct.address,
-            'nonce': self.web3.eth.getTransactionCount(
-                self.proposer_acct.address
-            ),
             'gas': 200000,
             'gasPrice': self.web3.toWei(self.eth_gas_price, 'gwei')
         })
-        signed = self.proposer_acct.sign_transaction(construct_txn)
-        tx_hash = self.web3.eth.sendRawTransaction(signed.rawTransaction)
-        receipt = self.web3.eth.waitForTransactionReceipt(
-            tx_hash, timeout=300, poll_latency=1)
+        tx_hash = self.signer.send(construct_txn)
+        receipt = self.signer.wait_receipt(tx_hash)
 
         if receipt.status == 1:
             logger.info("\"\u231B tAnchorUpdate success\"")
@@ -197,16 +181,11 @@ class EthTx():
         ).buildTransaction({
             'chainId': self.web3.eth.chainId,
             'from': self.proposer_acct.address,
-            'nonce': self.web3.eth.getTransactionCount(
-                self.proposer_acct.address
-            ),
             'gas': 200000,
             'gasPrice': self.web3.toWei(self.eth_gas_price, 'gwei')
         })
-        signed = self.proposer_acct.sign_transaction(construct_txn)
-        tx_hash = self.web3.eth.sendRawTransaction(signed.rawTransaction)
-        receipt = self.web3.eth.waitForTransactionReceipt(
-            tx_hash, timeout=300, poll_latency=1)
+        tx_hash = self.signer.send(construct_txn)
+        receipt = self.signer.wait_receipt(tx_hash)
 
         if receipt.status == 1:
             logger.info("\"\u231B tFinalUpdate success\"")
@@ -238,16 +217,11 @@ class EthTx():
         ).buildTransaction({
             'chainId': self.web3.eth.chainId,
             'from': self.proposer_acct.address,
-            'nonce': self.web3.eth.getTransactionCount(
-                self.proposer_acct.address
-            ),
             'gas': 500000,
             'gasPrice': self.web3.toWei(self.eth_gas_price, 'gwei')
         })
-        signed = self.proposer_acct.sign_transaction(construct_txn)
-        tx_hash = self.web3.eth.sendRawTransaction(signed.rawTransaction)
-        receipt = self.web3.eth.waitForTransactionReceipt(
-            tx_hash, timeout=300, poll_latency=1)
+        tx_hash = self.signer.send(construct_txn)
+        receipt = self.signer.wait_receipt(tx_hash)
 
         if receipt.status == 1:
             logger.info("\"\U0001f58b Set new oracle update success\"")
@@ -2,8 +2,8 @@ from functools import (
     partial,
 )
 import grpc
-from multiprocessing.dummy import (
-    Pool,
+from queue import (
+    Queue,
 )
 
 from typing import (
@@ -11,6 +11,7 @@ from typing import (
     Tuple,
     List,
     Any,
+    Optional,
 )
 
 from web3 import (
@@ -32,6 +33,9 @@ from ethaergo_bridge_operator.bridge_operator_pb2 import (
     NewTempo,
     NewOracle,
 )
+from ethaergo_bridge_operator.connections import (
+    ProviderPool,
+)
 from ethaergo_bridge_operator.proposer.exceptions import (
     ValidatorMajorityError,
 )
@@ -52,9 +56,23 @@ class EthValConnect():
         web3: Web3,
         oracle_addr: str,
         oracle_abi: str,
+        validator_timeout: float = 30,
+        providers: ProviderPool = None,
+        bridge_id: str = None,
     ):
         self.web3 = web3
         self.config_data = config_data
+        # deadline of each validator rpc so a hanging validator cannot
+        # hold the proposer once the other validators have answered
+        self.validator_timeout = validator_timeout
+        # channels to validators can be shared with proposers of other
+        # bridges, requests then name the bridge they are for.
+        if providers is None:
+            providers = ProviderPool()
+        self.providers = providers
+        self.metadata = None
+        if bridge_id is not None:
+            self.metadata = (('bridge', bridge_id),)
 
         self.eth_oracle = self.web3.eth.contract(
             address=oracle_addr,
@@ -77,11 +95,10 @@ class EthValConnect():
                 "when starting (current validators connection needed to make "\
                 "updates).\nExpected validators: {}".format(current_validators)
             ip = validator['ip']
-            channel = grpc.insecure_channel(ip)
+            channel = self.providers.validator_channel(ip)
             stub = BridgeOperatorStub(channel)
             self.channels.append(channel)
             self.stubs.append(stub)
-        self.pool = Pool(len(self.stubs))
 
     def get_anchor_signatures(
         self,
@@ -101,26 +118,69 @@ class EthValConnect():
             root=root, height=merge_height, destination_nonce=nonce
         )
 
-        # get validator signatures and verify sig in worker
-        validator_indexes = [i for i in range(len(self.stubs))]
-        worker = partial(
-            self.get_signature_worker, "GetAergoAnchorSignature", anchor, h)
-        approvals = self.pool.map(worker, validator_indexes)
+        # get validator signatures and verify them as they arrive
+        approvals = self.gather_approvals(
+            "GetAergoAnchorSignature", anchor, h)
 
         sigs, validator_indexes = self.extract_signatures(approvals)
 
         return sigs, validator_indexes
 
-    def get_signature_worker(
+    def gather_approvals(
         self,
         rpc_service: str,
         request,
         h: bytes,
-        idx: int
-    ):
+    ) -> List[Optional[Any]]:
+        """ Query all validators in parallel and return as soon as 2/3 of
+        them gave a valid signature.
+        Rpcs still pending when the quorum is reached are cancelled so a slow
+        validator doesn't delay the anchor.
+        """
+        total_validators = len(self.stubs)
+        two_thirds = ((total_validators * 2) // 3
+                      + ((total_validators * 2) % 3 > 0))
+        approvals: List[Optional[Any]] = [None] * total_validators
+        answered: Queue = Queue()
+        calls = []
+        for idx, stub in enumerate(self.stubs):
+            call = getattr(stub, rpc_service).future(
+                request, timeout=self.validator_timeout,
+                metadata=self.metadata
+            )
+            call.add_done_callback(partial(self._on_answer, answered, idx))
+            calls.append(call)
+        nb_valid = 0
+        try:
+            # every call completes (answer, error or deadline) so this
+            # doesn't block forever
+            for _ in range(total_validators):
+                idx, call = answered.get()
+                approval = self.verify_approval(h, idx, call)
+                if approval is None:
+                    continue
+                approvals[idx] = approval
+                nb_valid += 1
+                if nb_valid >= two_thirds:
+                    break
+        finally:
+            for call in calls:
+                call.cancel()
+        return approvals
+
+    @staticmethod
+    def _on_answer(answered: Queue, idx: int, call) -> None:
+        answered.put((idx, call))
+
+    def verify_approval(
+        self,
+        h: bytes,
+        idx: int,
+        call,
+    ) -> Optional[Any]:
         """ Get a validator's (index) signature and verify it"""
         try:
-            approval = getattr(self.stubs[idx], rpc_service)(request)
+            approval = call.result()
         except grpc.RpcError as e:
             logger.warning(
                 "\"Failed to connect to validator %s (RpcError: %s)\"", idx,
@@ -176,13 +236,9 @@ class EthValConnect():
             + self.eth_id \
             + bytes("V", 'utf-8')
         h = keccak(msg_bytes)
-        # get validator signatures and verify sig in worker
-        validator_indexes = [i for i in range(len(self.stubs))]
-        worker = partial(
-            self.get_signature_worker, "GetAergoValidatorsSignature",
-            new_validators_msg, h
-        )
-        approvals = self.pool.map(worker, validator_indexes)
+        # get validator signatures and verify them as they arrive
+        approvals = self.gather_approvals(
+            "GetAergoValidatorsSignature", new_validators_msg, h)
         sigs, validator_indexes = self.extract_signatures(approvals)
         return sigs, validator_indexes
 
@@ -196,12 +252,8 @@ class EthValConnect():
             + self.eth_id \
             + bytes(tempo_id, 'utf-8')
         h = keccak(msg_bytes)
-        validator_indexes = [i for i in range(len(self.stubs))]
-        worker = partial(
-            self.get_signature_worker, rpc_service,
-            new_tempo_msg, h
-        )
-        approvals = self.pool.map(worker, validator_indexes)
+        # get validator signatures and verify them as they arrive
+        approvals = self.gather_approvals(rpc_service, new_tempo_msg, h)
         sigs, validator_indexes = self.extract_signatures(approvals)
         return sigs, validator_indexes
 
@@ -215,13 +267,11 @@ class EthValConnect():
         self.stubs = []
         for validator in self.config_data['validators']:
             ip = validator['ip']
-            channel = grpc.insecure_channel(ip)
+            channel = self.providers.validator_channel(ip)
             stub = BridgeOperatorStub(channel)
             self.channels.append(channel)
             self.stubs.append(stub)
 
-        self.pool = Pool(len(self.stubs))
-
     def get_new_oracle_signatures(self, oracle):
         """Request approvals of validators for the new oracle."""
         nonce = self.eth_oracle.functions._nonce().call()
@@ -233,12 +283,8 @@ class EthValConnect():
             + self.eth_id \
             + bytes("O", 'utf-8')
         h = keccak(msg_bytes)
-        # get validator signatures and verify sig in worker
-        validator_indexes = [i for i in range(len(self.stubs))]
-        worker = partial(
-            self.get_signature_worker, "GetAergoOracleSignature",
-            new_oracle_msg, h
-        )
-        approvals = self.pool.map(worker, validator_indexes)
+        # get validator signatures and verify them as they arrive
+        approvals = self.gather_approvals(
+            "GetAergoOracleSignature", new_oracle_msg, h)
         sigs, validator_indexes = self.extract_signatures(approvals)
         return sigs, validator_indexes
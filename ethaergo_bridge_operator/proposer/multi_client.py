@@ -0,0 +1,209 @@
+import argparse
+from typing import (
+    List,
+    Tuple,
+)
+
+from ethaergo_bridge_operator.config_watcher import (
+    get_config_watcher,
+)
+from ethaergo_bridge_operator.op_utils import (
+    bridge_id,
+    list_bridge_pairs,
+)
+from ethaergo_bridge_operator.proposer.eth.client import (
+    EthProposerClient
+)
+from ethaergo_bridge_operator.proposer.aergo.client import (
+    AergoProposerClient
+)
+from ethaergo_bridge_operator.proposer.async_runtime import (
+    AsyncProposerRuntime
+)
+from ethaergo_bridge_operator.connections import (
+    ProviderPool
+)
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class MultiBridgeProposerClient:
+    """ The MultiBridgeProposerClient anchors several bridge pairs in one
+    process. Proposers of all pairs share provider connections and gRPC
+    channels to the validators, and run on a single asyncio event loop.
+
+    Bridge pairs are all the aergo/ethereum networks whose bridges are
+    registered in both directions in the config file, unless a list of
+    (aergo_net, eth_net) pairs is given.
+    The Ethereum block time of each pair is taken from the 'block_time' key
+    of the ethereum network in the config file, or eth_block_time.
+    """
+
+    def __init__(
+        self,
+        config_file_path: str,
+        eth_block_time: int = None,
+        bridges: List[Tuple[str, str]] = None,
+        aergo_gas_price: int = None,
+        eth_gas_price: int = None,
+        privkey_name: str = None,
+        privkey_pwd: str = None,
+        anchoring_on: bool = False,
+        auto_update: bool = False,
+        oracle_update: bool = False,
+        bridge_anchoring: bool = True,
+        root_path: str = './',
+        eco: bool = False,
+        eth_eco: bool = False,
+        validator_timeout: float = None,
+        pipeline: bool = False,
+        max_workers: int = None,
+        metrics_interval: float = 60,
+        event_index_dir: str = None,
+    ) -> None:
+        config_data = get_config_watcher(config_file_path).snapshot()
+        if bridges is None:
+            bridges = list_bridge_pairs(config_data)
+        if len(bridges) == 0:
+            raise ValueError("No bridge pair to anchor in config file")
+        self.providers = ProviderPool()
+        self.proposers: List[
+            Tuple[EthProposerClient, AergoProposerClient]] = []
+        for aergo_net, eth_net in bridges:
+            pair_block_time = config_data['networks'][eth_net].get(
+                'block_time', eth_block_time)
+            if pair_block_time is None:
+                raise ValueError(
+                    "Missing Ethereum block time for {}".format(eth_net))
+            logger.info("\"Start proposers of %s\"",
+                        bridge_id(aergo_net, eth_net))
+            eth_proposer = EthProposerClient(
+                config_file_path, aergo_net, eth_net, privkey_name,
+                privkey_pwd, anchoring_on, auto_update, oracle_update,
+                root_path, eth_gas_price, bridge_anchoring, eco or eth_eco,
+                validator_timeout, pipeline, self.providers,
+                event_index_dir
+            )
+            aergo_proposer = AergoProposerClient(
+                config_file_path, aergo_net, eth_net, pair_block_time,
+                privkey_name, privkey_pwd, anchoring_on, auto_update,
+                oracle_update, aergo_gas_price, bridge_anchoring, root_path,
+                eco, validator_timeout, pipeline, self.providers,
+                event_index_dir
+            )
+            # name proposers after their pair in logs and metrics
+            eth_proposer.name = "{} -> {}".format(aergo_net, eth_net)
+            aergo_proposer.name = "{} <- {}".format(aergo_net, eth_net)
+            self.proposers.append((eth_proposer, aergo_proposer))
+        self.runtime = AsyncProposerRuntime(
+            [p for pair in self.proposers for p in pair],
+            max_workers=max_workers, metrics_interval=metrics_interval
+        )
+
+    def run(self):
+        self.runtime.run()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Start proposers of several bridge pairs on Ethereum '
+        'and Aergo.')
+    # Add arguments
+    parser.add_argument(
+        '-c', '--config_file_path', type=str, help='Path to config.json',
+        required=True
+    )
+    parser.add_argument(
+        '--bridge', nargs=2, action='append', metavar=('AERGO', 'ETH'),
+        help='Names of the Aergo and Ethereum networks of a bridge to anchor '
+        '(repeat for each bridge, default: all bridges in config file)',
+        required=False
+    )
+    parser.add_argument(
+        '--eth_block_time', type=int,
+        help='Average Ethereum block time of networks without block_time '
+        'in config file', required=False
+    )
+    parser.add_argument(
+        '--privkey_name', type=str, help='Name of account in config file '
+        'to sign anchors', required=False
+    )
+    parser.add_argument(
+        '--privkey_pwd', type=str, help='Password to decrypt privkey_name'
+        '(Eth and Aergo Keys need the same password)', required=False
+    )
+    parser.add_argument(
+        '--anchoring_on', dest='anchoring_on', action='store_true',
+        help='Enable anchoring (can be diseabled when wanting to only update '
+             'settings)'
+    )
+    parser.add_argument(
+        '--auto_update', dest='auto_update', action='store_true',
+        help='Update bridge contract when settings change in config file'
+    )
+    parser.add_argument(
+        '--oracle_update', dest='oracle_update', action='store_true',
+        help='Update bridge contract when validators or oracle addr '
+             'change in config file'
+    )
+    parser.add_argument(
+        '--eth_gas_price', type=int,
+        help='Gas price (gWei) to use in transactions', required=False
+    )
+    parser.add_argument(
+        '--aergo_gas_price', type=int,
+        help='Gas price to use in transactions', required=False
+    )
+    parser.add_argument(
+        '--eco', dest='eco', action='store_true',
+        help="In eco mode, anchoring will be skipped when lock/burn/freeze "
+        "events don't happen in the bridge contracts"
+    )
+    parser.add_argument(
+        '--eth_eco', dest='eth_eco', action='store_true',
+        help="In eco mode, anchoring on Ethereum will be skipped when "
+        "lock/burn/freeze events don't happen in the bridge contracts on Aergo"
+    )
+    parser.add_argument(
+        '--validator_timeout', type=float,
+        help='Seconds to wait for a validator signature (default 30)',
+        required=False
+    )
+    parser.add_argument(
+        '--pipeline', dest='pipeline', action='store_true',
+        help='Prefetch the next anchor root and bridge proof while waiting '
+        'for it to be finalized'
+    )
+    parser.add_argument(
+        '--metrics_interval', type=float, default=60,
+        help='Seconds between logs of per bridge metrics (default 60)',
+        required=False
+    )
+    parser.add_argument(
+        '--event_index_dir', type=str, required=False,
+        help='Directory where checkpoints of the bridge deposit events used '
+        'in eco mode are saved (default: not saved)'
+    )
+
+    args = parser.parse_args()
+    bridges = None
+    if args.bridge is not None:
+        bridges = [tuple(pair) for pair in args.bridge]
+
+    proposer = MultiBridgeProposerClient(
+        args.config_file_path, args.eth_block_time, bridges,
+        args.aergo_gas_price, args.eth_gas_price,
+        privkey_name=args.privkey_name,
+        privkey_pwd=args.privkey_pwd,
+        anchoring_on=args.anchoring_on,
+        auto_update=args.auto_update,
+        oracle_update=args.oracle_update,
+        eco=args.eco,
+        eth_eco=args.eth_eco,
+        validator_timeout=args.validator_timeout,
+        pipeline=args.pipeline,
+        event_index_dir=args.event_index_dir,
+        metrics_interval=args.metrics_interval,
+    )
+    proposer.run()
@@ -1,14 +1,10 @@
 from typing import (
     Dict,
 )
-import aergo.herapy as herapy
-from web3 import (
-    Web3,
-)
-from web3.middleware import (
-    geth_poa_middleware,
-)
 
+from ethaergo_bridge_operator.connections import (
+    ProviderPool,
+)
 from ethaergo_bridge_operator.op_utils import (
     query_aergo_tempo,
     query_eth_tempo,
@@ -28,18 +24,17 @@ def check_bridge_status(
     aergo_net: str,
     eth_net: str,
     auto_update: bool,
-    oracle_update: bool
+    oracle_update: bool,
+    providers: ProviderPool = None,
 ):
     logger.info("\"Connect Aergo and Ethereum\"")
-    hera = herapy.Aergo()
-    hera.connect(config_data['networks'][aergo_net]['ip'])
+    if providers is None:
+        providers = ProviderPool()
+    hera = providers.aergo(config_data['networks'][aergo_net]['ip'])
 
     ip = config_data['networks'][eth_net]['ip']
-    web3 = Web3(Web3.HTTPProvider(ip))
     eth_poa = config_data['networks'][eth_net]['isPOA']
-    if eth_poa:
-        web3.middleware_onion.inject(geth_poa_middleware, layer=0)
-    assert web3.isConnected()
+    web3 = providers.web3(ip, eth_poa)
 
     # remember bridge contracts
     # eth bridge
@@ -1,19 +1,32 @@
+from concurrent import (
+    futures,
+)
 from typing import (
+    Dict,
     Optional,
-    List
+    List,
+    Tuple,
 )
 
-from ethaergo_bridge_operator.op_utils import (
-    load_config_data,
+from ethaergo_bridge_operator.config_watcher import (
+    get_config_watcher,
+)
+from ethaergo_bridge_operator.connections import (
+    ProviderPool,
 )
 from ethaergo_bridge_operator.validator.single_data_source import (
-    SingleDataSource
+    OracleCache,
+    SingleDataSource,
 )
 
 
 class DataSources():
     """ Queries validator apis for each pair of providers.
     This gives extra security in case a node is compromised.
+    All pairs of providers are queried concurrently and a check is valid when
+    providers_quorum of them agree (all of them by default).
+    Provider connections and oracle caches (by pair of provider ips) can be
+    shared with the data sources of other bridges.
 
     """
     def __init__(
@@ -22,9 +35,14 @@ class DataSources():
         aergo_net: str,
         eth_net: str,
         root_path: str,
+        provider_timeout: float = None,
+        providers_quorum: int = None,
+        providers: ProviderPool = None,
+        caches: Dict[Tuple[str, str], OracleCache] = None,
     ) -> None:
         self.config_file_path = config_file_path
-        config_data = load_config_data(self.config_file_path)
+        self.config = get_config_watcher(config_file_path)
+        config_data = self.config.snapshot()
         self.aergo_net = aergo_net
         self.eth_net = eth_net
         self.data_sources: List[SingleDataSource] = []
@@ -36,131 +54,160 @@ class DataSources():
             aergo_providers = [config_data['networks'][aergo_net]['ip']]
             eth_providers = [config_data['networks'][eth_net]['ip']]
 
+        if providers is None:
+            providers = ProviderPool()
+        if caches is None:
+            caches = {}
         for i, aergo_ip in enumerate(aergo_providers):
             eth_ip = eth_providers[i]
+            cache = caches.setdefault((aergo_ip, eth_ip), OracleCache())
             self.data_sources.append(
                 SingleDataSource(
                     config_file_path, aergo_net, eth_net, aergo_ip, eth_ip,
-                    root_path
+                    root_path, providers, cache
                 )
             )
+        if providers_quorum is None:
+            providers_quorum = len(self.data_sources)
+        assert 0 < providers_quorum <= len(self.data_sources), \
+            "providers_quorum must be between 1 and the number of providers"
+        self.providers_quorum = providers_quorum
+        self.provider_timeout = provider_timeout
+        # the validator grpc server handles up to 10 requests concurrently
+        self.executor = futures.ThreadPoolExecutor(
+            max_workers=10 * len(self.data_sources))
+
+    def validate(
+        self,
+        check: str,
+        *args,
+    ) -> Optional[str]:
+        """ Run a SingleDataSource check on all providers concurrently.
+        Return None as soon as providers_quorum of them validated the check,
+        or the first error as soon as the quorum cannot be reached anymore.
+        A provider that fails or doesn't answer within provider_timeout
+        counts as a disagreement.
+        """
+        pending = [
+            self.executor.submit(getattr(ds, check), *args)
+            for ds in self.data_sources
+        ]
+        max_errors = len(self.data_sources) - self.providers_quorum
+        nb_valid, nb_errors = 0, 0
+        first_err_msg = None
+        try:
+            for future in futures.as_completed(
+                pending, timeout=self.provider_timeout
+            ):
+                try:
+                    err_msg = future.result()
+                except Exception as e:
+                    err_msg = "Data source error: {}".format(e)
+                if err_msg is None:
+                    nb_valid += 1
+                    if nb_valid >= self.providers_quorum:
+                        return None
+                    continue
+                if first_err_msg is None:
+                    first_err_msg = err_msg
+                nb_errors += 1
+                if nb_errors > max_errors:
+                    return first_err_msg
+        except futures.TimeoutError:
+            if first_err_msg is not None:
+                return first_err_msg
+            return "Data source timeout after {}s".format(
+                self.provider_timeout)
+        finally:
+            for future in pending:
+                future.cancel()
+        return first_err_msg
+
+    def cache_stats(self) -> Dict[str, int]:
+        """ Oracle state cache hits and misses summed over all providers.
+        Shared caches also count the queries of other bridges.
+        """
+        stats = {'hits': 0, 'misses': 0}
+        caches = {id(ds.cache): ds.cache for ds in self.data_sources}
+        for cache in caches.values():
+            for key, count in cache.stats().items():
+                stats[key] += count
+        return stats
 
     def is_valid_aergo_anchor(
         self,
         anchor,
     ) -> Optional[str]:
-        for ds in self.data_sources:
-            err_msg = ds.is_valid_aergo_anchor(anchor)
-            if err_msg is not None:
-                return err_msg
-        return None
+        return self.validate("is_valid_aergo_anchor", anchor)
 
     def is_valid_eth_anchor(
         self,
         anchor
     ) -> Optional[str]:
-        for ds in self.data_sources:
-            err_msg = ds.is_valid_eth_anchor(anchor)
-            if err_msg is not None:
-                return err_msg
-        return None
+        return self.validate("is_valid_eth_anchor", anchor)
 
     def is_valid_eth_t_anchor(
         self,
         tempo_msg,
     ) -> Optional[str]:
-        config_data = load_config_data(self.config_file_path)
+        config_data = self.config.snapshot()
         config_tempo = (config_data['networks'][self.aergo_net]['bridges']
                         [self.eth_net]["t_anchor"])
-        for ds in self.data_sources:
-            err_msg = ds.is_valid_eth_t_anchor(config_tempo, tempo_msg)
-            if err_msg is not None:
-                return err_msg
-        return None
+        return self.validate("is_valid_eth_t_anchor", config_tempo, tempo_msg)
 
     def is_valid_eth_t_final(
         self,
         tempo_msg,
     ) -> Optional[str]:
-        config_data = load_config_data(self.config_file_path)
+        config_data = self.config.snapshot()
         config_tempo = (config_data['networks'][self.aergo_net]['bridges']
                         [self.eth_net]["t_final"])
-        for ds in self.data_sources:
-            err_msg = ds.is_valid_eth_t_final(config_tempo, tempo_msg)
-            if err_msg is not None:
-                return err_msg
-        return None
+        return self.validate("is_valid_eth_t_final", config_tempo, tempo_msg)
 
     def is_valid_aergo_t_anchor(
         self,
         tempo_msg,
     ) -> Optional[str]:
-        config_data = load_config_data(self.config_file_path)
+        config_data = self.config.snapshot()
         config_tempo = (config_data['networks'][self.eth_net]['bridges']
                         [self.aergo_net]["t_anchor"])
-        for ds in self.data_sources:
-            err_msg = ds.is_valid_aergo_t_anchor(config_tempo, tempo_msg)
-            if err_msg is not None:
-                return err_msg
-        return None
+        return self.validate(
+            "is_valid_aergo_t_anchor", config_tempo, tempo_msg)
 
     def is_valid_aergo_t_final(
         self,
         tempo_msg,
     ) -> Optional[str]:
-        config_data = load_config_data(self.config_file_path)
+        config_data = self.config.snapshot()
         config_tempo = (config_data['networks'][self.eth_net]['bridges']
                         [self.aergo_net]["t_final"])
-        for ds in self.data_sources:
-            err_msg = ds.is_valid_aergo_t_final(config_tempo, tempo_msg)
-            if err_msg is not None:
-                return err_msg
-        return None
+        return self.validate("is_valid_aergo_t_final", config_tempo, tempo_msg)
 
     def is_valid_eth_validators(self, val_msg):
-        config_data = load_config_data(self.config_file_path)
+        config_data = self.config.snapshot()
         config_vals = [val['addr'] for val in config_data['validators']]
-        for ds in self.data_sources:
-            err_msg = ds.is_valid_eth_validators(config_vals, val_msg)
-            if err_msg is not None:
-                return err_msg
-        return None
+        return self.validate("is_valid_eth_validators", config_vals, val_msg)
 
     def is_valid_aergo_validators(self, val_msg):
-        config_data = load_config_data(self.config_file_path)
+        config_data = self.config.snapshot()
         config_vals = [val['eth-addr'] for val in config_data['validators']]
-        for ds in self.data_sources:
-            err_msg = ds.is_valid_aergo_validators(config_vals, val_msg)
-            if err_msg is not None:
-                return err_msg
-        return None
+        return self.validate("is_valid_aergo_validators", config_vals, val_msg)
 
     def is_valid_unfreeze_fee(self, new_fee_msg):
-        config_data = load_config_data(self.config_file_path)
+        config_data = self.config.snapshot()
         config_fee = (config_data['networks'][self.aergo_net]['bridges']
                       [self.eth_net]['unfreeze_fee'])
-        for ds in self.data_sources:
-            err_msg = ds.is_valid_unfreeze_fee(config_fee, new_fee_msg)
-            if err_msg is not None:
-                return err_msg
-        return None
+        return self.validate("is_valid_unfreeze_fee", config_fee, new_fee_msg)
 
     def is_valid_aergo_oracle(self, oracle_msg):
-        config_data = load_config_data(self.config_file_path)
+        config_data = self.config.snapshot()
         config_oracle = (config_data['networks'][self.eth_net]['bridges']
                          [self.aergo_net]['oracle'])
-        for ds in self.data_sources:
-            err_msg = ds.is_valid_aergo_oracle(config_oracle, oracle_msg)
-            if err_msg is not None:
-                return err_msg
-        return None
+        return self.validate(
+            "is_valid_aergo_oracle", config_oracle, oracle_msg)
 
     def is_valid_eth_oracle(self, oracle_msg):
-        config_data = load_config_data(self.config_file_path)
+        config_data = self.config.snapshot()
         config_oracle = (config_data['networks'][self.aergo_net]['bridges']
                          [self.eth_net]['oracle'])
-        for ds in self.data_sources:
-            err_msg = ds.is_valid_eth_oracle(config_oracle, oracle_msg)
-            if err_msg is not None:
-                return err_msg
-        return None
+        return self.validate("is_valid_eth_oracle", config_oracle, oracle_msg)
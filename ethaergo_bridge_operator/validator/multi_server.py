@@ -0,0 +1,182 @@
+import argparse
+from concurrent import (
+    futures,
+)
+import grpc
+import time
+from typing import (
+    Dict,
+    List,
+    Tuple,
+)
+
+from ethaergo_bridge_operator.bridge_operator_pb2_grpc import (
+    add_BridgeOperatorServicer_to_server,
+)
+from ethaergo_bridge_operator.config_watcher import (
+    get_config_watcher,
+)
+from ethaergo_bridge_operator.connections import (
+    ProviderPool,
+)
+from ethaergo_bridge_operator.op_utils import (
+    bridge_id,
+    list_bridge_pairs,
+)
+from ethaergo_bridge_operator.validator.multi_service import (
+    MultiBridgeValidatorService,
+)
+from ethaergo_bridge_operator.validator.single_data_source import (
+    OracleCache,
+)
+from ethaergo_bridge_operator.validator.validator_service import (
+    ValidatorService,
+    load_signers,
+)
+import logging
+
+logger = logging.getLogger(__name__)
+
+_ONE_DAY_IN_SECONDS = 60 * 60 * 24
+
+
+class MultiBridgeValidatorServer:
+    """ Validates several bridge pairs on the validator's port.
+
+    The validator keys are decrypted once, and provider connections and
+    oracle state caches are shared by the services of all bridges using the
+    same providers. Bridge pairs are all the aergo/ethereum networks whose
+    bridges are registered in both directions in the config file, unless a
+    list of (aergo_net, eth_net) pairs is given.
+    """
+
+    def __init__(
+        self,
+        config_file_path: str,
+        bridges: List[Tuple[str, str]] = None,
+        privkey_name: str = None,
+        privkey_pwd: str = None,
+        validator_index: int = 0,
+        anchoring_on: bool = False,
+        auto_update: bool = False,
+        oracle_update: bool = False,
+        root_path: str = './',
+        provider_timeout: float = None,
+        providers_quorum: int = None,
+        default_bridge: str = None,
+        max_workers: int = 10,
+    ) -> None:
+        config_data = get_config_watcher(config_file_path).snapshot()
+        if bridges is None:
+            bridges = list_bridge_pairs(config_data)
+        if len(bridges) == 0:
+            raise ValueError("No bridge pair to validate in config file")
+        providers = ProviderPool()
+        caches: Dict[Tuple[str, str], OracleCache] = {}
+        signers = load_signers(
+            config_data, root_path, privkey_name, privkey_pwd)
+        services = {}
+        for aergo_net, eth_net in bridges:
+            logger.info("\"Start validating %s\"",
+                        bridge_id(aergo_net, eth_net))
+            services[bridge_id(aergo_net, eth_net)] = ValidatorService(
+                config_file_path, aergo_net, eth_net, privkey_name,
+                privkey_pwd, validator_index, anchoring_on, auto_update,
+                oracle_update, root_path, provider_timeout, providers_quorum,
+                providers, caches, signers
+            )
+        self.service = MultiBridgeValidatorService(services, default_bridge)
+        self.server = grpc.server(
+            futures.ThreadPoolExecutor(max_workers=max_workers))
+        add_BridgeOperatorServicer_to_server(self.service, self.server)
+        self.server.add_insecure_port(config_data['validators']
+                                      [validator_index]['ip'])
+        self.validator_index = validator_index
+
+    def run(self):
+        self.server.start()
+        logger.info("\"server %s started\"", self.validator_index)
+        try:
+            while True:
+                time.sleep(_ONE_DAY_IN_SECONDS)
+        except KeyboardInterrupt:
+            logger.info("Shutting down validator")
+            self.shutdown()
+
+    def shutdown(self):
+        self.server.stop(0)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Start a validator of several bridges on Ethereum and '
+        'Aergo.')
+    # Add arguments
+    parser.add_argument(
+        '-c', '--config_file_path', type=str, help='Path to config.json',
+        required=True)
+    parser.add_argument(
+        '--bridge', nargs=2, action='append', metavar=('AERGO', 'ETH'),
+        help='Names of the Aergo and Ethereum networks of a bridge to '
+        'validate (repeat for each bridge, default: all bridges in config '
+        'file)', required=False
+    )
+    parser.add_argument(
+        '--default_bridge', nargs=2, metavar=('AERGO', 'ETH'),
+        help='Bridge validated for requests that don\'t name one '
+        '(default: the only bridge if a single one is served)',
+        required=False
+    )
+    parser.add_argument(
+        '-i', '--validator_index', type=int, required=True,
+        help='Index of the validator in the ordered list of validators')
+    parser.add_argument(
+        '--privkey_name', type=str, help='Name of account in config file '
+        'to sign anchors', required=False)
+    parser.add_argument(
+        '--anchoring_on', dest='anchoring_on', action='store_true',
+        help='Enable anchoring (can be diseabled when wanting to only update '
+             'settings)'
+    )
+    parser.add_argument(
+        '--auto_update', dest='auto_update', action='store_true',
+        help='Update bridge contract when settings change in config file')
+    parser.add_argument(
+        '--oracle_update', dest='oracle_update', action='store_true',
+        help='Update bridge contract when validators or oracle addr '
+             'change in config file'
+    )
+    parser.add_argument(
+        '--provider_timeout', type=float, required=False,
+        help='Seconds to wait for each pair of providers to validate a request'
+    )
+    parser.add_argument(
+        '--providers_quorum', type=int, required=False,
+        help='Number of provider pairs that must agree to validate a request '
+             '(default all)'
+    )
+    parser.add_argument(
+        '--max_workers', type=int, default=10, required=False,
+        help='Number of requests handled concurrently (default 10)'
+    )
+    args = parser.parse_args()
+    bridges = None
+    if args.bridge is not None:
+        bridges = [tuple(pair) for pair in args.bridge]
+    default_bridge = None
+    if args.default_bridge is not None:
+        default_bridge = bridge_id(*args.default_bridge)
+
+    validator = MultiBridgeValidatorServer(
+        args.config_file_path, bridges,
+        privkey_name=args.privkey_name,
+        validator_index=args.validator_index,
+        anchoring_on=args.anchoring_on,
+        auto_update=args.auto_update,
+        oracle_update=args.oracle_update,
+        provider_timeout=args.provider_timeout,
+        providers_quorum=args.providers_quorum,
+        default_bridge=default_bridge,
+        max_workers=args.max_workers,
+    )
+    validator.run()
@@ -0,0 +1,78 @@
+from typing import (
+    Dict,
+)
+
+from ethaergo_bridge_operator.bridge_operator_pb2_grpc import (
+    BridgeOperatorServicer,
+)
+from ethaergo_bridge_operator.bridge_operator_pb2 import (
+    Approval,
+)
+from ethaergo_bridge_operator.validator.validator_service import (
+    ValidatorService,
+)
+
+# rpcs of the BridgeOperator service, all of them return an Approval
+_APPROVAL_RPCS = [
+    'GetEthAnchorSignature',
+    'GetAergoAnchorSignature',
+    'GetEthTAnchorSignature',
+    'GetEthTFinalSignature',
+    'GetAergoTAnchorSignature',
+    'GetAergoTFinalSignature',
+    'GetEthValidatorsSignature',
+    'GetAergoValidatorsSignature',
+    'GetAergoUnfreezeFeeSignature',
+    'GetEthOracleSignature',
+    'GetAergoOracleSignature',
+]
+
+
+class MultiBridgeValidatorService(BridgeOperatorServicer):
+    """ Serves the validator services of several bridges on one grpc server.
+
+    Requests are routed to the service of the bridge named in the 'bridge'
+    metadata key of the call ('aergo_net/eth_net', see op_utils.bridge_id).
+    Requests without metadata (proposers anchoring a single bridge) go to
+    default_bridge if set.
+    """
+
+    def __init__(
+        self,
+        services: Dict[str, ValidatorService],
+        default_bridge: str = None,
+    ) -> None:
+        self.services = services
+        if default_bridge is None and len(services) == 1:
+            default_bridge = next(iter(services))
+        self.default_bridge = default_bridge
+
+    def route(self, context):
+        """ Return the service of the requested bridge or an error message """
+        bridge = None
+        for key, value in context.invocation_metadata():
+            if key == 'bridge':
+                bridge = value
+        if bridge is None:
+            bridge = self.default_bridge
+            if bridge is None:
+                return None, "Missing bridge in request metadata"
+        service = self.services.get(bridge)
+        if service is None:
+            return None, "Bridge not served: {}".format(bridge)
+        return service, None
+
+
+def _routed_rpc(name):
+    def rpc(self, request, context):
+        service, err_msg = self.route(context)
+        if err_msg is not None:
+            return Approval(error=err_msg)
+        return getattr(service, name)(request, context)
+    rpc.__name__ = name
+    rpc.__doc__ = "Route {} to the requested bridge".format(name)
+    return rpc
+
+
+for _name in _APPROVAL_RPCS:
+    setattr(MultiBridgeValidatorService, _name, _routed_rpc(_name))
@@ -38,14 +38,16 @@ class ValidatorServer:
         anchoring_on: bool = False,
         auto_update: bool = False,
         oracle_update: bool = False,
-        root_path: str = './'
+        root_path: str = './',
+        provider_timeout: float = None,
+        providers_quorum: int = None,
     ) -> None:
         self.server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
         add_BridgeOperatorServicer_to_server(
             ValidatorService(
                 config_file_path, aergo_net, eth_net, privkey_name,
                 privkey_pwd, validator_index, anchoring_on, auto_update,
-                oracle_update, root_path
+                oracle_update, root_path, provider_timeout, providers_quorum
             ),
             self.server
         )
@@ -121,6 +123,15 @@ if __name__ == '__main__':
         help='Update bridge contract when validators or oracle addr '
              'change in config file'
     )
+    parser.add_argument(
+        '--provider_timeout', type=float, required=False,
+        help='Seconds to wait for each pair of providers to validate a request'
+    )
+    parser.add_argument(
+        '--providers_quorum', type=int, required=False,
+        help='Number of provider pairs that must agree to validate a request '
+             '(default all)'
+    )
     parser.add_argument(
         '--local_test', dest='local_test', action='store_true',
         help='Start all validators locally for convenient testing')
@@ -140,6 +151,8 @@ if __name__ == '__main__':
             validator_index=args.validator_index,
             anchoring_on=args.anchoring_on,
             auto_update=args.auto_update,
-            oracle_update=args.oracle_update
+            oracle_update=args.oracle_update,
+            provider_timeout=args.provider_timeout,
+            providers_quorum=args.providers_quorum,
         )
         validator.run()
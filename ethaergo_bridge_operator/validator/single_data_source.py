@@ -1,24 +1,76 @@
+import threading
 from typing import (
+    Any,
+    Callable,
+    Dict,
     Optional,
+    Tuple,
 )
 
-import aergo.herapy as herapy
-from web3 import (
-    Web3,
+from ethaergo_bridge_operator.config_watcher import (
+    get_config_watcher,
 )
-from web3.middleware import (
-    geth_poa_middleware,
+from ethaergo_bridge_operator.connections import (
+    ProviderPool,
 )
-
 from ethaergo_bridge_operator.op_utils import (
-    query_aergo_tempo,
+    AergoOracleState,
+    EthOracleState,
+    bridge_id,
     query_aergo_validators,
     query_unfreeze_fee,
-    load_config_data,
     query_aergo_oracle,
+    query_aergo_oracle_state,
+    query_eth_oracle_state,
 )
 
 
+class OracleCache():
+    """ Oracle state cache of a pair of providers: values are kept per chain
+    for the head height they were queried at and dropped as soon as a new
+    block is seen. The cache can be shared by the data sources of several
+    bridges using the same providers.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        # chain -> (head height, values by key at that height)
+        self._cache: Dict[str, Tuple[int, Dict[Any, Any]]] = {
+            'aergo': (-1, {}), 'eth': (-1, {})
+        }
+        self.hits = 0
+        self.misses = 0
+
+    def query(
+        self,
+        chain: str,
+        head_height: int,
+        key: Any,
+        query: Callable[[], Any],
+    ) -> Any:
+        """ Return the value of key at head_height from cache or query it."""
+        with self._lock:
+            cached_height, values = self._cache[chain]
+            if head_height > cached_height:
+                # new block seen: invalidate
+                values = {}
+                self._cache[chain] = (head_height, values)
+            elif head_height == cached_height and key in values:
+                self.hits += 1
+                return values[key]
+            self.misses += 1
+        value = query()
+        with self._lock:
+            cached_height, values = self._cache[chain]
+            if cached_height == head_height:
+                values[key] = value
+        return value
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses}
+
+
 class SingleDataSource():
     """ Verify oracle data so that it can be trusted by signer """
 
@@ -30,20 +82,20 @@ class SingleDataSource():
         aergo_ip: str,
         eth_ip: str,
         root_path: str,
+        providers: ProviderPool = None,
+        cache: OracleCache = None,
     ) -> None:
         self.config_file_path = config_file_path
-        config_data = load_config_data(config_file_path)
+        config_data = get_config_watcher(config_file_path).snapshot()
         self.aergo_net = aergo_net
         self.eth_net = eth_net
+        self.bridge_id = bridge_id(aergo_net, eth_net)
 
-        self.hera = herapy.Aergo()
-        self.hera.connect(aergo_ip)
-
-        self.web3 = Web3(Web3.HTTPProvider(eth_ip))
+        if providers is None:
+            providers = ProviderPool()
+        self.hera = providers.aergo(aergo_ip)
         eth_poa = config_data['networks'][eth_net]['isPOA']
-        if eth_poa:
-            self.web3.middleware_onion.inject(geth_poa_middleware, layer=0)
-        assert self.web3.isConnected()
+        self.web3 = providers.web3(eth_ip, eth_poa)
 
         # remember bridge contracts
         # eth bridge contract
@@ -75,6 +127,45 @@ class SingleDataSource():
         self.aergo_oracle = (config_data['networks'][aergo_net]['bridges']
                              [eth_net]['oracle'])
 
+        if cache is None:
+            cache = OracleCache()
+        self.cache = cache
+
+    def cached_query(
+        self,
+        chain: str,
+        head_height: int,
+        key: str,
+        query: Callable[[], Any],
+    ) -> Any:
+        """ Return the value of key at head_height from cache or query it."""
+        # keys are namespaced by bridge when the cache is shared
+        return self.cache.query(
+            chain, head_height, (self.bridge_id, key), query)
+
+    def cache_stats(self) -> Dict[str, int]:
+        return self.cache.stats()
+
+    def aergo_oracle_state(
+        self,
+        head_height: int = None,
+    ) -> AergoOracleState:
+        if head_height is None:
+            head_height = self.hera.get_blockchain_status()[1]
+        return self.cached_query(
+            'aergo', head_height, 'oracle_state',
+            lambda: query_aergo_oracle_state(self.hera, self.aergo_oracle)
+        )
+
+    def eth_oracle_state(self, head_height: int = None) -> EthOracleState:
+        if head_height is None:
+            head_height = self.web3.eth.blockNumber
+        return self.cached_query(
+            'eth', head_height, 'oracle_state',
+            lambda: query_eth_oracle_state(
+                self.web3, self.eth_oracle, head_height)
+        )
+
     def is_valid_aergo_anchor(
         self,
         anchor,
@@ -102,16 +193,16 @@ class SingleDataSource():
                     .format(lib, anchor.root.hex(), root.hex()))
 
         # 3- check merkle bridge nonces are correct
-        last_nonce_to = self.eth_oracle.functions._nonce().call()
+        oracle_state = self.eth_oracle_state()
+        last_nonce_to = oracle_state.nonce
         if last_nonce_to != anchor.destination_nonce:
             return ("anchor nonce invalid, got: {}, expected: {}"
                     .format(anchor.destination_nonce, last_nonce_to))
 
         # 4- check anchored height comes after the previous one and t_anchor is
         # passed
-        t_anchor = self.eth_oracle.functions._tAnchor().call()
-        last_merged_height_from = \
-            self.eth_oracle.functions._anchorHeight().call()
+        t_anchor = oracle_state.t_anchor
+        last_merged_height_from = oracle_state.anchor_height
         if last_merged_height_from + t_anchor > anchor.height:
             return ("anchor height too soon, got: {}, expected: {}"
                     .format(anchor.height, last_merged_height_from + t_anchor))
@@ -127,7 +218,9 @@ class SingleDataSource():
             3- it's nonce is correct
             4- it's height is higher than previous anchored height + t_anchor
         """
-        t_anchor, t_final = query_aergo_tempo(self.hera, self.aergo_oracle)
+        oracle_state = self.aergo_oracle_state()
+        t_anchor = oracle_state.t_anchor
+        t_final = oracle_state.t_final
         # 1- get the last block height and check anchor height > LIB
         # lib = best_height - finalized_from
         best_height = self.web3.eth.blockNumber
@@ -144,20 +237,14 @@ class SingleDataSource():
                     .format(lib, anchor.root.hex(), root))
 
         # 3- check merkle bridge nonces are correct
-        last_nonce_to = int(
-            self.hera.query_sc_state(
-                self.aergo_oracle, ["_sv__nonce"]).var_proofs[0].value
-        )
+        last_nonce_to = oracle_state.nonce
         if last_nonce_to != anchor.destination_nonce:
             return ("anchor nonce invalid, got: {}, expected: {}"
                     .format(anchor.destination_nonce, last_nonce_to))
 
         # 4- check anchored height comes after the previous one and t_anchor is
         # passed
-        last_merged_height_from = int(
-            self.hera.query_sc_state(
-                self.aergo_oracle, ["_sv__anchorHeight"]).var_proofs[0].value
-        )
+        last_merged_height_from = oracle_state.anchor_height
         if last_merged_height_from + t_anchor > anchor.height:
             return ("anchor height too soon, got: {}, expected: {}"
                     .format(anchor.height, last_merged_height_from + t_anchor))
@@ -172,12 +259,10 @@ class SingleDataSource():
         validator setting.
 
         """
-        current_tempo = int(
-            self.hera.query_sc_state(
-                self.aergo_oracle, ["_sv__tAnchor"]).var_proofs[0].value
-        )
+        oracle_state = self.aergo_oracle_state()
         return self.is_valid_eth_tempo(
-            config_tempo, tempo_msg, "t_anchor", current_tempo)
+            config_tempo, tempo_msg, "t_anchor", oracle_state.t_anchor,
+            oracle_state.nonce)
 
     def is_valid_eth_t_final(
         self,
@@ -188,25 +273,20 @@ class SingleDataSource():
         validator setting.
 
         """
-        current_tempo = int(
-            self.hera.query_sc_state(
-                self.aergo_oracle, ["_sv__tFinal"]).var_proofs[0].value
-        )
+        oracle_state = self.aergo_oracle_state()
         return self.is_valid_eth_tempo(
-            config_tempo, tempo_msg, "t_final", current_tempo)
+            config_tempo, tempo_msg, "t_final", oracle_state.t_final,
+            oracle_state.nonce)
 
     def is_valid_eth_tempo(
         self,
         config_tempo,
         tempo_msg,
         tempo_str,
-        current_tempo
+        current_tempo,
+        nonce,
     ):
         # check destination nonce is correct
-        nonce = int(
-            self.hera.query_sc_state(
-                self.aergo_oracle, ["_sv__nonce"]).var_proofs[0].value
-        )
         if nonce != tempo_msg.destination_nonce:
             return ("Incorrect Nonce, got: {}, expected: {}"
                     .format(tempo_msg.destination_nonce, nonce))
@@ -229,9 +309,10 @@ class SingleDataSource():
         validator setting.
 
         """
-        current_tempo = self.eth_oracle.functions._tAnchor().call()
+        oracle_state = self.eth_oracle_state()
         return self.is_valid_aergo_tempo(
-            config_tempo, tempo_msg, 't_anchor', current_tempo)
+            config_tempo, tempo_msg, 't_anchor', oracle_state.t_anchor,
+            oracle_state.nonce)
 
     def is_valid_aergo_t_final(
         self,
@@ -242,19 +323,20 @@ class SingleDataSource():
         validator setting.
 
         """
-        current_tempo = self.eth_oracle.functions._tFinal().call()
+        oracle_state = self.eth_oracle_state()
         return self.is_valid_aergo_tempo(
-            config_tempo, tempo_msg, 't_final', current_tempo)
+            config_tempo, tempo_msg, 't_final', oracle_state.t_final,
+            oracle_state.nonce)
 
     def is_valid_aergo_tempo(
         self,
         config_tempo,
         tempo_msg,
         tempo_str,
-        current_tempo
+        current_tempo,
+        nonce,
     ):
         # check destination nonce is correct
-        nonce = self.eth_oracle.functions._nonce().call()
         if nonce != tempo_msg.destination_nonce:
             return ("Incorrect Nonce, got: {}, expected: {}"
                     .format(tempo_msg.destination_nonce, nonce))
@@ -274,17 +356,17 @@ class SingleDataSource():
 
         """
         # check destination nonce is correct
-        nonce = int(
-            self.hera.query_sc_state(
-                self.aergo_oracle, ["_sv__nonce"]).var_proofs[0].value
-        )
+        head_height = self.hera.get_blockchain_status()[1]
+        nonce = self.aergo_oracle_state(head_height)['nonce']
         if nonce != val_msg.destination_nonce:
             return ("Incorrect Nonce, got: {}, expected: {}"
                     .format(val_msg.destination_nonce, nonce))
         # check new validators are different from current ones to prevent
         # update spamming
-        current_validators = query_aergo_validators(
-            self.hera, self.aergo_oracle)
+        current_validators = self.cached_query(
+            'aergo', head_height, 'validators',
+            lambda: query_aergo_validators(self.hera, self.aergo_oracle)
+        )
         if current_validators == config_vals:
             return "Not voting for a new validator set"
         # check validators are same in config file
@@ -299,13 +381,18 @@ class SingleDataSource():
 
         """
         # check destination nonce is correct
-        nonce = self.eth_oracle.functions._nonce().call()
+        head_height = self.web3.eth.blockNumber
+        nonce = self.eth_oracle_state(head_height)['nonce']
         if nonce != val_msg.destination_nonce:
             return ("Incorrect Nonce, got: {}, expected: {}"
                     .format(val_msg.destination_nonce, nonce))
         # check new validators are different from current ones to prevent
         # update spamming
-        current_validators = self.eth_oracle.functions.getValidators().call()
+        current_validators = self.cached_query(
+            'eth', head_height, 'validators',
+            lambda: self.eth_oracle.functions.getValidators().call(
+                block_identifier=head_height)
+        )
         if current_validators == config_vals:
             return "Not voting for a new validator set"
         # check validators are same in config file
@@ -319,12 +406,13 @@ class SingleDataSource():
         validator setting.
 
         """
-        current_fee = query_unfreeze_fee(self.hera, self.aergo_bridge)
-        # check destination nonce is correct
-        nonce = int(
-            self.hera.query_sc_state(
-                self.aergo_oracle, ["_sv__nonce"]).var_proofs[0].value
+        head_height = self.hera.get_blockchain_status()[1]
+        current_fee = self.cached_query(
+            'aergo', head_height, 'unfreeze_fee',
+            lambda: query_unfreeze_fee(self.hera, self.aergo_bridge)
         )
+        # check destination nonce is correct
+        nonce = self.aergo_oracle_state(head_height)['nonce']
         if nonce != new_fee_msg.destination_nonce:
             return ("Incorrect Nonce, got: {}, expected: {}"
                     .format(new_fee_msg.destination_nonce, nonce))
@@ -343,13 +431,18 @@ class SingleDataSource():
 
         """
         # check destination nonce is correct
-        nonce = self.eth_oracle.functions._nonce().call()
+        head_height = self.web3.eth.blockNumber
+        nonce = self.eth_oracle_state(head_height)['nonce']
         if nonce != oracle_msg.destination_nonce:
             return ("Incorrect Nonce, got: {}, expected: {}"
                     .format(oracle_msg.destination_nonce, nonce))
         # check new oracle is different from current one to prevent
         # update spamming
-        current_oracle = self.eth_bridge.functions._oracle().call()
+        current_oracle = self.cached_query(
+            'eth', head_height, 'oracle',
+            lambda: self.eth_bridge.functions._oracle().call(
+                block_identifier=head_height)
+        )
         if current_oracle == config_oracle:
             return "Not voting for a new oracle"
         # check oracle is same in config file
@@ -364,17 +457,17 @@ class SingleDataSource():
 
         """
         # check destination nonce is correct
-        nonce = int(
-            self.hera.query_sc_state(
-                self.aergo_oracle, ["_sv__nonce"]).var_proofs[0].value
-        )
+        head_height = self.hera.get_blockchain_status()[1]
+        nonce = self.aergo_oracle_state(head_height)['nonce']
         if nonce != oracle_msg.destination_nonce:
             return ("Incorrect Nonce, got: {}, expected: {}"
                     .format(oracle_msg.destination_nonce, nonce))
         # check new oracle is different from current one to prevent
         # update spamming
-        current_oracle = query_aergo_oracle(
-            self.hera, self.aergo_bridge)
+        current_oracle = self.cached_query(
+            'aergo', head_height, 'oracle',
+            lambda: query_aergo_oracle(self.hera, self.aergo_bridge)
+        )
         if current_oracle == config_oracle:
             return "Not voting for a new validator set"
         # check oracle is same in config file
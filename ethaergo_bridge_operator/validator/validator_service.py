@@ -1,5 +1,9 @@
 from getpass import getpass
 import hashlib
+from typing import (
+    Dict,
+    Tuple,
+)
 
 from aergo.herapy.errors.general_exception import (
     GeneralException as HeraException,
@@ -18,6 +22,9 @@ from ethaergo_bridge_operator.bridge_operator_pb2_grpc import (
 from ethaergo_bridge_operator.bridge_operator_pb2 import (
     Approval,
 )
+from ethaergo_bridge_operator.connections import (
+    ProviderPool,
+)
 from ethaergo_bridge_operator.validator.data_sources import (
     DataSources,
 )
@@ -30,8 +37,11 @@ from ethaergo_bridge_operator.validator.eth_signer import (
 from ethaergo_bridge_operator.validator.aergo_signer import (
     AergoSigner,
 )
-from ethaergo_bridge_operator.op_utils import (
-    load_config_data,
+from ethaergo_bridge_operator.validator.single_data_source import (
+    OracleCache,
+)
+from ethaergo_bridge_operator.config_watcher import (
+    get_config_watcher,
 )
 import logging
 
@@ -44,6 +54,42 @@ success_log_template = log_template + ', \"value\": %s, \"nonce\": %s}'
 error_log_template = log_template + ', \"error\": \"%s\"}'
 
 
+def load_signers(
+    config_data: Dict,
+    root_path: str = './',
+    privkey_name: str = None,
+    privkey_pwd: str = None,
+) -> Tuple[EthSigner, AergoSigner]:
+    """ Decrypt the validator's Ethereum and Aergo keys, ask for the password
+    until it is correct if privkey_pwd is None.
+    """
+    if privkey_name is None:
+        privkey_name = 'validator'
+
+    keystore_path = config_data["wallet-eth"][privkey_name]['keystore']
+    with open(root_path + keystore_path, "r") as f:
+        eth_keystore = f.read()
+    keystore_path = config_data["wallet"][privkey_name]['keystore']
+    with open(root_path + keystore_path, "r") as f:
+        aergo_keystore = f.read()
+
+    if privkey_pwd is not None:
+        return (EthSigner(eth_keystore, privkey_name, privkey_pwd),
+                AergoSigner(aergo_keystore, privkey_name, privkey_pwd))
+    while True:
+        try:
+            privkey_pwd = getpass(
+                "Decrypt Aergo and Ethereum accounts '{}'\nPassword: "
+                .format(privkey_name)
+            )
+            return (EthSigner(eth_keystore, privkey_name, privkey_pwd),
+                    AergoSigner(aergo_keystore, privkey_name, privkey_pwd))
+        except ValueError:
+            logger.info("\"Wrong password for Eth key, try again\"")
+        except HeraException:
+            logger.info("\"Wrong password for Aergo key, try again\"")
+
+
 class ValidatorService(BridgeOperatorServicer):
     """Validates anchors for the bridge proposer.
 
@@ -65,54 +111,39 @@ class ValidatorService(BridgeOperatorServicer):
         anchoring_on: bool = False,
         auto_update: bool = False,
         oracle_update: bool = False,
-        root_path: str = './'
+        root_path: str = './',
+        provider_timeout: float = None,
+        providers_quorum: int = None,
+        providers: ProviderPool = None,
+        caches: Dict[Tuple[str, str], OracleCache] = None,
+        signers: Tuple[EthSigner, AergoSigner] = None,
     ) -> None:
-        """ Initialize parameters of the bridge validator"""
+        """ Initialize parameters of the bridge validator.
+        providers, caches and signers can be shared by the services of
+        several bridges.
+        """
         self.anchoring_on = anchoring_on
         self.auto_update = auto_update
         self.oracle_update = oracle_update
+        if providers is None:
+            providers = ProviderPool()
         self.data_sources = DataSources(
-            config_file_path, aergo_net, eth_net, root_path)
-        config_data = load_config_data(config_file_path)
+            config_file_path, aergo_net, eth_net, root_path,
+            provider_timeout, providers_quorum, providers, caches
+        )
+        config_data = get_config_watcher(config_file_path).snapshot()
         self.validator_index = validator_index
         self.aergo_net = aergo_net
         self.eth_net = eth_net
         self.aergo_oracle_id, self.eth_oracle_id = check_bridge_status(
             root_path, config_data, aergo_net, eth_net, auto_update,
-            oracle_update
+            oracle_update, providers
         )
 
-        if privkey_name is None:
-            privkey_name = 'validator'
-
-        keystore_path = config_data["wallet-eth"][privkey_name]['keystore']
-        with open(root_path + keystore_path, "r") as f:
-            eth_keystore = f.read()
-        keystore_path = config_data["wallet"][privkey_name]['keystore']
-        with open(root_path + keystore_path, "r") as f:
-            aergo_keystore = f.read()
-
-        if privkey_pwd is None:
-            while True:
-                try:
-                    privkey_pwd = getpass(
-                        "Decrypt Aergo and Ethereum accounts '{}'\nPassword: "
-                        .format(privkey_name)
-                    )
-                    self.eth_signer = EthSigner(
-                        eth_keystore, privkey_name, privkey_pwd)
-                    self.aergo_signer = AergoSigner(
-                        aergo_keystore, privkey_name, privkey_pwd)
-                    break
-                except ValueError:
-                    logger.info("\"Wrong password for Eth key, try again\"")
-                except HeraException:
-                    logger.info("\"Wrong password for Aergo key, try again\"")
-        else:
-            self.eth_signer = EthSigner(
-                eth_keystore, privkey_name, privkey_pwd)
-            self.aergo_signer = AergoSigner(
-                aergo_keystore, privkey_name, privkey_pwd)
+        if signers is None:
+            signers = load_signers(
+                config_data, root_path, privkey_name, privkey_pwd)
+        self.eth_signer, self.aergo_signer = signers
         # record private key for signing EthAnchor
         logger.info(
             "\"Aergo validator Address: %s\"", self.aergo_signer.address)
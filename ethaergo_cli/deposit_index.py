@@ -0,0 +1,294 @@
+import json
+import sqlite3
+from typing import (
+    Any,
+    List,
+    Optional,
+    Tuple,
+)
+
+import aergo.herapy as herapy
+from web3 import (
+    Web3,
+)
+from web3.contract import (
+    Contract,
+)
+
+# max block range of event queries (hera.get_events limit)
+SCAN_CHUNK = 10000
+
+# bridge events of deposits to the other chain: (event name, index of the
+# receiver argument, index of the amount argument, index of the token
+# argument (None for native aergo))
+AERGO_DEPOSIT_EVENTS = [
+    ('lock', 0, 1, 2),
+    ('burn', 1, 2, 3),
+    ('freeze', 1, 2, None),
+]
+ETH_DEPOSIT_EVENTS = ['lockEvent', 'burnEvent']
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS deposits (
+    from_chain TEXT NOT NULL,
+    to_chain TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    receiver_hash TEXT NOT NULL,
+    token TEXT NOT NULL,
+    height INTEGER NOT NULL,
+    amount TEXT NOT NULL,
+    tx_hash TEXT NOT NULL,
+    event_index INTEGER NOT NULL,
+    PRIMARY KEY (from_chain, tx_hash, event_index)
+);
+CREATE INDEX IF NOT EXISTS deposits_by_receiver ON deposits (
+    from_chain, to_chain, receiver_hash, token, height
+);
+CREATE TABLE IF NOT EXISTS checkpoints (
+    from_chain TEXT NOT NULL,
+    to_chain TEXT NOT NULL,
+    bridge TEXT NOT NULL,
+    height INTEGER NOT NULL,
+    PRIMARY KEY (from_chain, to_chain, bridge)
+);
+CREATE TABLE IF NOT EXISTS pending_transfers (
+    from_chain TEXT NOT NULL,
+    to_chain TEXT NOT NULL,
+    asset_name TEXT NOT NULL,
+    receiver TEXT NOT NULL,
+    deposit_height INTEGER NOT NULL,
+    PRIMARY KEY (from_chain, to_chain, asset_name, receiver)
+);
+"""
+
+
+def receiver_hash(receiver: str) -> str:
+    """ Key of a receiver in the index.
+
+    Ethereum bridge events only contain the hash of the indexed receiver
+    string, so receivers of both chains are indexed by their hash.
+    """
+    return Web3.keccak(text=receiver).hex()
+
+
+def aergo_deposit_receiver(receiver: str) -> str:
+    """ Ethereum receiver as recorded in Aergo bridge events: without the 0x
+    prefix and lower case.
+    """
+    if receiver[:2] in ('0x', '0X'):
+        receiver = receiver[2:]
+    return receiver.lower()
+
+
+def _parse_amount(amount: Any) -> str:
+    if isinstance(amount, dict):
+        amount = amount['_bignum']
+    return str(amount)
+
+
+class DepositIndex():
+    """ SQLite index of the deposits (lock, burn, freeze) made to bridge
+    contracts and of the transfers initiated by the cli.
+
+    Deposits are indexed by scanning bridge events from the checkpoint of
+    the last scanned block, so finding the height of a deposit to finalize
+    is a lookup instead of a rescan or a manual input.
+    """
+
+    def __init__(self, db_path: str) -> None:
+        self.db = sqlite3.connect(db_path)
+        self.db.executescript(_SCHEMA)
+        self.db.commit()
+
+    def close(self) -> None:
+        self.db.close()
+
+    def checkpoint(self, from_chain: str, to_chain: str, bridge: str) -> int:
+        """ Last block of bridge scanned for deposits (-1 if never) """
+        row = self.db.execute(
+            "SELECT height FROM checkpoints WHERE from_chain=? AND to_chain=?"
+            " AND bridge=?", (from_chain, to_chain, bridge)
+        ).fetchone()
+        if row is None:
+            return -1
+        return row[0]
+
+    def _store_chunk(
+        self,
+        from_chain: str,
+        to_chain: str,
+        bridge: str,
+        deposits: List[Tuple],
+        height: int,
+    ) -> None:
+        """ Store the deposits of a scanned range and move the checkpoint
+        in the same db transaction.
+        """
+        with self.db:
+            self.db.executemany(
+                "INSERT OR REPLACE INTO deposits VALUES "
+                "(?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(from_chain, to_chain) + d for d in deposits]
+            )
+            self.db.execute(
+                "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?)",
+                (from_chain, to_chain, bridge, height)
+            )
+
+    def scan_aergo(
+        self,
+        hera: herapy.Aergo,
+        from_chain: str,
+        to_chain: str,
+        bridge: str,
+        start_height: int = 0,
+    ) -> int:
+        """ Index deposits of the Aergo bridge up to the best block, return
+        the number of new deposit events. The first scan starts at
+        start_height (the bridge deployment height).
+        """
+        _, best_height = hera.get_blockchain_status()
+        start = max(start_height,
+                    self.checkpoint(from_chain, to_chain, bridge) + 1)
+        count = 0
+        while start <= best_height:
+            end = min(start + SCAN_CHUNK - 1, best_height)
+            deposits = []
+            for name, receiver_i, amount_i, token_i in AERGO_DEPOSIT_EVENTS:
+                events = hera.get_events(
+                    bridge, name, start_block_no=start, end_block_no=end)
+                for event in events:
+                    args = event.arguments
+                    token = 'aergo' if token_i is None else args[token_i]
+                    deposits.append((
+                        name,
+                        receiver_hash(aergo_deposit_receiver(
+                            args[receiver_i])),
+                        token,
+                        event.block_height, _parse_amount(args[amount_i]),
+                        str(event.tx_hash), event.index
+                    ))
+            self._store_chunk(from_chain, to_chain, bridge, deposits, end)
+            count += len(deposits)
+            start = end + 1
+        return count
+
+    def scan_eth(
+        self,
+        w3: Web3,
+        bridge: Contract,
+        from_chain: str,
+        to_chain: str,
+        start_height: int = 0,
+    ) -> int:
+        """ Index deposits of the Ethereum bridge up to the last block,
+        return the number of new deposit events. The first scan starts at
+        start_height (the bridge deployment height).
+        """
+        best_height = w3.eth.blockNumber
+        start = max(start_height,
+                    self.checkpoint(from_chain, to_chain, bridge.address) + 1)
+        count = 0
+        while start <= best_height:
+            end = min(start + SCAN_CHUNK - 1, best_height)
+            deposits = []
+            for name in ETH_DEPOSIT_EVENTS:
+                logs = getattr(bridge.events, name).getLogs(
+                    fromBlock=start, toBlock=end)
+                for log in logs:
+                    deposits.append((
+                        name[:-len('Event')], log.args.receiver.hex(),
+                        log.args.tokenAddress, log.blockNumber,
+                        str(log.args.amount), log.transactionHash.hex(),
+                        log.logIndex
+                    ))
+            self._store_chunk(
+                from_chain, to_chain, bridge.address, deposits, end)
+            count += len(deposits)
+            start = end + 1
+        return count
+
+    def deposits(
+        self,
+        from_chain: str,
+        to_chain: str,
+        receiver: str,
+        token: str = None,
+    ) -> List[Tuple[str, str, int, int, str]]:
+        """ Indexed deposits to receiver ordered by height:
+        (kind, token, height, amount, tx_hash).
+        """
+        query = (
+            "SELECT kind, token, height, amount, tx_hash FROM deposits "
+            "WHERE from_chain=? AND to_chain=? AND receiver_hash=?"
+        )
+        params: List[Any] = [from_chain, to_chain, receiver_hash(receiver)]
+        if token is not None:
+            query += " AND token=?"
+            params.append(token)
+        rows = self.db.execute(query + " ORDER BY height", params).fetchall()
+        return [(kind, tok, height, int(amount), tx_hash)
+                for kind, tok, height, amount, tx_hash in rows]
+
+    def last_deposit_height(
+        self,
+        from_chain: str,
+        to_chain: str,
+        receiver: str,
+        token: str,
+    ) -> Optional[int]:
+        """ Height of the last indexed deposit of token to receiver """
+        row = self.db.execute(
+            "SELECT MAX(height) FROM deposits WHERE from_chain=? AND "
+            "to_chain=? AND receiver_hash=? AND token=?",
+            (from_chain, to_chain, receiver_hash(receiver), token)
+        ).fetchone()
+        return row[0]
+
+    def add_pending_transfer(
+        self,
+        from_chain: str,
+        to_chain: str,
+        asset_name: str,
+        receiver: str,
+        deposit_height: int,
+    ) -> None:
+        with self.db:
+            self.db.execute(
+                "INSERT OR REPLACE INTO pending_transfers VALUES "
+                "(?, ?, ?, ?, ?)",
+                (from_chain, to_chain, asset_name, receiver, deposit_height)
+            )
+
+    def remove_pending_transfer(
+        self,
+        from_chain: str,
+        to_chain: str,
+        asset_name: str,
+        receiver: str,
+    ) -> None:
+        with self.db:
+            self.db.execute(
+                "DELETE FROM pending_transfers WHERE from_chain=? AND "
+                "to_chain=? AND asset_name=? AND receiver=?",
+                (from_chain, to_chain, asset_name, receiver)
+            )
+
+    def pending_transfers(self) -> List[List]:
+        """ Pending transfers as
+        [from_chain, to_chain, asset_name, receiver, deposit_height]
+        """
+        rows = self.db.execute(
+            "SELECT from_chain, to_chain, asset_name, receiver, "
+            "deposit_height FROM pending_transfers"
+        ).fetchall()
+        return [list(row) for row in rows]
+
+    def import_pending_transfers(self, json_path: str) -> None:
+        """ Import pending transfers recorded by previous versions of the
+        cli in a json file.
+        """
+        with open(json_path, 'r') as file:
+            pending_transfers = json.load(file)
+        for transfer in pending_transfers.values():
+            self.add_pending_transfer(*transfer)
@@ -1,4 +1,3 @@
-import hashlib
 import PyInquirer as inquirer
 import json
 import os
@@ -13,6 +12,10 @@ from aergo_wallet.exceptions import (
     InsufficientBalanceError,
 )
 
+from ethaergo_cli.deposit_index import (
+    DepositIndex,
+    aergo_deposit_receiver,
+)
 from ethaergo_cli.utils import (
     confirm_transfer,
     prompt_amount,
@@ -48,12 +51,16 @@ class EthMerkleBridgeCli():
     """
 
     def __init__(self, root_path: str = './'):
-        """Load the pending transfers."""
+        """Load the index of deposits and pending transfers."""
         # root_path is the path from which files are tracked
-        with open(root_path
-                  + 'ethaergo_cli/pending_transfers.json', 'r') as file:
-            self.pending_transfers = json.load(file)
         self.root_path = root_path
+        self.deposit_index = DepositIndex(
+            root_path + 'ethaergo_cli/deposit_index.db')
+        # pending transfers used to be stored in a json file
+        json_path = root_path + 'ethaergo_cli/pending_transfers.json'
+        if os.path.exists(json_path):
+            self.deposit_index.import_pending_transfers(json_path)
+            os.rename(json_path, json_path + '.imported')
 
     def start(self):
         """Entry point of cli : load a wallet configuration file of create a
@@ -736,18 +743,15 @@ class EthMerkleBridgeCli():
                 return
         print("Transaction Hash : {}\nBlock Height : {}\n"
               .format(tx_hash, deposit_height))
-        pending_id = hashlib.sha256(
-            (from_chain + to_chain + asset_name + receiver).encode('utf-8')
-        ).digest().hex()
-        self.pending_transfers[pending_id] = \
-            [from_chain, to_chain, asset_name, receiver, deposit_height]
-        self.store_pending_transfers()
+        self.deposit_index.add_pending_transfer(
+            from_chain, to_chain, asset_name, receiver, deposit_height)
 
     def finalize_transfer_arguments(self, prompt_last_deposit=True):
         """Prompt the arguments needed to finalize a transfer.
 
         The arguments can be taken from the pending transfers or
-        inputed manually by users.
+        inputed manually by users, in which case the deposit height is
+        looked up in the deposit index.
 
         Returns:
             List of transfer arguments
@@ -757,7 +761,7 @@ class EthMerkleBridgeCli():
             {
                 'name': '{}'.format(val),
                 'value': val
-            } for _, val in self.pending_transfers.items()
+            } for val in self.deposit_index.pending_transfers()
         ]
         choices.extend(["Custom transfer", "Back"])
         questions = [
@@ -774,7 +778,11 @@ class EthMerkleBridgeCli():
                 receiver = self.prompt_commun_transfer_params()
             deposit_height = 0
             if prompt_last_deposit:
-                deposit_height = prompt_deposit_height()
+                deposit_height = self.indexed_deposit_height(
+                    from_chain, to_chain, asset_name, receiver)
+                if deposit_height is None:
+                    print("No deposit found in bridge events")
+                    deposit_height = prompt_deposit_height()
         elif answers['transfer'] == 'Back':
             return None
         else:
@@ -883,12 +891,9 @@ class EthMerkleBridgeCli():
             else:
                 print('asset not properly registered in config.json')
                 return
-        # remove pending id from pending transfers
-        pending_id = hashlib.sha256(
-            (from_chain + to_chain + asset_name + receiver).encode('utf-8')
-        ).digest().hex()
-        self.pending_transfers.pop(pending_id, None)
-        self.store_pending_transfers()
+        # remove transfer from pending transfers
+        self.deposit_index.remove_pending_transfer(
+            from_chain, to_chain, asset_name, receiver)
 
     def check_withdrawable_balance(self):
         """Check the status of cross chain transfers."""
@@ -898,7 +903,6 @@ class EthMerkleBridgeCli():
             return
         from_chain, to_chain, from_assets, to_assets, asset_name, receiver, \
             _ = arguments
-
         if self.wallet.config_data('networks',
                                    from_chain, 'type') == 'ethereum':
             if asset_name in from_assets:
@@ -1074,14 +1078,52 @@ class EthMerkleBridgeCli():
         ]
         return from_assets, to_assets
 
-    def store_pending_transfers(self):
-        """Record pending transfers in json file so they can be finalized
-        later.
+    def sync_deposit_index(self, from_chain, to_chain):
+        """Index the deposits made to the bridge of from_chain since the
+        last scanned block.
 
         """
-        with open(self.root_path
-                  + 'ethaergo_cli/pending_transfers.json', 'w') as file:
-            json.dump(self.pending_transfers, file, indent=4)
+        bridge_from = self.wallet.get_bridge_contract_address(from_chain,
+                                                              to_chain)
+        try:
+            # events can't be emitted before the bridge was deployed
+            start_height = self.wallet.config_data(
+                'networks', from_chain, 'bridges', to_chain, 'deploy_height')
+        except KeyError:
+            start_height = 0
+        print("Indexing deposits to {} on {}...".format(to_chain, from_chain))
+        if self.wallet.config_data('networks',
+                                   from_chain, 'type') == 'aergo':
+            hera = self.wallet.connect_aergo(from_chain)
+            self.deposit_index.scan_aergo(
+                hera, from_chain, to_chain, bridge_from, start_height)
+            hera.disconnect()
+        else:
+            w3 = self.wallet.get_web3(from_chain)
+            bridge = w3.eth.contract(
+                address=bridge_from,
+                abi=self.wallet.load_bridge_abi(from_chain, to_chain)
+            )
+            self.deposit_index.scan_eth(
+                w3, bridge, from_chain, to_chain, start_height)
+
+    def indexed_deposit_height(self, from_chain, to_chain, asset_name,
+                               receiver):
+        """Height of the last deposit of asset_name to receiver found in
+        bridge events, None if there is none.
+
+        """
+        self.sync_deposit_index(from_chain, to_chain)
+        asset_addr = self.get_asset_address(asset_name, from_chain, to_chain)
+        if self.wallet.config_data(
+                'networks', from_chain, 'type') == 'aergo':
+            # aergo bridge events record the receiver without 0x
+            receiver = aergo_deposit_receiver(receiver)
+            if asset_name == 'aergo_erc20':
+                # aergo native is frozen
+                asset_addr = 'aergo'
+        return self.deposit_index.last_deposit_height(
+            from_chain, to_chain, receiver, asset_addr)
 
 
 if __name__ == '__main__':
@@ -1,4 +1,3 @@
-import time
 from typing import (
     Tuple,
 )
@@ -8,6 +7,9 @@ from web3 import (
 from web3.exceptions import (
     BadFunctionCallOutput,
 )
+from web3.contract import (
+    Contract,
+)
 from web3.datastructures import (
     AttributeDict,
 )
@@ -20,6 +22,13 @@ from aergo_wallet.exceptions import (
     TxError,
     InvalidArgumentsError
 )
+from ethaergo_wallet.aergo_utils.merkle_proof import (
+    verify_sc_state,
+)
+from ethaergo_wallet.anchor_watcher import (
+    AnchorWatcher,
+    EthAnchorWatcher,
+)
 from ethaergo_wallet.wallet_utils import (
     is_ethereum_address,
     is_aergo_address
@@ -79,6 +88,7 @@ def build_lock_proof(
     bridge_to_abi: str,
     lock_height: int,
     token_origin: str,
+    watcher: AnchorWatcher = None,
 ):
     """ Check the last anchored root includes the lock and build
     a lock proof for that root
@@ -95,7 +105,7 @@ def build_lock_proof(
         + token_origin.encode('utf-8')
     return _build_deposit_proof(
         aergo_from, w3, bridge_from, bridge_to, bridge_to_abi, lock_height,
-        trie_key
+        trie_key, watcher
     )
 
 
@@ -199,6 +209,7 @@ def build_burn_proof(
     bridge_to_abi: str,
     burn_height: int,
     token_origin: str,
+    watcher: AnchorWatcher = None,
 ):
     """ Check the last anchored root includes the burn and build
     a burn proof for that root
@@ -215,7 +226,7 @@ def build_burn_proof(
         + bytes.fromhex(token_origin[2:])
     return _build_deposit_proof(
         aergo_from, w3, bridge_from, bridge_to, bridge_to_abi, burn_height,
-        trie_key
+        trie_key, watcher
     )
 
 
@@ -302,6 +313,33 @@ def freeze(
     return freeze_height, str(tx.tx_hash), tx_detail
 
 
+def wait_anchor(
+    w3: Web3,
+    eth_bridge: Contract,
+    deposit_height: int,
+    watcher: AnchorWatcher = None,
+) -> int:
+    """ Wait until a deposit at deposit_height is anchored on eth_bridge and
+    return the last anchor height. Waiting transfers can share a watcher of
+    the anchors of eth_bridge.
+    """
+    # check last merged height
+    try:
+        last_merged_height_to = eth_bridge.functions._anchorHeight().call()
+    except BadFunctionCallOutput as e:
+        raise InvalidArgumentsError(e, eth_bridge.address)
+    if last_merged_height_to >= deposit_height:
+        return last_merged_height_to
+    logger.info(
+        "\u23F0 deposit not recorded in current anchor, waiting new "
+        "anchor event... / deposit height : %s / last anchor height : %s ",
+        deposit_height, last_merged_height_to
+    )
+    if watcher is None:
+        watcher = EthAnchorWatcher(w3, eth_bridge)
+    return watcher.wait(deposit_height).result()
+
+
 def _build_deposit_proof(
     aergo_from: herapy.Aergo,
     w3: Web3,
@@ -310,29 +348,17 @@ def _build_deposit_proof(
     bridge_to_abi: str,
     deposit_height: int,
     trie_key: bytes,
+    watcher: AnchorWatcher = None,
 ):
     """ Check the last anchored root includes the deposit and build
     a deposit proof for that root
     """
-    # check last merged height
     eth_bridge = w3.eth.contract(
         address=bridge_to,
         abi=bridge_to_abi
     )
-    try:
-        last_merged_height_to = eth_bridge.functions._anchorHeight().call()
-    except BadFunctionCallOutput as e:
-        raise InvalidArgumentsError(e, bridge_to)
-    # waite for anchor containing our transfer
-    if last_merged_height_to < deposit_height:
-        logger.info(
-            "\u23F0 deposit not recorded in current anchor, waiting new "
-            "anchor event... / deposit height : %s / last anchor height : %s ",
-            deposit_height, last_merged_height_to
-        )
-        while last_merged_height_to < deposit_height:
-            time.sleep(1)
-            last_merged_height_to = eth_bridge.functions._anchorHeight().call()
+    last_merged_height_to = wait_anchor(
+        w3, eth_bridge, deposit_height, watcher)
     # get inclusion proof of lock in last merged block
     merge_block_from = aergo_from.get_block_headers(
         block_height=last_merged_height_to, list_size=1)
@@ -341,7 +367,7 @@ def _build_deposit_proof(
         bridge_from, [trie_key],
         root=root_from, compressed=True
     )
-    if not proof.verify_proof(root_from):
+    if not verify_sc_state(proof, root_from):
         raise InvalidMerkleProofError("Unable to verify deposit proof",
                                       proof)
     if not proof.account.state_proof.inclusion:
@@ -370,12 +396,15 @@ def withdrawable(
     root_from = block_from[0].blocks_root_hash
     deposit_proof = hera.query_sc_state(
         bridge_from, [aergo_storage_key],
-        root=root_from, compressed=False
+        root=root_from, compressed=True
     )
     if not deposit_proof.account.state_proof.inclusion:
         raise InvalidArgumentsError(
             "Contract doesnt exist in state, check contract deployed and "
             "chain synced {}".format(deposit_proof))
+    if not verify_sc_state(deposit_proof, root_from):
+        raise InvalidMerkleProofError("Unable to verify deposit proof",
+                                      deposit_proof)
     total_deposit = 0
     if deposit_proof.var_proofs[0].inclusion:
         total_deposit = int(deposit_proof.var_proofs[0].value
@@ -395,12 +424,15 @@ def withdrawable(
     root_from = block_from[0].blocks_root_hash
     deposit_proof = hera.query_sc_state(
         bridge_from, [aergo_storage_key],
-        root=root_from, compressed=False
+        root=root_from, compressed=True
     )
     if not deposit_proof.account.state_proof.inclusion:
         raise InvalidArgumentsError(
             "Contract doesnt exist in state, check contract deployed and "
             "chain synced {}".format(deposit_proof))
+    if not verify_sc_state(deposit_proof, root_from):
+        raise InvalidMerkleProofError("Unable to verify deposit proof",
+                                      deposit_proof)
     anchored_deposit = 0
     if deposit_proof.var_proofs[0].inclusion:
         anchored_deposit = int(deposit_proof.var_proofs[0].value
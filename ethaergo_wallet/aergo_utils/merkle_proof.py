@@ -0,0 +1,162 @@
+from collections import (
+    OrderedDict,
+)
+import hashlib
+import threading
+
+# hash of empty subtrees at every level of the Aergo sparse merkle trie: a
+# single byte, there are no per level default hashes to compute
+_DEFAULT_NODE = bytes([0])
+
+# account states already verified: (root, address) -> serialized state
+_verified_accounts: OrderedDict = OrderedDict()
+_verified_accounts_lock = threading.Lock()
+_VERIFIED_ACCOUNTS_SIZE = 256
+
+
+def _sha256(data):
+    return hashlib.sha256(data).digest()
+
+
+def _leaf_hash(key, value_hash, height):
+    return _sha256(key + value_hash + bytes([(256 - height) % 256]))
+
+
+def _verify_path(root, key, leaf_hash, proof, verified_nodes):
+    """ Hash leaf_hash up the path of key with the siblings of a compressed
+    (bitmap) or full audit path and check the result is root.
+
+    verified_nodes holds the nodes of paths already verified in root:
+    (depth, key prefix) -> hash. Hashing stops at the first node shared with
+    a verified path, and the nodes of the path are added once verified.
+    """
+    audit_path = proof.auditPath
+    key_bits = int.from_bytes(key, 'big')
+    key_len = 8 * len(key)
+    if proof.bitmap:
+        height = proof.height
+        bitmap_len = 8 * len(proof.bitmap)
+        if height > bitmap_len or height > key_len:
+            return False
+        # bitmap bits of the levels from the leaf to the root
+        bitmap = int.from_bytes(proof.bitmap, 'big') >> (bitmap_len - height)
+    else:
+        # full audit path: a sibling at every level
+        height = len(audit_path)
+        if height > key_len:
+            return False
+        bitmap = (1 << height) - 1
+    siblings = bin(bitmap).count('1')
+    if siblings > len(audit_path):
+        return False
+    # audit path siblings are ordered from the leaf to the root
+    i = len(audit_path) - siblings
+    node = leaf_hash
+    # path of the leaf, the last bit is the side of the leaf in its parent
+    prefix = key_bits >> (key_len - height)
+    path = []
+    for depth in range(height - 1, -1, -1):
+        if bitmap >> depth & 1:
+            sibling = audit_path[i]
+            i += 1
+        else:
+            sibling = _DEFAULT_NODE
+        if prefix & 1:
+            node = _sha256(sibling + node)
+        else:
+            node = _sha256(node + sibling)
+        prefix >>= 1
+        verified = verified_nodes.get((depth, prefix))
+        if verified is not None:
+            if verified != node:
+                return False
+            break
+        path.append(((depth, prefix), node))
+    else:
+        if node != root:
+            return False
+    verified_nodes.update(path)
+    return True
+
+
+def _verify_proof(root, key, value_hash, proof, verified_nodes):
+    """ Verify the inclusion or exclusion proof of key in root """
+    if proof.bitmap:
+        height = proof.height
+    else:
+        height = len(proof.auditPath)
+    if proof.inclusion:
+        return _verify_path(root, key, _leaf_hash(key, value_hash, height),
+                            proof, verified_nodes)
+    if not proof.proofKey:
+        # an empty subtree is on the path of key
+        return _verify_path(root, key, _DEFAULT_NODE, proof, verified_nodes)
+    # another leaf is on the path of key
+    proof_key = proof.proofKey
+    if proof_key == key or len(proof_key) != len(key):
+        return False
+    key_len = 8 * len(key)
+    if (int.from_bytes(key, 'big') ^ int.from_bytes(proof_key, 'big')) \
+            >> (key_len - height):
+        return False
+    return _verify_path(root, proof_key,
+                        _leaf_hash(proof_key, proof.proofVal, height),
+                        proof, verified_nodes)
+
+
+def verify_account_proof(state_proof, address, root):
+    """ Verify the state proof of the account at address in the state root.
+    Included states are only verified once per root.
+    """
+    if state_proof.key != address:
+        return False
+    account_key = (bytes(root), address)
+    state = state_proof.state.SerializeToString()
+    if state_proof.inclusion:
+        with _verified_accounts_lock:
+            verified = _verified_accounts.get(account_key)
+            if verified is not None:
+                _verified_accounts.move_to_end(account_key)
+                return verified == state
+    if not _verify_proof(root, _sha256(address), _sha256(state),
+                         state_proof, {}):
+        return False
+    if state_proof.inclusion:
+        with _verified_accounts_lock:
+            _verified_accounts[account_key] = state
+            if len(_verified_accounts) > _VERIFIED_ACCOUNTS_SIZE:
+                _verified_accounts.popitem(last=False)
+    return True
+
+
+def verify_var_proofs(var_proofs, trie_keys, storage_root):
+    """ Verify the proofs of many contract variables in a storage root
+    together. Hashes of subtrees on verified paths are cached, so the upper
+    path shared by the keys is only hashed once.
+    Return the verification result of each var proof.
+    """
+    verified_nodes = {}
+    return [
+        var_proof.key == trie_key and _verify_proof(
+            storage_root, trie_key, _sha256(var_proof.value), var_proof,
+            verified_nodes)
+        for var_proof, trie_key in zip(var_proofs, trie_keys)
+    ]
+
+
+def verify_sc_state(sc_state, root):
+    """ Verify a query_sc_state result in the state root: the contract
+    account proof is verified once for all the var proofs, which are
+    verified together in its storage root.
+    """
+    account = sc_state.account
+    if not verify_account_proof(account.state_proof, bytes(account.address),
+                                root):
+        return False
+    var_proofs = sc_state.var_proofs
+    if len(var_proofs) == 0:
+        return False
+    return all(verify_var_proofs(
+        var_proofs.var_proofs, var_proofs.storage_keys,
+        account.state_proof.state.storageRoot
+    ))
@@ -0,0 +1,189 @@
+import abc
+from concurrent.futures import (
+    Future,
+)
+import heapq
+import itertools
+import logging
+import threading
+import time
+from typing import (
+    List,
+    Tuple,
+)
+
+import aergo.herapy as herapy
+from web3 import (
+    Web3,
+)
+from web3.contract import (
+    Contract,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class AnchorWatcher(abc.ABC):
+    """ Follows the anchors made on a bridge contract with a single
+    subscription and wakes up together all the transfers waiting for an
+    anchor of their deposit.
+
+    The subscription is only open while transfers are waiting: wait()
+    starts following anchors and the watcher stops when the last waiting
+    transfer is anchored.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._waiters: List[Tuple[int, int, Future]] = []
+        self._count = itertools.count()
+        self._following = False
+        self._anchor_height = -1
+
+    @abc.abstractmethod
+    def query_anchor_height(self) -> int:
+        """ Query the last anchor height of the bridge contract """
+
+    @abc.abstractmethod
+    def _follow(self) -> None:
+        """ Pass new anchor heights to _on_anchor until it returns False """
+
+    def wait(self, deposit_height: int) -> Future:
+        """ Return a future resolving with the last anchor height once it
+        covers deposit_height.
+        """
+        future: Future = Future()
+        with self._lock:
+            if self._following:
+                if self._anchor_height >= deposit_height:
+                    future.set_result(self._anchor_height)
+                else:
+                    heapq.heappush(self._waiters,
+                                   (deposit_height, next(self._count), future))
+                return future
+        height = self.query_anchor_height()
+        with self._lock:
+            self._anchor_height = max(self._anchor_height, height)
+            if self._anchor_height >= deposit_height:
+                future.set_result(self._anchor_height)
+                return future
+            heapq.heappush(self._waiters,
+                           (deposit_height, next(self._count), future))
+            if not self._following:
+                self._following = True
+                threading.Thread(
+                    target=self._run, name="AnchorWatcher", daemon=True
+                ).start()
+        return future
+
+    def _on_anchor(self, height: int) -> bool:
+        """ Wake up the transfers anchored at height, return False when no
+        transfer is waiting anymore.
+        """
+        with self._lock:
+            self._anchor_height = max(self._anchor_height, height)
+            while (self._waiters
+                    and self._waiters[0][0] <= self._anchor_height):
+                _, _, future = heapq.heappop(self._waiters)
+                future.set_result(self._anchor_height)
+            if not self._waiters:
+                self._following = False
+                return False
+            return True
+
+    def _run(self) -> None:
+        try:
+            self._follow()
+        except Exception as e:
+            logger.warning("Anchor subscription failed: %s", e)
+            with self._lock:
+                for _, _, future in self._waiters:
+                    future.set_exception(e)
+                self._waiters = []
+                self._following = False
+
+
+class AergoAnchorWatcher(AnchorWatcher):
+    """ Follows the newAnchor events of an Aergo bridge """
+
+    def __init__(self, hera: herapy.Aergo, bridge: str) -> None:
+        super().__init__()
+        self.hera = hera
+        self.bridge = bridge
+
+    def query_anchor_height(self) -> int:
+        anchor_info = self.hera.query_sc_state(
+            self.bridge, ["_sv__anchorHeight"])
+        return int(anchor_info.var_proofs[0].value)
+
+    def _follow(self) -> None:
+        _, best_height = self.hera.get_blockchain_status()
+        stream = self.hera.receive_event_stream(
+            self.bridge, "newAnchor", start_block_no=best_height)
+        try:
+            # an anchor could have been made before the stream started
+            if not self._on_anchor(self.query_anchor_height()):
+                return
+            for event in stream:
+                if not self._on_anchor(event.arguments[1]):
+                    return
+        finally:
+            stream.stop()
+
+
+class EthAnchorWatcher(AnchorWatcher):
+    """ Follows the anchorEvent logs of an Ethereum bridge.
+
+    The log filter is polled with an exponential backoff (up to max_delay
+    seconds) while no anchor arrives. If the node doesn't keep the filter,
+    the anchor height is queried instead with the same backoff.
+    """
+
+    def __init__(
+        self,
+        w3: Web3,
+        eth_bridge: Contract,
+        max_delay: float = 16,
+    ) -> None:
+        super().__init__()
+        self.w3 = w3
+        self.eth_bridge = eth_bridge
+        self.max_delay = max_delay
+
+    def query_anchor_height(self) -> int:
+        return self.eth_bridge.functions._anchorHeight().call()
+
+    def _follow(self) -> None:
+        try:
+            anchor_filter = self.eth_bridge.events.anchorEvent.createFilter(
+                fromBlock='latest')
+        except ValueError:
+            # filters not supported by the node
+            anchor_filter = None
+        try:
+            # an anchor could have been made before the filter was created
+            if not self._on_anchor(self.query_anchor_height()):
+                return
+            delay: float = 1
+            while True:
+                time.sleep(delay)
+                delay = min(2 * delay, self.max_delay)
+                heights = []
+                if anchor_filter is not None:
+                    try:
+                        heights = [anchor.args.height for anchor
+                                   in anchor_filter.get_new_entries()]
+                    except ValueError:
+                        # filter expired or was dropped by a load balanced
+                        # node
+                        anchor_filter = None
+                if anchor_filter is None:
+                    heights = [self.query_anchor_height()]
+                if heights and max(heights) > self._anchor_height:
+                    delay = 1
+                for height in heights:
+                    if not self._on_anchor(height):
+                        return
+        finally:
+            if anchor_filter is not None:
+                self.w3.eth.uninstallFilter(anchor_filter.filter_id)
@@ -1,10 +1,16 @@
 import json
 from typing import (
+    Any,
+    Dict,
+    List,
     Tuple,
 )
 from eth_utils import (
     keccak,
 )
+from trie.exceptions import (
+    BadTrieProof,
+)
 from web3.datastructures import (
     AttributeDict,
 )
@@ -13,6 +19,9 @@ from web3 import (
     Web3,
 )
 import aergo.herapy as herapy
+from aergo.herapy.obj.sc_state import (
+    SCState
+)
 from aergo.herapy.obj.transaction import (
     Transaction
 )
@@ -21,6 +30,10 @@ from aergo_wallet.exceptions import (
     TxError,
     InvalidArgumentsError
 )
+from ethaergo_wallet.anchor_watcher import (
+    AergoAnchorWatcher,
+    AnchorWatcher,
+)
 from ethaergo_wallet.wallet_utils import (
     is_aergo_address,
     is_ethereum_address
@@ -76,6 +89,14 @@ def lock(
     return receipt.blockNumber, tx_hash.hex(), receipt
 
 
+def lock_trie_key(receiver: str, token_origin: str) -> bytes:
+    """ Storage key of the receiver's locked balance of token_origin """
+    account_ref = receiver.encode('utf-8') + bytes.fromhex(token_origin[2:])
+    # 'Locks is the 6th state var defined in solitity contract
+    position = b'\x05'
+    return keccak(account_ref + position.rjust(32, b'\0'))
+
+
 def build_lock_proof(
     w3: Web3,
     aergo_to: herapy.Aergo,
@@ -84,6 +105,7 @@ def build_lock_proof(
     bridge_to: str,
     lock_height: int,
     token_origin: str,
+    watcher: AnchorWatcher = None,
 ):
     """ Check the last anchored root includes the lock and build
     a lock proof for that root
@@ -96,12 +118,9 @@ def build_lock_proof(
         raise InvalidArgumentsError(
             "token_origin {} must be an Ethereum address".format(token_origin)
         )
-    account_ref = receiver.encode('utf-8') + bytes.fromhex(token_origin[2:])
-    # 'Locks is the 6th state var defined in solitity contract
-    position = b'\x05'
-    trie_key = keccak(account_ref + position.rjust(32, b'\0'))
+    trie_key = lock_trie_key(receiver, token_origin)
     return _build_deposit_proof(
-        w3, aergo_to, bridge_from, bridge_to, lock_height, trie_key
+        w3, aergo_to, bridge_from, bridge_to, lock_height, trie_key, watcher
     )
 
 
@@ -188,6 +207,14 @@ def burn(
     return receipt.blockNumber, tx_hash.hex(), receipt
 
 
+def burn_trie_key(receiver: str, token_origin: str) -> bytes:
+    """ Storage key of the receiver's burnt balance of token_origin """
+    account_ref = (receiver + token_origin).encode('utf-8')
+    # 'Burns is the 8th state var defined in solitity contract
+    position = b'\x07'
+    return keccak(account_ref + position.rjust(32, b'\0'))
+
+
 def build_burn_proof(
     w3: Web3,
     aergo_to: herapy.Aergo,
@@ -196,6 +223,7 @@ def build_burn_proof(
     bridge_to: str,
     burn_height: int,
     token_origin: str,
+    watcher: AnchorWatcher = None,
 ):
     """ Check the last anchored root includes the lock and build
     a lock proof for that root
@@ -208,12 +236,9 @@ def build_burn_proof(
         raise InvalidArgumentsError(
             "token_origin {} must be an Aergo address".format(token_origin)
         )
-    account_ref = (receiver + token_origin).encode('utf-8')
-    # 'Burns is the 8th state var defined in solitity contract
-    position = b'\x07'
-    trie_key = keccak(account_ref + position.rjust(32, b'\0'))
+    trie_key = burn_trie_key(receiver, token_origin)
     return _build_deposit_proof(
-        w3, aergo_to, bridge_from, bridge_to, burn_height, trie_key
+        w3, aergo_to, bridge_from, bridge_to, burn_height, trie_key, watcher
     )
 
 
@@ -286,20 +311,140 @@ def unfreeze(
     return str(tx.tx_hash), result
 
 
-def _build_deposit_proof(
-    w3: Web3,
+def finalize_call(
+    kind: str,
+    receiver: str,
+    storage_proof: AttributeDict,
+    token_origin: str,
+) -> Tuple[str, List]:
+    """ Bridge function and arguments finalizing a 'mint', 'unlock' or
+    'unfreeze' with the storage proof of the deposit.
+    """
+    ap = format_proof_for_lua(storage_proof.proof)
+    balance = int.from_bytes(storage_proof.value, "big")
+    ubig_balance = {'_bignum': str(balance)}
+    if kind == 'mint':
+        return kind, [receiver, ubig_balance, token_origin[2:].lower(), ap]
+    if kind == 'unlock':
+        return kind, [receiver, ubig_balance, token_origin, ap]
+    if kind == 'unfreeze':
+        return kind, [receiver, ubig_balance, ap]
+    raise InvalidArgumentsError("Unknown transfer kind: {}".format(kind))
+
+
+def _fill_nonce_gap(
+    aergo_to: herapy.Aergo,
+    nonce: int,
+    gas_limit: int,
+    gas_price: int,
+) -> bool:
+    """ Use a nonce rejected at commit with an empty transfer to self so
+    that the txs accepted with the following nonces can be mined.
+    """
+    tx = aergo_to.generate_tx(
+        to_address=aergo_to.account.address.value, nonce=nonce, amount=0,
+        gas_limit=gas_limit, gas_price=gas_price
+    )
+    _, result = aergo_to.send_tx(tx)
+    if result.status != herapy.CommitStatus.TX_OK:
+        logger.warning("Failed to fill nonce gap %s: %s", nonce, result)
+        return False
+    logger.info("Filled nonce gap %s", nonce)
+    return True
+
+
+def submit_batch(
+    aergo_to: herapy.Aergo,
+    bridge_to: str,
+    calls: List[Tuple[str, List]],
+    gas_limit: int,
+    gas_price: int,
+    batch_size: int = 100,
+) -> List[Dict[str, Any]]:
+    """ Call bridge_to with each (function, args) of calls.
+    Txs are signed with consecutive nonces and committed batch_size at a
+    time without waiting for execution, then all results are waited for.
+    If a tx is rejected at commit, the nonce gap it leaves behind the
+    accepted txs of its batch is filled and the following batches are not
+    submitted.
+    Return for each call a dict with the 'tx_hash' and execution 'result',
+    or the 'error' that prevented it.
+    """
+    aergo_to.get_account()
+    nonce = aergo_to.account.nonce
+    reports: List[Dict[str, Any]] = [
+        {'tx_hash': None, 'result': None, 'error': "Tx not submitted"}
+        for _ in calls
+    ]
+    submitted = []
+    for start in range(0, len(calls), batch_size):
+        txs = []
+        for func_name, args in calls[start:start + batch_size]:
+            nonce += 1
+            txs.append(aergo_to.new_call_sc_tx(
+                bridge_to, func_name, args=args, nonce=nonce,
+                gas_limit=gas_limit, gas_price=gas_price
+            ))
+        txs, results = aergo_to.batch_call_sc(txs)
+        accepted = []
+        rejected = []
+        for i, (tx, result) in enumerate(zip(txs, results)):
+            if result.status != herapy.CommitStatus.TX_OK:
+                reports[start + i]['error'] = \
+                    "Tx commit failed : {}".format(result)
+                rejected.append(tx.nonce)
+                continue
+            # txs accepted after a rejected one are in the mempool too
+            reports[start + i]['tx_hash'] = str(tx.tx_hash)
+            accepted.append((start + i, tx))
+        submitted.extend(accepted)
+        if not rejected:
+            continue
+        chain_nonce = aergo_to.get_account().nonce
+        last_accepted = max([tx.nonce for _, tx in accepted], default=0)
+        unfilled = [
+            gap for gap in rejected
+            if chain_nonce < gap < last_accepted
+            and not _fill_nonce_gap(aergo_to, gap, gas_limit, gas_price)
+        ]
+        if unfilled:
+            # txs behind an unfilled gap cannot be mined
+            first_gap = min(unfilled)
+            for i, tx in accepted:
+                if tx.nonce > first_gap:
+                    reports[i]['error'] = \
+                        "Tx stuck behind nonce gap {}: {}".format(
+                            first_gap, tx.tx_hash)
+            submitted = [(i, tx) for i, tx in submitted
+                         if tx.nonce < first_gap]
+        break
+
+    # txs are already in the mempool so they execute while results of
+    # previous ones are being waited for
+    for i, tx in submitted:
+        result = aergo_to.wait_tx_result(tx.tx_hash)
+        if result is None:
+            reports[i]['error'] = "Tx not found: {}".format(tx.tx_hash)
+        elif result.status != herapy.TxResultStatus.SUCCESS:
+            reports[i]['error'] = \
+                "Tx execution failed : {}".format(result)
+        else:
+            reports[i]['result'] = result
+            reports[i]['error'] = None
+    return reports
+
+
+def wait_anchor(
     aergo_to: herapy.Aergo,
-    bridge_from: str,
     bridge_to: str,
     deposit_height: int,
-    trie_key: bytes
-):
-    """ Check the last anchored root includes the deposit and build
-    a deposit (lock or burn) proof for that root
+    watcher: AnchorWatcher = None,
+) -> int:
+    """ Wait until a deposit at deposit_height is anchored on bridge_to and
+    return the last anchor height. Waiting transfers can share a watcher of
+    the anchors of bridge_to.
     """
-    bridge_from = Web3.toChecksumAddress(bridge_from)
     # check last merged height
-    _, aergo_current_height = aergo_to.get_blockchain_status()
     anchor_info = aergo_to.query_sc_state(bridge_to, ["_sv__anchorHeight"])
     if not anchor_info.account.state_proof.inclusion:
         raise InvalidArgumentsError(
@@ -309,36 +454,97 @@ def _build_deposit_proof(
         raise InvalidArgumentsError("Cannot query last anchored height",
                                     anchor_info)
     last_merged_height_to = int(anchor_info.var_proofs[0].value)
+    if last_merged_height_to >= deposit_height:
+        return last_merged_height_to
     # waite for anchor containing our transfer
-    stream = aergo_to.receive_event_stream(
-        bridge_to, "newAnchor", start_block_no=aergo_current_height
+    logger.info(
+        "\u23F0 deposit not recorded in current anchor, waiting new "
+        "anchor event... / deposit height : %s / last anchor height : %s ",
+        deposit_height, last_merged_height_to
     )
-    while last_merged_height_to < deposit_height:
-        logger.info(
-            "\u23F0 deposit not recorded in current anchor, waiting new "
-            "anchor event... / deposit height : %s / last anchor height : %s ",
-            deposit_height, last_merged_height_to
-        )
-        new_anchor_event = next(stream)
-        last_merged_height_to = new_anchor_event.arguments[1]
-    stream.stop()
-    # get inclusion proof of lock in last merged block
-    block = w3.eth.getBlock(last_merged_height_to)
-    eth_proof = w3.eth.getProof(bridge_from, [trie_key], last_merged_height_to)
+    if watcher is None:
+        watcher = AergoAnchorWatcher(aergo_to, bridge_to)
+    return watcher.wait(deposit_height).result()
+
+
+def build_deposits_proof(
+    w3: Web3,
+    bridge_from: str,
+    anchor_height: int,
+    trie_keys: List[bytes],
+) -> Dict[bytes, AttributeDict]:
+    """ Build and verify the proofs of all trie_keys at anchor_height with a
+    single eth_getProof: the account proof is verified once and each
+    storage proof against the account's storage root.
+    Return a mapping of trie key to its getProof result (with only that
+    key's storage proof), a key without deposit has an empty value.
+    """
+    bridge_from = Web3.toChecksumAddress(bridge_from)
+    block = w3.eth.getBlock(anchor_height)
+    eth_proof = w3.eth.getProof(bridge_from, trie_keys, anchor_height)
     try:
         verify_eth_getProof_inclusion(eth_proof, block.stateRoot)
-    except AssertionError as e:
+    except (AssertionError, BadTrieProof) as e:
         raise InvalidMerkleProofError("Unable to verify deposit proof",
                                       eth_proof, e)
-    if trie_key != eth_proof.storageProof[0].key:
-        raise InvalidMerkleProofError("Proof doesnt match requested key",
-                                      eth_proof, trie_key)
+    if [p.key for p in eth_proof.storageProof] != list(trie_keys):
+        raise InvalidMerkleProofError("Proof doesnt match requested keys",
+                                      eth_proof, trie_keys)
+    return {
+        bytes(storage_proof.key): AttributeDict(
+            dict(eth_proof, storageProof=[storage_proof]))
+        for storage_proof in eth_proof.storageProof
+    }
+
+
+def _build_deposit_proof(
+    w3: Web3,
+    aergo_to: herapy.Aergo,
+    bridge_from: str,
+    bridge_to: str,
+    deposit_height: int,
+    trie_key: bytes,
+    watcher: AnchorWatcher = None,
+):
+    """ Check the last anchored root includes the deposit and build
+    a deposit (lock or burn) proof for that root
+    """
+    last_merged_height_to = wait_anchor(
+        aergo_to, bridge_to, deposit_height, watcher)
+    # get inclusion proof of lock in last merged block
+    eth_proof = build_deposits_proof(
+        w3, bridge_from, last_merged_height_to, [trie_key])[trie_key]
     if len(eth_proof.storageProof[0].value) == 0:
         raise InvalidMerkleProofError("Trie key {} doesn't exist"
                                       .format(trie_key.hex()))
     return eth_proof
 
 
+def query_bridge_state(
+    hera: herapy.Aergo,
+    bridge_to: str,
+    storage_keys: List,
+) -> SCState:
+    """ Query storage_keys of bridge_to and check the bridge contract is
+    included in the state.
+    """
+    state = hera.query_sc_state(bridge_to, storage_keys, compressed=True)
+    if not state.account.state_proof.inclusion:
+        raise InvalidArgumentsError(
+            "Contract doesnt exist in state, check contract deployed and "
+            "chain synced {}".format(state))
+    return state
+
+
+def total_withdrawn(withdraw_proof: Any) -> int:
+    """ Amount already withdrawn by a receiver from the proof of its
+    withdrawals in the bridge (0 if it never withdrew).
+    """
+    if not withdraw_proof.inclusion:
+        return 0
+    return int(withdraw_proof.value.decode('utf-8')[1:-1])
+
+
 def withdrawable(
     bridge_from: str,
     bridge_to: str,
@@ -353,21 +559,12 @@ def withdrawable(
     total_deposit = int.from_bytes(storage_value, "big")
 
     # get total withdrawn and last anchor height
-    withdraw_proof = hera.query_sc_state(
-        bridge_to, ["_sv__anchorHeight", aergo_storage_key],
-        compressed=False
-    )
-    if not withdraw_proof.account.state_proof.inclusion:
-        raise InvalidArgumentsError(
-            "Contract doesnt exist in state, check contract deployed and "
-            "chain synced {}".format(withdraw_proof))
+    withdraw_proof = query_bridge_state(
+        hera, bridge_to, ["_sv__anchorHeight", aergo_storage_key])
     if not withdraw_proof.var_proofs[0].inclusion:
         raise InvalidMerkleProofError("Cannot query last anchored height",
                                       withdraw_proof)
-    total_withdrawn = 0
-    if withdraw_proof.var_proofs[1].inclusion:
-        total_withdrawn = int(withdraw_proof.var_proofs[1].value
-                              .decode('utf-8')[1:-1])
+    withdrawn = total_withdrawn(withdraw_proof.var_proofs[1])
     last_anchor_height = int(withdraw_proof.var_proofs[0].value)
 
     # get anchored deposit : total deposit before the last anchor
@@ -375,6 +572,6 @@ def withdrawable(
                                         last_anchor_height)
     anchored_deposit = int.from_bytes(storage_value, "big")
 
-    withdrawable_balance = anchored_deposit - total_withdrawn
+    withdrawable_balance = anchored_deposit - withdrawn
     pending = total_deposit - anchored_deposit
     return withdrawable_balance, pending
@@ -1,3 +1,8 @@
+from collections import (
+    OrderedDict,
+)
+import threading
+
 from eth_utils import (
     keccak,
 )
@@ -6,8 +11,11 @@ from rlp.sedes import (
     Binary,
     big_endian_int,
 )
-from trie import (
-    HexaryTrie,
+from trie.constants import (
+    BLANK_NODE_HASH,
+)
+from trie.exceptions import (
+    BadTrieProof,
 )
 from web3._utils.encoding import (
     pad_bytes,
@@ -25,34 +33,248 @@ def format_proof_nodes(proof):
     return trie_proof
 
 
-def verify_eth_getProof_inclusion(proof, root):
-    trie_root = Binary.fixed_length(32, allow_empty=True)
-    hash32 = Binary.fixed_length(32)
-
-    class _Account(rlp.Serializable):
-        fields = [
-            ('nonce', big_endian_int),
-            ('balance', big_endian_int),
-            ('storage', trie_root),
-            ('code_hash', hash32)
-        ]
-    acc = _Account(
+class _Account(rlp.Serializable):
+    fields = [
+        ('nonce', big_endian_int),
+        ('balance', big_endian_int),
+        ('storage', Binary.fixed_length(32, allow_empty=True)),
+        ('code_hash', Binary.fixed_length(32))
+    ]
+
+
+# decoded proof nodes: rlp node -> (node hash, decoded node)
+_proof_nodes: OrderedDict = OrderedDict()
+_proof_nodes_lock = threading.Lock()
+_PROOF_NODES_SIZE = 4096
+
+# account leaves already verified: (state root, address) -> rlp account
+_verified_accounts: OrderedDict = OrderedDict()
+_verified_accounts_lock = threading.Lock()
+_VERIFIED_ACCOUNTS_SIZE = 256
+
+_NIBBLES = {c: i for i, c in enumerate('0123456789abcdef')}
+
+
+def _decode_node(rlp_node):
+    """ Decode a trie node: branch nodes made of hashes and empty children
+    are decoded directly, other nodes with rlp.
+    """
+    if rlp_node[0] == 0xf9 and len(rlp_node) == 3 + (
+            rlp_node[1] << 8 | rlp_node[2]):
+        node = []
+        i = 3
+        end = len(rlp_node)
+        while i < end:
+            prefix = rlp_node[i]
+            if prefix == 0xa0:
+                node.append(rlp_node[i + 1:i + 33])
+                i += 33
+            elif prefix == 0x80:
+                node.append(b'')
+                i += 1
+            else:
+                return rlp.decode(rlp_node)
+        if len(node) == 17 and i == end:
+            return node
+    return rlp.decode(rlp_node)
+
+
+def index_proof_nodes(proof, nodes=None):
+    """ Add the nodes of a proof to a table of decoded nodes by hash.
+    A node is only hashed and decoded once: upper trie nodes shared by
+    many proofs are taken from a cache.
+    """
+    if nodes is None:
+        nodes = {}
+    for rlp_node in proof:
+        rlp_node = bytes(rlp_node)
+        with _proof_nodes_lock:
+            entry = _proof_nodes.get(rlp_node)
+            if entry is not None:
+                _proof_nodes.move_to_end(rlp_node)
+        if entry is None:
+            entry = (keccak(rlp_node), _decode_node(rlp_node))
+            with _proof_nodes_lock:
+                _proof_nodes[rlp_node] = entry
+                if len(_proof_nodes) > _PROOF_NODES_SIZE:
+                    _proof_nodes.popitem(last=False)
+        nodes[entry[0]] = entry[1]
+    return nodes
+
+
+def _decode_path(encoded_path):
+    """ Decode a hex prefix encoded path: (nibbles as hex, is leaf) """
+    hex_path = encoded_path.hex()
+    flag = _NIBBLES[hex_path[0]]
+    if flag & 1:
+        return hex_path[1:], bool(flag & 2)
+    return hex_path[2:], bool(flag & 2)
+
+
+def get_from_proof_nodes(root, key, nodes):
+    """ Walk the path of key from root in a table of proof nodes and return
+    the value of key (b'' if the proof shows key is not in the trie).
+    Raise BadTrieProof if a node of the path is not in the proof.
+    """
+    node_ref = bytes(root)
+    if node_ref == BLANK_NODE_HASH:
+        return b''
+    path = key.hex()
+    while True:
+        if isinstance(node_ref, list):
+            # node embedded in its parent
+            node = node_ref
+        elif node_ref == b'':
+            return b''
+        else:
+            try:
+                node = nodes[node_ref]
+            except KeyError:
+                raise BadTrieProof(
+                    "Missing proof node with hash {}".format(node_ref.hex()))
+        if len(node) == 17:
+            if not path:
+                return node[16]
+            node_ref = node[_NIBBLES[path[0]]]
+            path = path[1:]
+        elif len(node) == 2:
+            node_path, is_leaf = _decode_path(node[0])
+            if is_leaf:
+                return node[1] if path == node_path else b''
+            if not path.startswith(node_path):
+                return b''
+            path = path[len(node_path):]
+            node_ref = node[1]
+        else:
+            raise BadTrieProof("Invalid trie node {}".format(node))
+
+
+def get_many_from_proof_nodes(root, keys, nodes):
+    """ Walk the paths of many keys from root in a single traversal of a
+    table of proof nodes: each node is visited once for all the keys below
+    it. Return the values of keys (b'' if the proof shows a key is not in
+    the trie, None if a node of its path is not in the proof).
+    """
+    if bytes(root) == BLANK_NODE_HASH:
+        return [b''] * len(keys)
+    values = [None] * len(keys)
+    stack = [(bytes(root), [(i, key.hex()) for i, key in enumerate(keys)])]
+    while stack:
+        node_ref, items = stack.pop()
+        if isinstance(node_ref, list):
+            # node embedded in its parent
+            node = node_ref
+        elif node_ref == b'':
+            for i, _ in items:
+                values[i] = b''
+            continue
+        else:
+            node = nodes.get(node_ref)
+            if node is None:
+                continue
+        if len(node) == 17:
+            children = {}
+            for i, path in items:
+                if not path:
+                    values[i] = node[16]
+                else:
+                    children.setdefault(path[0], []).append((i, path[1:]))
+            for nibble, child_items in children.items():
+                stack.append((node[_NIBBLES[nibble]], child_items))
+        elif len(node) == 2:
+            node_path, is_leaf = _decode_path(node[0])
+            child_items = []
+            for i, path in items:
+                if is_leaf:
+                    values[i] = node[1] if path == node_path else b''
+                elif path.startswith(node_path):
+                    child_items.append((i, path[len(node_path):]))
+                else:
+                    values[i] = b''
+            if child_items:
+                stack.append((node[1], child_items))
+    return values
+
+
+def verify_eth_account_proof(proof, root):
+    """ Verify the account of a getProof result is included in the state
+    root. The account leaf of an address is only looked up once per state
+    root, following proofs are checked against the verified leaf.
+    """
+    rlp_account = rlp.encode(_Account(
         proof.nonce, proof.balance, proof.storageHash, proof.codeHash
+    ))
+    address = bytes.fromhex(proof.address[2:])
+    account_key = (bytes(root), address)
+    with _verified_accounts_lock:
+        verified = _verified_accounts.get(account_key)
+        if verified is not None:
+            _verified_accounts.move_to_end(account_key)
+    if verified is None:
+        verified = get_from_proof_nodes(
+            root, keccak(address), index_proof_nodes(proof.accountProof))
+        # the leaf is authenticated by the root even if it doesn't match
+        with _verified_accounts_lock:
+            _verified_accounts[account_key] = verified
+            if len(_verified_accounts) > _VERIFIED_ACCOUNTS_SIZE:
+                _verified_accounts.popitem(last=False)
+    assert rlp_account == verified, \
+        "Failed to verify account proof {}".format(proof.address)
+    return True
+
+
+def _storage_trie_key(key):
+    return keccak(pad_bytes(b'\x00', 32, key))
+
+
+def _rlp_storage_value(value):
+    if value == b'\x00':
+        return b''
+    return rlp.encode(value)
+
+
+def verify_eth_storage_proof(storage_hash, storage_proof, nodes=None):
+    """ Verify a storage proof against the account's storage root.
+    nodes can be a table of proof nodes shared with other storage proofs.
+    """
+    trie_key = _storage_trie_key(storage_proof.key)
+    rlp_value = _rlp_storage_value(storage_proof.value)
+    nodes = index_proof_nodes(storage_proof.proof, nodes)
+    assert rlp_value == get_from_proof_nodes(
+        storage_hash, trie_key, nodes
+    ), "Failed to verify storage proof {}".format(storage_proof.key)
+    return True
+
+
+def verify_eth_storage_proofs(storage_hash, storage_proofs):
+    """ Verify many (key, value, proof) storage proofs against one storage
+    root. The nodes of all proofs are hashed and decoded once in a
+    deduplicated table and all paths are verified in a single traversal.
+    Return the verification result of each storage proof.
+    """
+    rlp_nodes = {
+        bytes(rlp_node)
+        for _, _, proof in storage_proofs for rlp_node in proof
+    }
+    nodes = index_proof_nodes(rlp_nodes)
+    values = get_many_from_proof_nodes(
+        storage_hash,
+        [_storage_trie_key(key) for key, _, _ in storage_proofs],
+        nodes
     )
-    rlp_account = rlp.encode(acc)
-    trie_key = keccak(bytes.fromhex(proof.address[2:]))
-
-    assert rlp_account == HexaryTrie.get_from_proof(
-        root, trie_key, format_proof_nodes(proof.accountProof)
-    ), "Failed to verify account proof {}".format(proof.address)
-    for storage_proof in proof.storageProof:
-        trie_key = keccak(pad_bytes(b'\x00', 32, storage_proof.key))
-        root = proof.storageHash
-        if storage_proof.value == b'\x00':
-            rlp_value = b''
-        else:
-            rlp_value = rlp.encode(storage_proof.value)
-        assert rlp_value == HexaryTrie.get_from_proof(
-            root, trie_key, format_proof_nodes(storage_proof.proof)
-        ), "Failed to verify storage proof {}".format(storage_proof.key)
+    return [
+        proven is not None and proven == _rlp_storage_value(value)
+        for (_, value, _), proven in zip(storage_proofs, values)
+    ]
+
+
+def verify_eth_getProof_inclusion(proof, root):
+    verify_eth_account_proof(proof, root)
+    verified = verify_eth_storage_proofs(
+        proof.storageHash,
+        [(p.key, p.value, p.proof) for p in proof.storageProof]
+    )
+    for storage_proof, ok in zip(proof.storageProof, verified):
+        assert ok, \
+            "Failed to verify storage proof {}".format(storage_proof.key)
     return True
@@ -1,6 +1,10 @@
 from getpass import getpass
+import json
+import threading
 from typing import (
+    Any,
     Dict,
+    List,
     Tuple
 )
 import aergo_wallet.wallet_utils as aergo_u
@@ -8,6 +12,11 @@ from eth_utils import (
     keccak,
 )
 
+from ethaergo_wallet.anchor_watcher import (
+    AergoAnchorWatcher,
+    AnchorWatcher,
+    EthAnchorWatcher,
+)
 from ethaergo_wallet.wallet_config import (
     WalletConfig,
 )
@@ -55,6 +64,9 @@ class EthAergoWallet(WalletConfig):
         # this way if users use the same eth-merkle-bridge file structure,
         # config files can be shared
         self.root_path = root_path
+        # one anchor subscription per bridge for all waiting transfers
+        self._anchor_watchers: Dict[Tuple[str, str], AnchorWatcher] = {}
+        self._anchor_watchers_lock = threading.Lock()
 
     def eth_to_aergo_sidechain(
         self,
@@ -198,7 +210,7 @@ class EthAergoWallet(WalletConfig):
 
         lock_proof = eth_to_aergo.build_lock_proof(
             w3, aergo_to, receiver, bridge_from, bridge_to, lock_height,
-            asset_address
+            asset_address, self.anchor_watcher(from_chain, to_chain)
         )
         logger.info("\u2699 Built lock proof")
 
@@ -320,7 +332,7 @@ class EthAergoWallet(WalletConfig):
 
         lock_proof = eth_to_aergo.build_lock_proof(
             w3, aergo_to, receiver, bridge_from, bridge_to, lock_height,
-            asset_address
+            asset_address, self.anchor_watcher(from_chain, to_chain)
         )
         logger.info("\u2699 Built lock proof")
 
@@ -365,7 +377,7 @@ class EthAergoWallet(WalletConfig):
 
         burn_proof = eth_to_aergo.build_burn_proof(
             w3, aergo_to, receiver, bridge_from, bridge_to, burn_height,
-            asset_address
+            asset_address, self.anchor_watcher(from_chain, to_chain)
         )
         logger.info("\u2699 Built burn proof")
 
@@ -396,6 +408,132 @@ class EthAergoWallet(WalletConfig):
 
         return tx_hash
 
+    def finalize_batch_to_aergo(
+        self,
+        from_chain: str,
+        to_chain: str,
+        deposit_height: int = 0,
+        mints: List[Tuple[str, str]] = None,
+        unlocks: List[Tuple[str, str]] = None,
+        unfreezes: List[str] = None,
+        privkey_name: str = 'default',
+        privkey_pwd: str = None,
+        batch_size: int = 100,
+    ) -> List[Dict[str, Any]]:
+        """ Finalize many transfers to Aergo deposited before the same
+        anchor: mints and unlocks of (receiver, asset_name) and unfreezes of
+        receivers.
+        Proofs of all deposits are built with one eth_getProof at the first
+        anchor after deposit_height and all txs are sent with consecutive
+        nonces before waiting for their results.
+        Return for each transfer (mints, then unlocks, then unfreezes) a dict
+        with its 'kind', 'receiver', 'asset_name', 'tx_hash' and 'error'.
+        """
+        logger.info(from_chain + ' -> ' + to_chain)
+        transfers = []
+        for receiver, asset_name in mints or []:
+            token_origin = self.get_asset_address(asset_name, from_chain)
+            transfers.append((
+                'mint', receiver, asset_name,
+                eth_to_aergo.lock_trie_key(receiver, token_origin),
+                token_origin
+            ))
+        for receiver, asset_name in unlocks or []:
+            token_origin = self.get_asset_address(asset_name, to_chain)
+            transfers.append((
+                'unlock', receiver, asset_name,
+                eth_to_aergo.burn_trie_key(receiver, token_origin),
+                token_origin
+            ))
+        if unfreezes:
+            try:
+                aergo_erc20 = self.get_asset_address('aergo_erc20',
+                                                     from_chain)
+            except KeyError:
+                raise InvalidArgumentsError(
+                    "aergo_erc20 is not configured on {}, can't unfreeze"
+                    .format(from_chain)
+                )
+        for receiver in unfreezes or []:
+            transfers.append((
+                'unfreeze', receiver, 'aergo_erc20',
+                eth_to_aergo.lock_trie_key(receiver, aergo_erc20),
+                aergo_erc20
+            ))
+        for _, receiver, _, _, _ in transfers:
+            if not is_aergo_address(receiver):
+                raise InvalidArgumentsError(
+                    "Receiver {} must be an Aergo address".format(receiver)
+                )
+        if len(transfers) == 0:
+            return []
+
+        w3 = self.get_web3(from_chain)
+        aergo_to = self.get_aergo(to_chain, privkey_name, privkey_pwd)
+        tx_sender = str(aergo_to.account.address)
+        bridge_to = self.get_bridge_contract_address(to_chain, from_chain)
+        bridge_from = self.get_bridge_contract_address(from_chain, to_chain)
+
+        gas_limit = 300000
+        aer_balance = aergo_u.get_balance(tx_sender, 'aergo', aergo_to)
+        if aer_balance < len(transfers) * gas_limit * self.aergo_gas_price:
+            err = "not enough aer balance to pay tx fees"
+            raise InsufficientBalanceError(err)
+
+        anchor_height = eth_to_aergo.wait_anchor(
+            aergo_to, bridge_to, deposit_height,
+            self.anchor_watcher(from_chain, to_chain))
+        proofs = eth_to_aergo.build_deposits_proof(
+            w3, bridge_from, anchor_height,
+            [trie_key for _, _, _, trie_key, _ in transfers]
+        )
+        logger.info("\u2699 Built %s deposit proofs", len(transfers))
+
+        reports = []
+        calls = []
+        for kind, receiver, asset_name, trie_key, token_origin in transfers:
+            storage_proof = proofs[trie_key].storageProof[0]
+            report: Dict[str, Any] = {
+                'kind': kind, 'receiver': receiver, 'asset_name': asset_name,
+                'tx_hash': None, 'error': None
+            }
+            reports.append(report)
+            if len(storage_proof.value) == 0:
+                report['error'] = "No deposit anchored"
+                continue
+            calls.append((report, eth_to_aergo.finalize_call(
+                kind, receiver, storage_proof, token_origin)))
+
+        results = eth_to_aergo.submit_batch(
+            aergo_to, bridge_to, [call for _, call in calls], gas_limit,
+            self.aergo_gas_price, batch_size
+        )
+        save_config = False
+        for (report, _), result in zip(calls, results):
+            report['tx_hash'] = result['tx_hash']
+            report['error'] = result['error']
+            if report['error'] is not None or report['kind'] != 'mint':
+                continue
+            # record new mint addresses in config file
+            token_pegged = json.loads(result['result'].detail)[0]
+            try:
+                self.get_asset_address(report['asset_name'], to_chain,
+                                       asset_origin_chain=from_chain)
+            except KeyError:
+                self.config_data(
+                    'networks', from_chain, 'tokens', report['asset_name'],
+                    'pegs', to_chain, value=token_pegged)
+                save_config = True
+        aergo_to.disconnect()
+        if save_config:
+            logger.info("------ Store mint address in config.json -----------")
+            self.save_config()
+        logger.info(
+            "\u26cf Finalized %s/%s transfers",
+            sum(1 for r in reports if r['error'] is None), len(reports)
+        )
+        return reports
+
     def mintable_to_aergo(
         self,
         from_chain: str,
@@ -652,7 +790,8 @@ class EthAergoWallet(WalletConfig):
 
         lock_proof = aergo_to_eth.build_lock_proof(
             aergo_from, w3, receiver, bridge_from, bridge_to, bridge_to_abi,
-            lock_height, asset_address
+            lock_height, asset_address,
+            self.anchor_watcher(from_chain, to_chain)
         )
         logger.info("\u2699 Built lock proof")
 
@@ -777,7 +916,8 @@ class EthAergoWallet(WalletConfig):
 
         burn_proof = aergo_to_eth.build_burn_proof(
             aergo_from, w3, receiver, bridge_from, bridge_to, bridge_to_abi,
-            burn_height, asset_address
+            burn_height, asset_address,
+            self.anchor_watcher(from_chain, to_chain)
         )
         logger.info("\u2699 Built burn proof")
 
@@ -861,6 +1001,45 @@ class EthAergoWallet(WalletConfig):
             bridge_from, bridge_to, hera, w3, aergo_storage_key, eth_trie_key
         )
 
+    def anchor_watcher(
+        self,
+        from_chain: str,
+        to_chain: str,
+    ) -> AnchorWatcher:
+        """ Watcher of the anchors of from_chain on the bridge of to_chain,
+        shared by all the transfers finalized with this wallet.
+        """
+        with self._anchor_watchers_lock:
+            watcher = self._anchor_watchers.get((from_chain, to_chain))
+            if watcher is not None:
+                return watcher
+            bridge_to = self.get_bridge_contract_address(to_chain, from_chain)
+            if self.config_data('networks', to_chain, 'type') == 'aergo':
+                # the watcher keeps its own connection
+                watcher = AergoAnchorWatcher(
+                    self.connect_aergo(to_chain), bridge_to)
+            else:
+                w3 = self.get_web3(to_chain)
+                eth_bridge = w3.eth.contract(
+                    address=bridge_to,
+                    abi=self.load_bridge_abi(to_chain, from_chain)
+                )
+                watcher = EthAnchorWatcher(w3, eth_bridge)
+            self._anchor_watchers[(from_chain, to_chain)] = watcher
+            return watcher
+
+    def wait_anchor(
+        self,
+        from_chain: str,
+        to_chain: str,
+        deposit_height: int,
+    ) -> int:
+        """ Wait until a deposit at deposit_height on from_chain is anchored
+        on to_chain and return the anchor height.
+        """
+        return self.anchor_watcher(from_chain, to_chain).wait(
+            deposit_height).result()
+
     def connect_aergo(self, network_name: str) -> herapy.Aergo:
         aergo = herapy.Aergo()
         aergo.connect(self.config_data('networks', network_name, 'ip'))
@@ -72,15 +72,24 @@ def run(start_index: int, batch_count: int, service_key: str):
     # The service_key privkey will unfreeze balances of batch_count nb of
     # different addresses
     # Unfreezes mapping will contain batch_count nb of new entries.
+    # proofs of all receivers are queried and verified together
+    trie_keys = [eth_to_aergo.lock_trie_key(receiver, erc20_address)
+                 for receiver in aergo_addrs]
+    anchor_height = eth_to_aergo.wait_anchor(hera, aergo_bridge, lock_height)
+    lock_proofs = eth_to_aergo.build_deposits_proof(
+        w3, eth_bridge, anchor_height, trie_keys)
     for i, receiver in enumerate(aergo_addrs):
         while True:
             # retry because unfreeze can fail if a new anchor came right after
             # the merkle proof was queried
             print(i)
-            lock_proof = eth_to_aergo.build_lock_proof(
-                w3, hera, receiver, eth_bridge, aergo_bridge, lock_height,
-                erc20_address
-            )
+            lock_proof = lock_proofs.get(trie_keys[i])
+            if lock_proof is None:
+                lock_proof = eth_to_aergo.build_lock_proof(
+                    w3, hera, receiver, eth_bridge, aergo_bridge, lock_height,
+                    erc20_address
+                )
+            lock_proofs.pop(trie_keys[i], None)
             try:
                 eth_to_aergo.unfreeze(
                     hera, receiver, lock_proof, aergo_bridge, 0, 0
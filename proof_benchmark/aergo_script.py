@@ -0,0 +1,197 @@
+import argparse
+import hashlib
+import os
+import random
+import time
+
+from aergo.herapy.account import (
+    Account,
+)
+from aergo.herapy.grpc.blockchain_pb2 import (
+    AccountProof,
+    ContractVarProof,
+    State,
+)
+from aergo.herapy.obj.sc_state import (
+    SCState,
+)
+from aergo.herapy.obj.var_proof import (
+    VarProofs,
+)
+
+from ethaergo_wallet.aergo_utils import merkle_proof
+from ethaergo_wallet.aergo_utils.merkle_proof import (
+    verify_sc_state,
+)
+
+DEFAULT_NODE = bytes([0])
+
+
+def sha256(data):
+    return hashlib.sha256(data).digest()
+
+
+class SparseMerkleTrie():
+    """ Aergo sparse merkle trie of (trie key, value hash) leaves built in
+    memory to generate proofs like an Aergo node.
+    """
+
+    def __init__(self, leaves):
+        self.leaves = leaves
+        self.nodes = {}
+        self.shortcuts = {}
+        self.root = self._build(0, 0, sorted(leaves))
+
+    def _build(self, depth, prefix, keys):
+        if not keys:
+            return DEFAULT_NODE
+        if len(keys) == 1:
+            key = keys[0]
+            node = sha256(key + self.leaves[key] + bytes([256 - depth]))
+            self.shortcuts[(depth, prefix)] = key
+        else:
+            bit = 1 << (255 - depth)
+            right = [k for k in keys if int.from_bytes(k, 'big') & bit]
+            left = keys[:len(keys) - len(right)]
+            node = sha256(self._build(depth + 1, prefix << 1, left)
+                          + self._build(depth + 1, prefix << 1 | 1, right))
+        self.nodes[(depth, prefix)] = node
+        return node
+
+    def proof(self, key, proof_cls, compressed=True):
+        """ Inclusion or exclusion proof of key """
+        key_bits = int.from_bytes(key, 'big')
+        siblings = []
+        depth, prefix = 0, 0
+        while (depth, prefix) in self.nodes \
+                and (depth, prefix) not in self.shortcuts:
+            bit = key_bits >> (255 - depth) & 1
+            siblings.append(self.nodes.get(
+                (depth + 1, prefix << 1 | (1 - bit)), DEFAULT_NODE))
+            depth, prefix = depth + 1, prefix << 1 | bit
+        proof = proof_cls(key=key)
+        leaf_key = self.shortcuts.get((depth, prefix))
+        if leaf_key == key:
+            proof.inclusion = True
+        elif leaf_key is not None:
+            proof.proofKey = leaf_key
+            proof.proofVal = self.leaves[leaf_key]
+        if not compressed:
+            proof.auditPath.extend(reversed(siblings))
+            return proof
+        # bitmap bits of the levels from the leaf to the root
+        bitmap = 0
+        for sibling in reversed(siblings):
+            bitmap = bitmap << 1 | (sibling != DEFAULT_NODE)
+        size = depth // 8 + 1
+        proof.height = depth
+        proof.bitmap = (bitmap << (8 * size - depth)).to_bytes(size, 'big')
+        proof.auditPath.extend(
+            s for s in reversed(siblings) if s != DEFAULT_NODE)
+        return proof
+
+
+def build_state(accounts, deposits):
+    """ State trie of accounts accounts with a bridge contract of deposits
+    variables, return (state root, bridge address, bridge state, state
+    trie, storage trie, storage values).
+    """
+    values = {
+        sha256(os.urandom(32)): '"{}"'.format(
+            random.randrange(10**18)).encode()
+        for _ in range(deposits)
+    }
+    storage = SparseMerkleTrie(
+        {key: sha256(value) for key, value in values.items()})
+    bridge = os.urandom(33)
+    bridge_state = State(nonce=1, storageRoot=storage.root,
+                         codeHash=sha256(b'bridge code'))
+    states = {sha256(bridge): sha256(bridge_state.SerializeToString())}
+    for _ in range(accounts - 1):
+        state = State(nonce=random.randrange(100),
+                      balance=os.urandom(8))
+        states[sha256(os.urandom(33))] = sha256(state.SerializeToString())
+    state_trie = SparseMerkleTrie(states)
+    return (state_trie.root, bridge, bridge_state, state_trie, storage,
+            values)
+
+
+def query_sc_state(state_trie, bridge, bridge_state, storage, values,
+                   trie_keys):
+    """ Build a query_sc_state result of trie_keys like herapy """
+    contract_proof = state_trie.proof(sha256(bridge), AccountProof)
+    contract_proof.key = bridge
+    contract_proof.state.CopyFrom(bridge_state)
+    var_proofs = []
+    for trie_key in trie_keys:
+        var_proof = storage.proof(trie_key, ContractVarProof)
+        if var_proof.inclusion:
+            var_proof.value = values[trie_key]
+        var_proofs.append(var_proof)
+    account = Account(empty=True)
+    account.state = contract_proof.state
+    account.state_proof = contract_proof
+    account.address = bridge
+    return SCState(account=account,
+                   var_proofs=VarProofs(var_proofs, trie_keys))
+
+
+def clear_caches():
+    merkle_proof._verified_accounts.clear()
+
+
+def bench(verify, queries, root, cold):
+    start = time.perf_counter()
+    for sc_state in queries:
+        if cold:
+            clear_caches()
+        assert verify(sc_state, root)
+    return time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Compare Aergo query_sc_state proof verification with '
+        'herapy and with aergo_utils.merkle_proof.verify_sc_state.')
+    parser.add_argument('--accounts', type=int, default=100000,
+                        help='Accounts in the state trie (default 100000)')
+    parser.add_argument('--deposits', type=int, default=100000,
+                        help='Variables of the bridge (default 100000)')
+    parser.add_argument('-k', '--keys', type=int, nargs='+',
+                        default=[1, 10, 100, 1000],
+                        help='Variables per query (default 1 10 100 1000)')
+    parser.add_argument('-n', '--proofs', type=int, default=2000,
+                        help='Var proofs verified per mode (default 2000)')
+    args = parser.parse_args()
+
+    root, bridge, bridge_state, state_trie, storage, values = build_state(
+        args.accounts, args.deposits)
+    key_list = list(values)
+    for keys in args.keys:
+        queries = []
+        for _ in range(max(1, args.proofs // keys)):
+            # deposited keys and a key without deposit
+            trie_keys = random.sample(key_list, keys - 1) + \
+                [sha256(os.urandom(32))]
+            queries.append(query_sc_state(
+                state_trie, bridge, bridge_state, storage, values,
+                trie_keys))
+        contract_proof = queries[0].account.state_proof
+        print({
+            'keys per query': keys,
+            'account proof height': contract_proof.height,
+            'var proof height': queries[0].var_proofs[0].height,
+        })
+        runs = [
+            ('herapy', lambda sc_state, root: sc_state.verify_proof(root),
+             True),
+            ('verifier, cold caches', verify_sc_state, True),
+            ('verifier, same anchor', verify_sc_state, False),
+        ]
+        for name, verify, cold in runs:
+            duration = bench(verify, queries, root, cold)
+            print({
+                'mode': name,
+                'us/query': round(duration / len(queries) * 1e6, 1),
+                'us/key': round(duration / len(queries) / keys * 1e6, 1),
+            })
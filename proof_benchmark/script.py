@@ -0,0 +1,237 @@
+import argparse
+import os
+import random
+import time
+
+from eth_utils import (
+    keccak,
+    to_checksum_address,
+)
+from hexbytes import (
+    HexBytes,
+)
+import rlp
+from rlp.sedes import (
+    Binary,
+    big_endian_int,
+)
+from trie import (
+    HexaryTrie,
+)
+from web3._utils.encoding import (
+    pad_bytes,
+)
+from web3.datastructures import (
+    AttributeDict,
+)
+
+from ethaergo_wallet.eth_utils import merkle_proof
+from ethaergo_wallet.eth_utils.merkle_proof import (
+    format_proof_nodes,
+    verify_eth_getProof_inclusion,
+    verify_eth_storage_proof,
+    verify_eth_storage_proofs,
+)
+
+
+def legacy_verify_eth_getProof_inclusion(proof, root):
+    """ Verification with py-trie as done before the dedicated verifier """
+    class _Account(rlp.Serializable):
+        fields = [
+            ('nonce', big_endian_int),
+            ('balance', big_endian_int),
+            ('storage', Binary.fixed_length(32, allow_empty=True)),
+            ('code_hash', Binary.fixed_length(32))
+        ]
+    acc = _Account(
+        proof.nonce, proof.balance, proof.storageHash, proof.codeHash
+    )
+    rlp_account = rlp.encode(acc)
+    trie_key = keccak(bytes.fromhex(proof.address[2:]))
+    assert rlp_account == HexaryTrie.get_from_proof(
+        root, trie_key, format_proof_nodes(proof.accountProof)
+    ), "Failed to verify account proof {}".format(proof.address)
+    for storage_proof in proof.storageProof:
+        trie_key = keccak(pad_bytes(b'\x00', 32, storage_proof.key))
+        if storage_proof.value == b'\x00':
+            rlp_value = b''
+        else:
+            rlp_value = rlp.encode(storage_proof.value)
+        assert rlp_value == HexaryTrie.get_from_proof(
+            proof.storageHash, trie_key,
+            format_proof_nodes(storage_proof.proof)
+        ), "Failed to verify storage proof {}".format(storage_proof.key)
+    return True
+
+
+def new_trie(items):
+    trie = HexaryTrie({})
+    with trie.squash_changes() as batch:
+        for key, value in items:
+            batch[key] = value
+    return trie
+
+
+def build_state(accounts, deposits):
+    """ Build a state trie of accounts random accounts with a bridge
+    account holding deposits storage slots, return
+    (state root, bridge address, bridge account, storage trie, slots).
+    """
+    slots = {os.urandom(32): random.randrange(1, 2**64)
+             for _ in range(deposits)}
+    storage = new_trie(
+        (keccak(slot), rlp.encode(value.to_bytes(8, 'big').lstrip(b'\x00')))
+        for slot, value in slots.items()
+    )
+    bridge = os.urandom(20)
+    bridge_account = [1, 0, storage.root_hash, keccak(b'bridge code')]
+    state_items = [(keccak(bridge), rlp.encode(bridge_account))]
+    for _ in range(accounts - 1):
+        account = [random.randrange(100), random.randrange(2**64),
+                   keccak(b''), keccak(b'')]
+        state_items.append((keccak(os.urandom(20)), rlp.encode(account)))
+    state = new_trie(state_items)
+    return state, bridge, bridge_account, storage, slots
+
+
+def get_proof(state, bridge, bridge_account, storage, slots, keys):
+    """ Build a getProof result of keys like a web3 provider """
+    storage_proofs = []
+    for key in keys:
+        value = slots.get(key, 0).to_bytes(8, 'big').lstrip(b'\x00')
+        storage_proofs.append(AttributeDict({
+            'key': HexBytes(key),
+            'value': HexBytes(value or b'\x00'),
+            'proof': [HexBytes(rlp.encode(node))
+                      for node in storage.get_proof(keccak(key))],
+        }))
+    nonce, balance, storage_hash, code_hash = bridge_account
+    return AttributeDict({
+        'address': to_checksum_address(bridge),
+        'accountProof': [HexBytes(rlp.encode(node))
+                         for node in state.get_proof(keccak(bridge))],
+        'balance': balance,
+        'codeHash': HexBytes(code_hash),
+        'nonce': nonce,
+        'storageHash': HexBytes(storage_hash),
+        'storageProof': storage_proofs,
+    })
+
+
+def clear_caches():
+    merkle_proof._proof_nodes.clear()
+    merkle_proof._verified_accounts.clear()
+
+
+def bench(verify, proofs, root, cold):
+    start = time.perf_counter()
+    for proof in proofs:
+        if cold:
+            clear_caches()
+        verify(proof, root)
+    return time.perf_counter() - start
+
+
+def legacy_storage_loop(storage_hash, storage_proofs):
+    for storage_proof in storage_proofs:
+        trie_key = keccak(pad_bytes(b'\x00', 32, storage_proof.key))
+        if storage_proof.value == b'\x00':
+            rlp_value = b''
+        else:
+            rlp_value = rlp.encode(storage_proof.value)
+        assert rlp_value == HexaryTrie.get_from_proof(
+            storage_hash, trie_key, format_proof_nodes(storage_proof.proof))
+
+
+def storage_loop(storage_hash, storage_proofs):
+    # each key is verified on its own: shared nodes are decoded again
+    for storage_proof in storage_proofs:
+        clear_caches()
+        verify_eth_storage_proof(storage_hash, storage_proof)
+
+
+def storage_batch(storage_hash, storage_proofs):
+    clear_caches()
+    verified = verify_eth_storage_proofs(
+        storage_hash,
+        [(p.key, p.value, p.proof) for p in storage_proofs]
+    )
+    assert all(verified)
+
+
+def bench_storage(verify, proofs):
+    start = time.perf_counter()
+    for proof in proofs:
+        verify(proof.storageHash, proof.storageProof)
+    return time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Compare Ethereum getProof verification with py-trie '
+        'and with merkle_proof.verify_eth_getProof_inclusion.')
+    parser.add_argument('--accounts', type=int, default=30000,
+                        help='Accounts in the state trie (default 30000)')
+    parser.add_argument('--deposits', type=int, default=5000,
+                        help='Storage slots of the bridge (default 5000)')
+    parser.add_argument('-k', '--keys', type=int, default=10,
+                        help='Storage keys per getProof (default 10)')
+    parser.add_argument('-n', '--proofs', type=int, default=200,
+                        help='getProof results verified (default 200)')
+    parser.add_argument('--batch_keys', type=int, default=100,
+                        help='Storage proofs verified together against one '
+                        'storageHash (default 100)')
+    parser.add_argument('--batches', type=int, default=20,
+                        help='Batches of storage proofs verified '
+                        '(default 20)')
+    args = parser.parse_args()
+
+    state, bridge, bridge_account, storage, slots = build_state(
+        args.accounts, args.deposits)
+    slot_list = list(slots)
+    proofs = []
+    for _ in range(args.proofs):
+        # deposited keys and a key without deposit
+        keys = random.sample(slot_list, args.keys - 1) + [os.urandom(32)]
+        proofs.append(get_proof(
+            state, bridge, bridge_account, storage, slots, keys))
+    root = state.root_hash
+    print({
+        'account proof depth': len(proofs[0].accountProof),
+        'storage proof depth': len(proofs[0].storageProof[0].proof),
+        'keys per getProof': args.keys,
+    })
+    for proof in proofs:
+        legacy_verify_eth_getProof_inclusion(proof, root)
+        verify_eth_getProof_inclusion(proof, root)
+
+    runs = [
+        ('py-trie', legacy_verify_eth_getProof_inclusion, True),
+        ('verifier, cold caches', verify_eth_getProof_inclusion, True),
+        ('verifier, same anchor', verify_eth_getProof_inclusion, False),
+    ]
+    for name, verify, cold in runs:
+        duration = bench(verify, proofs, root, cold)
+        print({
+            'mode': name,
+            'us/getProof': round(duration / len(proofs) * 1e6, 1),
+            'us/key': round(duration / len(proofs) / args.keys * 1e6, 1),
+        })
+
+    batches = [
+        get_proof(state, bridge, bridge_account, storage, slots,
+                  random.sample(slot_list, args.batch_keys))
+        for _ in range(args.batches)
+    ]
+    runs = [
+        ('py-trie, per key', legacy_storage_loop),
+        ('verifier, per key', storage_loop),
+        ('verifier, batch', storage_batch),
+    ]
+    for name, verify in runs:
+        duration = bench_storage(verify, batches)
+        print({
+            'mode': name,
+            'keys per batch': args.batch_keys,
+            'keys/s': round(len(batches) * args.batch_keys / duration),
+        })
@@ -0,0 +1,22 @@
+import pytest
+
+from merkle_tries import (
+    build_aergo_state,
+    build_eth_state,
+    clear_caches,
+)
+
+
+@pytest.fixture(scope="module")
+def eth_state():
+    return build_eth_state(200, 50)
+
+
+@pytest.fixture(scope="module")
+def aergo_state():
+    return build_aergo_state(200, 50)
+
+
+@pytest.fixture
+def cold_caches():
+    clear_caches()
@@ -0,0 +1,210 @@
+""" In memory Ethereum and Aergo state tries generating proofs like the
+nodes do, to test the merkle proof verifiers without a node.
+"""
+import hashlib
+import os
+import random
+
+from aergo.herapy.account import (
+    Account,
+)
+from aergo.herapy.grpc.blockchain_pb2 import (
+    AccountProof,
+    ContractVarProof,
+    State,
+)
+from aergo.herapy.obj.sc_state import (
+    SCState,
+)
+from aergo.herapy.obj.var_proof import (
+    VarProofs,
+)
+from eth_utils import (
+    keccak,
+    to_checksum_address,
+)
+from hexbytes import (
+    HexBytes,
+)
+import rlp
+from trie import (
+    HexaryTrie,
+)
+from web3.datastructures import (
+    AttributeDict,
+)
+
+from ethaergo_wallet.aergo_utils import merkle_proof as aergo_merkle_proof
+from ethaergo_wallet.eth_utils import merkle_proof as eth_merkle_proof
+
+DEFAULT_NODE = bytes([0])
+
+
+def new_trie(items):
+    trie = HexaryTrie({})
+    with trie.squash_changes() as batch:
+        for key, value in items:
+            batch[key] = value
+    return trie
+
+
+def build_eth_state(accounts, deposits):
+    """ Build a state trie of accounts random accounts with a bridge
+    account holding deposits storage slots, return
+    (state trie, bridge address, bridge account, storage trie, slots).
+    """
+    slots = {os.urandom(32): random.randrange(1, 2**64)
+             for _ in range(deposits)}
+    storage = new_trie(
+        (keccak(slot), rlp.encode(value.to_bytes(8, 'big').lstrip(b'\x00')))
+        for slot, value in slots.items()
+    )
+    bridge = os.urandom(20)
+    bridge_account = [1, 0, storage.root_hash, keccak(b'bridge code')]
+    state_items = [(keccak(bridge), rlp.encode(bridge_account))]
+    for _ in range(accounts - 1):
+        account = [random.randrange(100), random.randrange(2**64),
+                   keccak(b''), keccak(b'')]
+        state_items.append((keccak(os.urandom(20)), rlp.encode(account)))
+    state = new_trie(state_items)
+    return state, bridge, bridge_account, storage, slots
+
+
+def get_proof(state, bridge, bridge_account, storage, slots, keys):
+    """ Build a getProof result of keys like a web3 provider """
+    storage_proofs = []
+    for key in keys:
+        value = slots.get(key, 0).to_bytes(8, 'big').lstrip(b'\x00')
+        storage_proofs.append(AttributeDict({
+            'key': HexBytes(key),
+            'value': HexBytes(value or b'\x00'),
+            'proof': [HexBytes(rlp.encode(node))
+                      for node in storage.get_proof(keccak(key))],
+        }))
+    nonce, balance, storage_hash, code_hash = bridge_account
+    return AttributeDict({
+        'address': to_checksum_address(bridge),
+        'accountProof': [HexBytes(rlp.encode(node))
+                         for node in state.get_proof(keccak(bridge))],
+        'balance': balance,
+        'codeHash': HexBytes(code_hash),
+        'nonce': nonce,
+        'storageHash': HexBytes(storage_hash),
+        'storageProof': storage_proofs,
+    })
+
+
+def sha256(data):
+    return hashlib.sha256(data).digest()
+
+
+class SparseMerkleTrie():
+    """ Aergo sparse merkle trie of (trie key, value hash) leaves built in
+    memory to generate proofs like an Aergo node.
+    """
+
+    def __init__(self, leaves):
+        self.leaves = leaves
+        self.nodes = {}
+        self.shortcuts = {}
+        self.root = self._build(0, 0, sorted(leaves))
+
+    def _build(self, depth, prefix, keys):
+        if not keys:
+            return DEFAULT_NODE
+        if len(keys) == 1:
+            key = keys[0]
+            node = sha256(key + self.leaves[key] + bytes([256 - depth]))
+            self.shortcuts[(depth, prefix)] = key
+        else:
+            bit = 1 << (255 - depth)
+            right = [k for k in keys if int.from_bytes(k, 'big') & bit]
+            left = keys[:len(keys) - len(right)]
+            node = sha256(self._build(depth + 1, prefix << 1, left)
+                          + self._build(depth + 1, prefix << 1 | 1, right))
+        self.nodes[(depth, prefix)] = node
+        return node
+
+    def proof(self, key, proof_cls, compressed=True):
+        """ Inclusion or exclusion proof of key """
+        key_bits = int.from_bytes(key, 'big')
+        siblings = []
+        depth, prefix = 0, 0
+        while (depth, prefix) in self.nodes \
+                and (depth, prefix) not in self.shortcuts:
+            bit = key_bits >> (255 - depth) & 1
+            siblings.append(self.nodes.get(
+                (depth + 1, prefix << 1 | (1 - bit)), DEFAULT_NODE))
+            depth, prefix = depth + 1, prefix << 1 | bit
+        proof = proof_cls(key=key)
+        leaf_key = self.shortcuts.get((depth, prefix))
+        if leaf_key == key:
+            proof.inclusion = True
+        elif leaf_key is not None:
+            proof.proofKey = leaf_key
+            proof.proofVal = self.leaves[leaf_key]
+        if not compressed:
+            proof.auditPath.extend(reversed(siblings))
+            return proof
+        # bitmap bits of the levels from the leaf to the root
+        bitmap = 0
+        for sibling in reversed(siblings):
+            bitmap = bitmap << 1 | (sibling != DEFAULT_NODE)
+        size = depth // 8 + 1
+        proof.height = depth
+        proof.bitmap = (bitmap << (8 * size - depth)).to_bytes(size, 'big')
+        proof.auditPath.extend(
+            s for s in reversed(siblings) if s != DEFAULT_NODE)
+        return proof
+
+
+def build_aergo_state(accounts, deposits):
+    """ State trie of accounts accounts with a bridge contract of deposits
+    variables, return (state root, bridge address, bridge state, state
+    trie, storage trie, storage values).
+    """
+    values = {
+        sha256(os.urandom(32)): '"{}"'.format(
+            random.randrange(10**18)).encode()
+        for _ in range(deposits)
+    }
+    storage = SparseMerkleTrie(
+        {key: sha256(value) for key, value in values.items()})
+    bridge = os.urandom(33)
+    bridge_state = State(nonce=1, storageRoot=storage.root,
+                         codeHash=sha256(b'bridge code'))
+    states = {sha256(bridge): sha256(bridge_state.SerializeToString())}
+    for _ in range(accounts - 1):
+        state = State(nonce=random.randrange(100),
+                      balance=os.urandom(8))
+        states[sha256(os.urandom(33))] = sha256(state.SerializeToString())
+    state_trie = SparseMerkleTrie(states)
+    return (state_trie.root, bridge, bridge_state, state_trie, storage,
+            values)
+
+
+def query_sc_state(state_trie, bridge, bridge_state, storage, values,
+                   trie_keys):
+    """ Build a query_sc_state result of trie_keys like herapy """
+    contract_proof = state_trie.proof(sha256(bridge), AccountProof)
+    contract_proof.key = bridge
+    contract_proof.state.CopyFrom(bridge_state)
+    var_proofs = []
+    for trie_key in trie_keys:
+        var_proof = storage.proof(trie_key, ContractVarProof)
+        if var_proof.inclusion:
+            var_proof.value = values[trie_key]
+        var_proofs.append(var_proof)
+    account = Account(empty=True)
+    account.state = contract_proof.state
+    account.state_proof = contract_proof
+    account.address = bridge
+    return SCState(account=account,
+                   var_proofs=VarProofs(var_proofs, trie_keys))
+
+
+def clear_caches():
+    """ Empty the caches of the verifiers so each test starts cold """
+    eth_merkle_proof._proof_nodes.clear()
+    eth_merkle_proof._verified_accounts.clear()
+    aergo_merkle_proof._verified_accounts.clear()
@@ -0,0 +1,162 @@
+import os
+
+from aergo.herapy.grpc.blockchain_pb2 import (
+    ContractVarProof,
+)
+import pytest
+
+from ethaergo_wallet.aergo_utils.merkle_proof import (
+    verify_sc_state,
+    verify_var_proofs,
+)
+from merkle_tries import (
+    query_sc_state,
+    sha256,
+)
+
+pytestmark = pytest.mark.usefixtures('cold_caches')
+
+
+def query(aergo_state, trie_keys):
+    root, bridge, bridge_state, state_trie, storage, values = aergo_state
+    return root, query_sc_state(
+        state_trie, bridge, bridge_state, storage, values, trie_keys)
+
+
+def var_proof(aergo_state, trie_key, compressed=True):
+    storage, values = aergo_state[4], aergo_state[5]
+    proof = storage.proof(trie_key, ContractVarProof, compressed)
+    if proof.inclusion:
+        proof.value = values[trie_key]
+    return storage.root, proof
+
+
+def absent_keys(aergo_state):
+    """ Absent keys with an exclusion proof by an empty subtree and by
+    another leaf on their path
+    """
+    storage = aergo_state[4]
+    empty = None
+    while empty is None:
+        trie_key = sha256(os.urandom(32))
+        proof = storage.proof(trie_key, ContractVarProof)
+        if not proof.inclusion and not proof.proofKey:
+            empty = trie_key
+    # the last bit of a key is only used to separate it from its neighbour
+    key = list(aergo_state[5])[0]
+    neighbour = key[:-1] + bytes([key[-1] ^ 1])
+    return [empty, neighbour]
+
+
+def test_verify_inclusion(aergo_state):
+    trie_keys = list(aergo_state[5])[:10]
+    root, sc_state = query(aergo_state, trie_keys)
+    assert all(p.inclusion for p in sc_state.var_proofs)
+    # the generated proofs are also valid for herapy
+    assert sc_state.verify_proof(root)
+    assert verify_sc_state(sc_state, root)
+    # verified again with the cached account state
+    assert verify_sc_state(sc_state, root)
+
+
+def test_verify_absent_keys(aergo_state):
+    trie_keys = absent_keys(aergo_state)
+    root, sc_state = query(aergo_state, trie_keys)
+    assert not sc_state.var_proofs[0].proofKey
+    assert sc_state.var_proofs[1].proofKey == list(aergo_state[5])[0]
+    assert sc_state.verify_proof(root)
+    assert verify_sc_state(sc_state, root)
+
+
+def test_verify_uncompressed_proofs(aergo_state):
+    trie_keys = list(aergo_state[5])[:3] + absent_keys(aergo_state)
+    storage_root = aergo_state[4].root
+    proofs = [var_proof(aergo_state, trie_key, compressed=False)[1]
+              for trie_key in trie_keys]
+    assert all(len(p.auditPath) > 0 and not p.bitmap for p in proofs)
+    assert all(verify_var_proofs(proofs, trie_keys, storage_root))
+
+
+def test_tampered_value(aergo_state):
+    trie_keys = list(aergo_state[5])[:3]
+    root, sc_state = query(aergo_state, trie_keys)
+    sc_state.var_proofs[1].value = b'"1"'
+    assert not verify_sc_state(sc_state, root)
+    assert verify_var_proofs(
+        sc_state.var_proofs.var_proofs, trie_keys,
+        sc_state.account.state_proof.state.storageRoot
+    ) == [True, False, True]
+
+
+def test_tampered_account(aergo_state):
+    root, sc_state = query(aergo_state, list(aergo_state[5])[:1])
+    sc_state.account.state_proof.state.nonce += 1
+    assert not verify_sc_state(sc_state, root)
+    # the verified account state is cached per root
+    sc_state.account.state_proof.state.nonce -= 1
+    assert verify_sc_state(sc_state, root)
+    sc_state.account.state_proof.state.nonce += 1
+    assert not verify_sc_state(sc_state, root)
+
+
+@pytest.mark.parametrize('absent', [False, True])
+def test_tampered_audit_path(aergo_state, absent):
+    if absent:
+        trie_key = absent_keys(aergo_state)[1]
+    else:
+        trie_key = list(aergo_state[5])[0]
+    root, proof = var_proof(aergo_state, trie_key)
+    assert verify_var_proofs([proof], [trie_key], root) == [True]
+
+    tampered = ContractVarProof()
+    tampered.CopyFrom(proof)
+    tampered.auditPath[0] = sha256(tampered.auditPath[0])
+    assert verify_var_proofs([tampered], [trie_key], root) == [False]
+
+    tampered.CopyFrom(proof)
+    del tampered.auditPath[-1]
+    assert verify_var_proofs([tampered], [trie_key], root) == [False]
+
+    tampered.CopyFrom(proof)
+    tampered.auditPath.append(sha256(b'sibling'))
+    assert verify_var_proofs([tampered], [trie_key], root) == [False]
+
+
+def test_tampered_bitmap(aergo_state):
+    trie_key = list(aergo_state[5])[0]
+    root, proof = var_proof(aergo_state, trie_key)
+    for i in range(proof.height):
+        tampered = ContractVarProof()
+        tampered.CopyFrom(proof)
+        bitmap = bytearray(tampered.bitmap)
+        bitmap[i // 8] ^= 0x80 >> (i % 8)
+        tampered.bitmap = bytes(bitmap)
+        assert verify_var_proofs([tampered], [trie_key], root) == [False]
+    tampered.CopyFrom(proof)
+    tampered.height += 1
+    assert verify_var_proofs([tampered], [trie_key], root) == [False]
+
+
+def test_reject_exclusion_proof_of_included_key(aergo_state):
+    trie_key = list(aergo_state[5])[0]
+    root, proof = var_proof(aergo_state, trie_key)
+    # the path of the key's own leaf hashes to the root
+    forged = ContractVarProof()
+    forged.CopyFrom(proof)
+    forged.inclusion = False
+    forged.proofKey = trie_key
+    forged.proofVal = sha256(proof.value)
+    forged.value = b''
+    assert verify_var_proofs([forged], [trie_key], root) == [False]
+
+    # an exclusion proof must be for a leaf on the path of the key
+    other = list(aergo_state[5])[1]
+    forged.proofKey = other
+    forged.proofVal = sha256(aergo_state[5][other])
+    assert verify_var_proofs([forged], [trie_key], root) == [False]
+
+
+def test_reject_proof_of_other_key(aergo_state):
+    trie_keys = list(aergo_state[5])[:2]
+    root, proof = var_proof(aergo_state, trie_keys[0])
+    assert verify_var_proofs([proof], trie_keys[1:], root) == [False]
@@ -284,3 +284,48 @@ def test_erc20_withdrawable(bridge_wallet):
         eth_user, burn_height,
         privkey_pwd='1234'
     )
+
+
+def test_finalize_batch_to_aergo(bridge_wallet):
+    aergo_receiver = bridge_wallet.config_data('wallet', 'receiver', 'addr')
+
+    balance_erc20_before, _ = bridge_wallet.get_balance_aergo(
+        'test_erc20', 'aergo-local', 'eth-poa-local',
+        account_addr=aergo_receiver
+    )
+    balance_aer_before, _ = bridge_wallet.get_balance_aergo(
+        'aergo_erc20', 'aergo-local', 'eth-poa-local',
+        account_addr=aergo_receiver
+    )
+    bridge_wallet.lock_to_aergo(
+        'eth-poa-local', 'aergo-local', 'test_erc20',
+        5*10**18, aergo_receiver, privkey_pwd='1234'
+    )
+    lock_height, _ = bridge_wallet.lock_to_aergo(
+        'eth-poa-local', 'aergo-local', 'aergo_erc20',
+        5*10**18, aergo_receiver, privkey_pwd='1234'
+    )
+
+    # both deposits are finalized with the proofs of the same anchor
+    reports = bridge_wallet.finalize_batch_to_aergo(
+        'eth-poa-local', 'aergo-local', lock_height,
+        mints=[(aergo_receiver, 'test_erc20')],
+        unfreezes=[aergo_receiver],
+        privkey_name='default', privkey_pwd='1234'
+    )
+    assert [report['kind'] for report in reports] == ['mint', 'unfreeze']
+    for report in reports:
+        assert report['error'] is None
+        assert report['tx_hash'] is not None
+
+    balance_erc20_after, _ = bridge_wallet.get_balance_aergo(
+        'test_erc20', 'aergo-local', 'eth-poa-local',
+        account_addr=aergo_receiver
+    )
+    balance_aer_after, _ = bridge_wallet.get_balance_aergo(
+        'aergo_erc20', 'aergo-local', 'eth-poa-local',
+        account_addr=aergo_receiver
+    )
+    # tx fees are paid by the sender of the batch
+    assert balance_erc20_after == balance_erc20_before + 5*10**18
+    assert balance_aer_after == balance_aer_before + 5*10**18
@@ -0,0 +1,126 @@
+import os
+
+from eth_utils import (
+    keccak,
+)
+from hexbytes import (
+    HexBytes,
+)
+import pytest
+from trie.exceptions import (
+    BadTrieProof,
+)
+from web3.datastructures import (
+    AttributeDict,
+)
+
+from ethaergo_wallet.eth_utils.merkle_proof import (
+    get_many_from_proof_nodes,
+    index_proof_nodes,
+    verify_eth_getProof_inclusion,
+    verify_eth_storage_proof,
+    verify_eth_storage_proofs,
+)
+from merkle_tries import (
+    get_proof,
+)
+
+pytestmark = pytest.mark.usefixtures('cold_caches')
+
+
+def getProof(eth_state, keys):
+    state, bridge, bridge_account, storage, slots = eth_state
+    return state.root_hash, get_proof(
+        state, bridge, bridge_account, storage, slots, keys)
+
+
+def with_storage_proof(eth_proof, i, **fields):
+    """ Copy of a getProof result with fields of storage proof i replaced """
+    storage_proofs = list(eth_proof.storageProof)
+    storage_proofs[i] = AttributeDict(dict(storage_proofs[i], **fields))
+    return AttributeDict(dict(eth_proof, storageProof=storage_proofs))
+
+
+def tamper(rlp_node):
+    return HexBytes(rlp_node[:-1] + bytes([rlp_node[-1] ^ 1]))
+
+
+def test_verify_inclusion(eth_state):
+    keys = list(eth_state[4])[:10]
+    root, proof = getProof(eth_state, keys)
+    assert verify_eth_getProof_inclusion(proof, root)
+    # verified again with the cached account leaf and proof nodes
+    assert verify_eth_getProof_inclusion(proof, root)
+
+
+def test_verify_absent_keys(eth_state):
+    keys = [os.urandom(32) for _ in range(5)]
+    root, proof = getProof(eth_state, keys)
+    assert all(p.value == HexBytes(b'\x00') for p in proof.storageProof)
+    assert verify_eth_getProof_inclusion(proof, root)
+
+
+def test_tampered_storage_value(eth_state):
+    keys = list(eth_state[4])[:3]
+    root, proof = getProof(eth_state, keys)
+    value = proof.storageProof[1].value
+    tampered = with_storage_proof(
+        proof, 1, value=HexBytes(value[:-1] + bytes([value[-1] ^ 1])))
+    with pytest.raises(AssertionError):
+        verify_eth_getProof_inclusion(tampered, root)
+    # an absent key can't be proven with a value
+    tampered = with_storage_proof(proof, 1, key=HexBytes(os.urandom(32)))
+    with pytest.raises(AssertionError):
+        verify_eth_getProof_inclusion(tampered, root)
+
+
+def test_tampered_account(eth_state):
+    root, proof = getProof(eth_state, list(eth_state[4])[:1])
+    tampered = AttributeDict(dict(proof, balance=proof.balance + 1))
+    with pytest.raises(AssertionError):
+        verify_eth_getProof_inclusion(tampered, root)
+    # the verified account leaf is cached per root
+    assert verify_eth_getProof_inclusion(proof, root)
+    with pytest.raises(AssertionError):
+        verify_eth_getProof_inclusion(tampered, root)
+
+
+def test_tampered_nodes(eth_state):
+    root, proof = getProof(eth_state, list(eth_state[4])[:1])
+    account_proof = list(proof.accountProof)
+    account_proof[-1] = tamper(account_proof[-1])
+    tampered = AttributeDict(dict(proof, accountProof=account_proof))
+    with pytest.raises(BadTrieProof):
+        verify_eth_getProof_inclusion(tampered, root)
+
+    storage_proof = proof.storageProof[0]
+    nodes = list(storage_proof.proof)
+    nodes[-1] = tamper(nodes[-1])
+    with pytest.raises(BadTrieProof):
+        verify_eth_storage_proof(
+            proof.storageHash, AttributeDict(dict(storage_proof, proof=nodes))
+        )
+    tampered = with_storage_proof(proof, 0, proof=nodes)
+    with pytest.raises(AssertionError):
+        verify_eth_getProof_inclusion(tampered, root)
+
+
+def test_missing_node_fails_only_its_key(eth_state):
+    keys = list(eth_state[4])[:3]
+    _, proof = getProof(eth_state, keys)
+    storage_proofs = [(p.key, p.value, p.proof) for p in proof.storageProof]
+    # the leaf of the second key is only in its own proof
+    key, value, nodes = storage_proofs[1]
+    storage_proofs[1] = (key, value, nodes[:-1])
+    assert verify_eth_storage_proofs(proof.storageHash, storage_proofs) == \
+        [True, False, True]
+
+    nodes = index_proof_nodes(
+        {bytes(n) for _, _, proof_nodes in storage_proofs
+         for n in proof_nodes})
+    values = get_many_from_proof_nodes(
+        proof.storageHash, [keccak(key) for key, _, _ in storage_proofs],
+        nodes
+    )
+    assert values[1] is None
+    assert values[0] and values[2]
@@ -0,0 +1,213 @@
+from concurrent.futures import (
+    Future,
+)
+import threading
+import time
+from types import (
+    SimpleNamespace,
+)
+
+import aergo.herapy as herapy
+import pytest
+
+from unfreeze_service.tx_submitter import (
+    NonceManagedSubmitter,
+    TxSubmitError,
+    _Request,
+)
+
+# seconds to wait for the tracker thread (it checks receipts every second)
+TIMEOUT = 5
+
+
+class StubAddress():
+    value = b'submitter'
+
+    def __str__(self):
+        return 'AmSubmitter'
+
+
+class StubHera():
+    """ Aergo node with a mempool: txs are mined in nonce order when mine()
+    is called, commit_errors make the commit of a nonce fail once.
+    """
+
+    def __init__(self, chain_nonce=0):
+        self.account = SimpleNamespace(address=StubAddress())
+        self.chain_nonce = chain_nonce
+        self.mempool = {}
+        self.results = {}
+        self.sent = []
+        self.commit_errors = {}
+        self.failing = set()
+        self.replaced = set()
+        self.lock = threading.Lock()
+
+    def get_account(self, address=None):
+        with self.lock:
+            return SimpleNamespace(nonce=self.chain_nonce)
+
+    def new_call_sc_tx(self, contract, func_name, args, nonce, gas_limit,
+                       gas_price):
+        return SimpleNamespace(nonce=nonce, tx_hash='call-{}'.format(nonce),
+                               amount=None)
+
+    def generate_tx(self, to_address, nonce, amount, gas_limit, gas_price):
+        return SimpleNamespace(nonce=nonce, tx_hash='fill-{}'.format(nonce),
+                               amount=amount)
+
+    def _commit(self, tx):
+        status = self.commit_errors.pop(tx.nonce, None)
+        if status is None:
+            if tx.nonce <= self.chain_nonce:
+                status = herapy.CommitStatus.TX_NONCE_TOO_LOW
+            elif tx.nonce in self.mempool:
+                if self.mempool[tx.nonce].tx_hash == tx.tx_hash:
+                    status = herapy.CommitStatus.TX_ALREADY_EXISTS
+                else:
+                    status = herapy.CommitStatus.TX_HAS_SAME_NONCE
+            else:
+                status = herapy.CommitStatus.TX_OK
+                self.mempool[tx.nonce] = tx
+        return SimpleNamespace(status=status, detail=status.name,
+                               json=lambda: status.name)
+
+    def batch_call_sc(self, txs):
+        with self.lock:
+            return txs, [self._commit(tx) for tx in txs]
+
+    def send_tx(self, tx):
+        with self.lock:
+            self.sent.append(tx)
+            return tx, self._commit(tx)
+
+    def mine(self):
+        with self.lock:
+            while self.chain_nonce + 1 in self.mempool:
+                tx = self.mempool.pop(self.chain_nonce + 1)
+                self.chain_nonce = tx.nonce
+                if tx.tx_hash in self.failing:
+                    status = herapy.TxResultStatus.ERROR
+                else:
+                    status = herapy.TxResultStatus.SUCCESS
+                self.results[tx.tx_hash] = SimpleNamespace(
+                    status=status, detail=status.name)
+
+    def get_tx_result(self, tx_hash):
+        if tx_hash in self.replaced:
+            raise herapy.errors.exception.CommunicationException(
+                "tx not found")
+        return self.results[tx_hash]
+
+
+@pytest.fixture
+def hera():
+    return StubHera(chain_nonce=5)
+
+
+@pytest.fixture
+def submitter(hera):
+    submitter = NonceManagedSubmitter(
+        hera, 'AmBridge', gas_limit=300000, gas_price=0,
+        resubmit_after=1.5
+    )
+    yield submitter
+    submitter.stop()
+
+
+def request(func_name='unfreeze'):
+    return _Request(func_name, [], Future(), 0)
+
+
+def test_submit_consecutive_nonces(hera, submitter):
+    tx_hashes = [submitter.submit('unfreeze', []).result(TIMEOUT)
+                 for _ in range(3)]
+    assert tx_hashes == ['call-6', 'call-7', 'call-8']
+    assert submitter.pending_count() == 3
+    # txs are mined without waiting for them
+    hera.mine()
+    watchers = [submitter.watch(tx_hash) for tx_hash in tx_hashes]
+    for watcher in watchers:
+        assert watcher.result(TIMEOUT).status == \
+            herapy.TxResultStatus.SUCCESS
+    assert submitter.pending_count() == 0
+    # the tx of an already mined hash is resolved immediately
+    assert submitter.watch('call-6').done()
+
+
+def test_fill_nonce_gap(hera, submitter):
+    hera.commit_errors[7] = herapy.CommitStatus.TX_INSUFFICIENT_BALANCE
+    requests = [request() for _ in range(3)]
+    submitter._commit(requests)
+    assert requests[0].future.result() == 'call-6'
+    with pytest.raises(TxSubmitError):
+        requests[1].future.result()
+    assert requests[2].future.result() == 'call-8'
+    # the rejected nonce is used by an empty transfer to self
+    fill = hera.sent[-1]
+    assert (fill.nonce, fill.amount) == (7, 0)
+    watcher = submitter.watch('call-8')
+    hera.mine()
+    assert hera.chain_nonce == 8
+    assert watcher.result(TIMEOUT).status == herapy.TxResultStatus.SUCCESS
+    # the next request continues after the accepted txs
+    assert submitter.submit('unfreeze', []).result(TIMEOUT) == 'call-9'
+
+
+def test_no_gap_after_last_accepted(hera, submitter):
+    hera.commit_errors[8] = herapy.CommitStatus.TX_INSUFFICIENT_BALANCE
+    requests = [request() for _ in range(3)]
+    submitter._commit(requests)
+    with pytest.raises(TxSubmitError):
+        requests[2].future.result()
+    # nothing to fill after the last accepted tx: the nonce is reused
+    assert hera.sent == []
+    assert submitter.submit('unfreeze', []).result(TIMEOUT) == 'call-8'
+
+
+def test_retry_nonce_used_by_other_client(hera, submitter):
+    # another client of the account mined a tx with the next nonce
+    hera.chain_nonce = 6
+    assert submitter.submit('unfreeze', []).result(TIMEOUT) == 'call-7'
+
+
+def test_retry_attempts_limited(hera, submitter):
+    # a tx of another client with the next nonce is pending
+    hera.mempool[6] = SimpleNamespace(nonce=6, tx_hash='other-6')
+    future = submitter.submit('unfreeze', [])
+    with pytest.raises(TxSubmitError):
+        future.result(TIMEOUT)
+    assert submitter.pending_count() == 0
+
+
+def test_resubmit_dropped_tx(hera, submitter):
+    tx_hash = submitter.submit('unfreeze', []).result(TIMEOUT)
+    watcher = submitter.watch(tx_hash)
+    # the node dropped the tx from its mempool
+    hera.mempool.clear()
+    deadline = time.time() + TIMEOUT
+    while not hera.sent and time.time() < deadline:
+        time.sleep(0.1)
+    # the same signed tx is broadcast again
+    assert hera.sent[0].tx_hash == tx_hash
+    hera.mine()
+    assert watcher.result(TIMEOUT).status == herapy.TxResultStatus.SUCCESS
+
+
+def test_watch_failed_tx(hera, submitter):
+    tx_hash = submitter.submit('unfreeze', []).result(TIMEOUT)
+    hera.failing.add(tx_hash)
+    watcher = submitter.watch(tx_hash)
+    hera.mine()
+    with pytest.raises(TxSubmitError):
+        watcher.result(TIMEOUT)
+
+
+def test_watch_replaced_tx(hera, submitter):
+    tx_hash = submitter.submit('unfreeze', []).result(TIMEOUT)
+    hera.replaced.add(tx_hash)
+    watchers = [submitter.watch(tx_hash) for _ in range(2)]
+    hera.mine()
+    for watcher in watchers:
+        with pytest.raises(TxSubmitError, match="replaced"):
+            watcher.result(TIMEOUT)
@@ -1,10 +1,16 @@
 import grpc
+import time
 
+from unfreeze_service.server import (
+    _LOCAL_TEST_RECENT_UNFREEZE_TTL,
+)
 from unfreeze_service.unfreeze_service_pb2_grpc import (
     UnfreezeServiceStub,
 )
 from unfreeze_service.unfreeze_service_pb2 import (
     AccountRef,
+    AccountRefs,
+    StatusUpdate,
 )
 
 
@@ -38,6 +44,10 @@ def test_aergo_erc20_unfreeze_service(bridge_wallet):
     # request unfreeze
     status = stub.RequestUnfreeze(account_ref)
     assert not status.error
+    # repeated requests get the tx recently broadcast
+    status_again = stub.RequestUnfreeze(account_ref)
+    assert not status_again.error
+    assert status_again.txHash == status.txHash
 
     # assert success and store tx_hash
     # request again
@@ -60,6 +70,102 @@ def test_aergo_erc20_unfreeze_service(bridge_wallet):
     assert balance_destination_after_ser == \
         balance_destination_before_ser + 1000 - tx_fee
 
-    # check error returned if amount to unfreeze doesnt cover fee
+    # check error returned if amount to unfreeze doesnt cover fee once the
+    # service (started with --local_test) forgot the recent tx
+    time.sleep(_LOCAL_TEST_RECENT_UNFREEZE_TTL)
     status = stub.RequestUnfreeze(account_ref)
     assert status.error == "Aergo native to unfreeze doesnt cover the fee"
+
+
+def test_aergo_erc20_unfreeze_stream(bridge_wallet):
+    aergo_receiver = bridge_wallet.config_data('wallet', 'receiver', 'addr')
+    channel = grpc.insecure_channel('localhost:7891')
+    stub = UnfreezeServiceStub(channel)
+    account_ref = AccountRef(receiver=aergo_receiver)
+
+    balance_before, _ = bridge_wallet.get_balance_aergo(
+        'aergo_erc20', 'aergo-local', 'eth-poa-local',
+        account_addr=aergo_receiver
+    )
+    bridge_wallet.lock_to_aergo(
+        'eth-poa-local', 'aergo-local', 'aergo_erc20',
+        5*10**18, aergo_receiver, privkey_pwd='1234'
+    )
+    pending = 1
+    while pending != 0:
+        _, pending = bridge_wallet.unfreezable(
+            'eth-poa-local', 'aergo-local', aergo_receiver)
+
+    # the stream follows the request until the tx is committed
+    updates = list(stub.RequestUnfreezeStream(account_ref))
+    assert [update.state for update in updates] == [
+        StatusUpdate.QUEUED, StatusUpdate.PROOF_BUILT,
+        StatusUpdate.BROADCAST, StatusUpdate.COMMITTED
+    ]
+    tx_hash = updates[2].txHash
+    assert updates[3].txHash == tx_hash
+    balance_after, _ = bridge_wallet.get_balance_aergo(
+        'aergo_erc20', 'aergo-local', 'eth-poa-local',
+        account_addr=aergo_receiver
+    )
+    assert balance_after == balance_before + 5*10**18 - 1000
+
+    # a repeated request follows the tx recently broadcast
+    updates = list(stub.RequestUnfreezeStream(account_ref))
+    assert [update.state for update in updates] == [
+        StatusUpdate.QUEUED, StatusUpdate.BROADCAST, StatusUpdate.COMMITTED
+    ]
+    assert updates[1].txHash == tx_hash
+
+
+def test_aergo_erc20_unfreeze_batch(bridge_wallet):
+    receivers = [
+        bridge_wallet.config_data('wallet', 'receiver', 'addr'),
+        bridge_wallet.config_data('wallet', 'default2', 'addr'),
+    ]
+    channel = grpc.insecure_channel('localhost:7891')
+    stub = UnfreezeServiceStub(channel)
+
+    balances_before = []
+    for receiver in receivers:
+        balance, _ = bridge_wallet.get_balance_aergo(
+            'aergo_erc20', 'aergo-local', 'eth-poa-local',
+            account_addr=receiver
+        )
+        balances_before.append(balance)
+        bridge_wallet.lock_to_aergo(
+            'eth-poa-local', 'aergo-local', 'aergo_erc20',
+            5*10**18, receiver, privkey_pwd='1234'
+        )
+    for receiver in receivers:
+        pending = 1
+        while pending != 0:
+            _, pending = bridge_wallet.unfreezable(
+                'eth-poa-local', 'aergo-local', receiver)
+
+    # statuses are returned in the order of the requested receivers
+    account_refs = AccountRefs(refs=[
+        AccountRef(receiver=receiver)
+        for receiver in receivers + ['invalid_receiver', receivers[0]]
+    ])
+    statuses = stub.RequestUnfreezeBatch(account_refs).statuses
+    assert len(statuses) == 4
+    assert not statuses[0].error and not statuses[1].error
+    assert statuses[0].txHash != statuses[1].txHash
+    assert statuses[2].error == "Receiver must be an Aergo address"
+    # a receiver requested twice is unfrozen once
+    assert statuses[3].txHash == statuses[0].txHash
+    # a repeated batch gets the txs recently broadcast
+    statuses_again = stub.RequestUnfreezeBatch(account_refs).statuses
+    assert [s.txHash for s in statuses_again] == \
+        [s.txHash for s in statuses]
+
+    hera = bridge_wallet.connect_aergo('aergo-local')
+    for receiver, status, balance_before in zip(
+            receivers, statuses, balances_before):
+        hera.wait_tx_result(status.txHash)
+        balance_after, _ = bridge_wallet.get_balance_aergo(
+            'aergo_erc20', 'aergo-local', 'eth-poa-local',
+            account_addr=receiver
+        )
+        assert balance_after == balance_before + 5*10**18 - 1000
@@ -0,0 +1,144 @@
+from collections import (
+    OrderedDict,
+)
+import logging
+import threading
+import time
+from typing import (
+    Dict,
+    List,
+    Tuple,
+)
+
+import aergo.herapy as herapy
+from web3 import (
+    Web3,
+)
+from web3.datastructures import (
+    AttributeDict,
+)
+
+from ethaergo_wallet.eth_to_aergo import (
+    build_deposits_proof,
+)
+
+logger = logging.getLogger(__name__)
+
+ProofKey = Tuple[str, int, bytes]
+
+
+class AnchoredProofCache():
+    """ LRU cache of verified lock proofs of the Ethereum bridge at the last
+    height anchored on the Aergo bridge, keyed by
+    (bridge, anchor_height, trie_key).
+
+    The anchor height is followed with the newAnchor events of the Aergo
+    bridge so that cached proofs are only invalidated when a new anchor
+    moves the height. If the event stream is interrupted, the anchor height
+    is queried for each proof until it reconnects.
+    """
+
+    def __init__(
+        self,
+        hera: herapy.Aergo,
+        web3: Web3,
+        bridge_aergo: str,
+        bridge_eth: str,
+        max_size: int = 10000,
+    ) -> None:
+        self.hera = hera
+        self.web3 = web3
+        self.bridge_aergo = bridge_aergo
+        self.bridge_eth = bridge_eth
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._proofs: OrderedDict = OrderedDict()
+        self._anchor_height = self.query_anchor_height()
+        self._stream = None
+        self._stream_alive = False
+        self._stopped = False
+        self._thread = threading.Thread(
+            target=self._follow_anchors, name="AnchorStream", daemon=True)
+        self._thread.start()
+
+    def query_anchor_height(self) -> int:
+        anchor_info = self.hera.query_sc_state(
+            self.bridge_aergo, ["_sv__anchorHeight"])
+        return int(anchor_info.var_proofs[0].value)
+
+    def _set_anchor_height(self, height: int) -> None:
+        with self._lock:
+            if height <= self._anchor_height:
+                return
+            self._anchor_height = height
+            # proofs of previous anchors cannot be used anymore
+            self._proofs.clear()
+
+    def _follow_anchors(self) -> None:
+        while not self._stopped:
+            try:
+                _, best_height = self.hera.get_blockchain_status()
+                self._stream = self.hera.receive_event_stream(
+                    self.bridge_aergo, "newAnchor",
+                    start_block_no=best_height
+                )
+                # catch up anchors made before the stream started
+                self._set_anchor_height(self.query_anchor_height())
+                self._stream_alive = True
+                for event in self._stream:
+                    self._set_anchor_height(event.arguments[1])
+            except Exception:
+                if not self._stopped:
+                    logger.warning("\"newAnchor event stream interrupted\"")
+            self._stream_alive = False
+            time.sleep(5)
+
+    def stop(self) -> None:
+        self._stopped = True
+        if self._stream is not None:
+            self._stream.stop()
+
+    def anchor_height(self) -> int:
+        if not self._stream_alive:
+            self._set_anchor_height(self.query_anchor_height())
+        return self._anchor_height
+
+    def lock_proof(self, trie_key: bytes) -> AttributeDict:
+        """ Verified proof of trie_key at the last anchor height """
+        return self.lock_proofs([trie_key])[trie_key]
+
+    def lock_proofs(
+        self,
+        trie_keys: List[bytes],
+    ) -> Dict[bytes, AttributeDict]:
+        """ Verified proofs of trie_keys at the last anchor height, proofs
+        missing from the cache are built with a single getProof.
+        """
+        height = self.anchor_height()
+        proofs = {}
+        missing = []
+        with self._lock:
+            for trie_key in trie_keys:
+                key: ProofKey = (self.bridge_eth, height, trie_key)
+                proof = self._proofs.get(key)
+                if proof is not None:
+                    self._proofs.move_to_end(key)
+                    self.hits += 1
+                    proofs[trie_key] = proof
+                elif trie_key not in missing:
+                    self.misses += 1
+                    missing.append(trie_key)
+        if not missing:
+            return proofs
+        built = build_deposits_proof(
+            self.web3, self.bridge_eth, height, missing)
+        proofs.update(built)
+        with self._lock:
+            if height == self._anchor_height:
+                for trie_key, proof in built.items():
+                    self._proofs[(self.bridge_eth, height, trie_key)] = proof
+                while len(self._proofs) > self.max_size:
+                    self._proofs.popitem(last=False)
+        return proofs
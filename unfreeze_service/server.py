@@ -7,13 +7,24 @@ import grpc
 import json
 import logging
 import os
+import queue
+import threading
 import time
 
 from typing import (
     Dict,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
 )
 
 import aergo.herapy as herapy
+from ethaergo_bridge_operator.config_watcher import (
+    FrozenDict,
+    get_config_watcher,
+)
 from ethaergo_wallet.wallet_utils import (
     is_aergo_address,
 )
@@ -26,9 +37,6 @@ from web3 import (
 from web3.middleware import (
     geth_poa_middleware,
 )
-from eth_utils import (
-    keccak,
-)
 
 from unfreeze_service.unfreeze_service_pb2_grpc import (
     UnfreezeServiceServicer,
@@ -36,13 +44,30 @@ from unfreeze_service.unfreeze_service_pb2_grpc import (
 )
 from unfreeze_service.unfreeze_service_pb2 import (
     Status,
+    Statuses,
+    StatusUpdate,
 )
 from ethaergo_wallet.eth_to_aergo import (
-    _build_deposit_proof,
-    withdrawable,
+    lock_trie_key,
+    query_bridge_state,
+    total_withdrawn,
+)
+from unfreeze_service.proof_cache import (
+    AnchoredProofCache,
+)
+from unfreeze_service.tx_submitter import (
+    NonceManagedSubmitter,
 )
 
 _ONE_DAY_IN_SECONDS = 60 * 60 * 24
+# seconds during which repeated requests of a receiver get the same tx hash
+_RECENT_UNFREEZE_TTL = 60
+# shorter de-duplication window of a service started with --local_test
+_LOCAL_TEST_RECENT_UNFREEZE_TTL = 10
+# seconds streams wait for an unfreeze tx to be committed
+_UNFREEZE_COMMIT_TIMEOUT = 120
+# receivers checked with one lock proof and one withdrawn amounts query
+_UNFREEZE_BATCH_SIZE = 100
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
@@ -77,27 +102,22 @@ class UnfreezeService(UnfreezeServiceServicer):
         eth_net: str,
         privkey_name: str,
         privkey_pwd: str = None,
-        root_path: str = './'
+        root_path: str = './',
+        recent_unfreeze_ttl: float = _RECENT_UNFREEZE_TTL,
     ) -> None:
         """
             UnfreezeService unfreezes native aergo for users that have
             initiated a transfer by locking aergo erc20 but don't already have
             aergo native to pay for the fee.
+            Repeated requests of a receiver during recent_unfreeze_ttl
+            seconds get the hash of the tx already broadcast.
         """
         self.config_file_path = config_file_path
         self.aergo_net = aergo_net
         self.eth_net = eth_net
-        config_data = self.load_config_data()
-        self.bridge_eth = \
-            config_data['networks'][eth_net]['bridges'][aergo_net]['addr']
-        self.bridge_aergo = \
-            config_data['networks'][aergo_net]['bridges'][eth_net]['addr']
-        aergo_erc20 = \
-            config_data['networks'][eth_net]['tokens']['aergo_erc20']['addr']
-        self.aergo_erc20_bytes = bytes.fromhex(aergo_erc20[2:])
-        logger.info("\"Ethereum bridge contract: %s\"", self.bridge_eth)
-        logger.info("\"Aergo bridge contract: %s\"", self.bridge_aergo)
-        logger.info("\"Aergo ERC20: %s\"", aergo_erc20)
+        self.config = get_config_watcher(config_file_path)
+        config_data = self.config.snapshot()
+        self.load_contracts(config_data)
 
         # connect aergo provider
         self.hera = herapy.Aergo()
@@ -124,7 +144,41 @@ class UnfreezeService(UnfreezeServiceServicer):
         self.address = str(self.hera.account.address)
         logger.info("\"Unfreezer Address: %s\"", self.address)
 
-        # query unfreeze fee
+        # lock proofs are reused until a new anchor is made
+        self.proof_cache = AnchoredProofCache(
+            self.hera, self.web3, self.bridge_aergo, self.bridge_eth)
+        # unfreeze txs are signed with local nonces by a single writer
+        self.submitter = NonceManagedSubmitter(
+            self.hera, self.bridge_aergo, gas_limit=300000, gas_price=0)
+        # concurrent requests of a receiver share one result and repeated
+        # requests get the hash of the tx recently broadcast
+        self._requests_lock = threading.Lock()
+        self._inflight: Dict[str, futures.Future] = {}
+        self._recent: Dict[str, Tuple[str, float]] = {}
+        self.recent_unfreeze_ttl = recent_unfreeze_ttl
+        # in-flight unfreezes run apart from the client streams so that a
+        # client going away doesn't fail the requests waiting for it
+        self._unfreeze_pool = futures.ThreadPoolExecutor(max_workers=10)
+
+        self.query_unfreeze_fee()
+        # reload contracts and fee when the bridge config changes
+        self.config.subscribe(self.on_config_change)
+        self.config.start()
+
+    def load_contracts(self, config_data: FrozenDict) -> None:
+        self.bridge_eth = (config_data['networks'][self.eth_net]['bridges']
+                           [self.aergo_net]['addr'])
+        self.bridge_aergo = (config_data['networks'][self.aergo_net]
+                             ['bridges'][self.eth_net]['addr'])
+        aergo_erc20 = (config_data['networks'][self.eth_net]['tokens']
+                       ['aergo_erc20']['addr'])
+        self.aergo_erc20 = aergo_erc20
+        self.aergo_erc20_bytes = bytes.fromhex(aergo_erc20[2:])
+        logger.info("\"Ethereum bridge contract: %s\"", self.bridge_eth)
+        logger.info("\"Aergo bridge contract: %s\"", self.bridge_aergo)
+        logger.info("\"Aergo ERC20: %s\"", aergo_erc20)
+
+    def query_unfreeze_fee(self) -> None:
         unfreeze_fee_q = self.hera.query_sc_state(
             self.bridge_aergo, ["_sv__unfreezeFee"])
         self.unfreeze_fee = int(
@@ -132,73 +186,303 @@ class UnfreezeService(UnfreezeServiceServicer):
         logger.info(
             "\"Unfreeze fee for broadcaster: %saer\"", self.unfreeze_fee)
 
+    def on_config_change(
+        self,
+        config_data: FrozenDict,
+        changed_keys: Set[str],
+    ) -> None:
+        watched = (
+            'networks.{}.bridges.{}'.format(self.eth_net, self.aergo_net),
+            'networks.{}.bridges.{}'.format(self.aergo_net, self.eth_net),
+            'networks.{}.tokens.aergo_erc20'.format(self.eth_net),
+        )
+        if not any(key.startswith(watched) for key in changed_keys):
+            return
+        self.load_contracts(config_data)
+        if (self.proof_cache.bridge_aergo != self.bridge_aergo
+                or self.proof_cache.bridge_eth != self.bridge_eth):
+            self.proof_cache.stop()
+            self.proof_cache = AnchoredProofCache(
+                self.hera, self.web3, self.bridge_aergo, self.bridge_eth)
+        self.submitter.contract = self.bridge_aergo
+        self.query_unfreeze_fee()
+
     def RequestUnfreeze(self, account_ref, context):
         """
             Create and broadcast unfreeze transactions if conditions are met:
             - the receiver is a valid aergo address
             - the unfreezable amount covers the unfreeze fee
+            Requests of a receiver already being unfrozen wait for the same
+            result, and requests of a receiver unfrozen less than
+            recent_unfreeze_ttl seconds ago return the broadcast tx hash.
         """
-        if not is_aergo_address(account_ref.receiver):
-            logger.warning(
-                "\"Invalid receiver address %s\"", account_ref.receiver)
-            return Status(error="Receiver must be an Aergo address")
+        for update in self.unfreeze_updates(account_ref):
+            pass
+        return Status(txHash=update.txHash, error=update.error)
 
-        # format account references for Locks and Unfreezes
-        account_ref_eth = \
-            account_ref.receiver.encode('utf-8') + self.aergo_erc20_bytes
-        position = b'\x05'  # Locks
-        eth_trie_key = keccak(account_ref_eth + position.rjust(32, b'\0'))
-        aergo_storage_key = \
-            ('_sv__unfreezes-' + account_ref.receiver).encode('utf-8') \
-            + self.aergo_erc20_bytes
-        # check unfreezeable is larger that the fee
-        unfreezeable, _ = withdrawable(
-            self.bridge_eth, self.bridge_aergo, self.web3, self.hera,
-            eth_trie_key, aergo_storage_key
-        )
-        if unfreezeable <= self.unfreeze_fee:
-            logger.warning(
-                "\"Unfreezable (%s aer) doesn't cover fee for: %s\"",
-                unfreezeable, account_ref.receiver
+    def RequestUnfreezeStream(self, account_ref, context):
+        """
+            Same as RequestUnfreeze but streams the status of the request
+            until the unfreeze tx is committed or fails. Txs are watched by
+            the tx submitter for all clients.
+        """
+        for update in self.unfreeze_updates(account_ref):
+            yield update
+        if update.state != StatusUpdate.BROADCAST:
+            return
+        try:
+            self.submitter.watch(update.txHash).result(
+                timeout=_UNFREEZE_COMMIT_TIMEOUT)
+        except futures.TimeoutError:
+            yield StatusUpdate(
+                state=StatusUpdate.FAILED, txHash=update.txHash,
+                error="Unfreeze tx not committed after {}s".format(
+                    _UNFREEZE_COMMIT_TIMEOUT)
             )
-            return Status(
-                error="Aergo native to unfreeze doesnt cover the fee")
-
-        # build lock proof and arguments for unfreeze
-        lock_proof = _build_deposit_proof(
-            self.web3, self.hera, self.bridge_eth, self.bridge_aergo,
-            0, eth_trie_key
-        )
-        ap = format_proof_for_lua(lock_proof.storageProof[0].proof)
-        balance = int.from_bytes(lock_proof.storageProof[0].value, "big")
-        ubig_balance = {'_bignum': str(balance)}
-
-        # call unfreeze tx
-        gas_limit = 300000
-        gas_price = 0
-        tx, result = self.hera.call_sc(
-            self.bridge_aergo, "unfreeze",
-            args=[account_ref.receiver, ubig_balance, ap],
-            gas_limit=gas_limit, gas_price=gas_price
-        )
-        if result.status != herapy.CommitStatus.TX_OK:
-            logger.warning("\"Error: tx failed: %s\"", result.json())
-            return Status(
-                error="Unfreeze service error: tx failed")
+            return
+        except Exception as e:
+            yield StatusUpdate(
+                state=StatusUpdate.FAILED, txHash=update.txHash,
+                error="Unfreeze tx failed: {}".format(e)
+            )
+            return
+        yield StatusUpdate(state=StatusUpdate.COMMITTED, txHash=update.txHash)
 
-        # all went well
-        logger.info("\"Unfreeze success for: %s\"", account_ref.receiver)
+    def RequestUnfreezeBatch(self, account_refs, context):
+        """
+            RequestUnfreeze for several receivers: withdrawable amounts are
+            checked with batched queries, lock proofs are built with one
+            getProof, and unfreeze txs are submitted together. Statuses are
+            returned in the order of the requested receivers.
+        """
+        receivers = [ref.receiver for ref in account_refs.refs]
+        updates: Dict[str, StatusUpdate] = {}
+        waiting: Dict[str, futures.Future] = {}
+        owned: Dict[str, futures.Future] = {}
+        with self._requests_lock:
+            now = time.time()
+            self._recent = {
+                r: sent for r, sent in self._recent.items()
+                if now - sent[1] < self.recent_unfreeze_ttl
+            }
+            for receiver in receivers:
+                if receiver in updates or receiver in waiting \
+                        or receiver in owned:
+                    continue
+                if not is_aergo_address(receiver):
+                    logger.warning(
+                        "\"Invalid receiver address %s\"", receiver)
+                    updates[receiver] = StatusUpdate(
+                        state=StatusUpdate.FAILED,
+                        error="Receiver must be an Aergo address"
+                    )
+                elif receiver in self._recent:
+                    updates[receiver] = StatusUpdate(
+                        state=StatusUpdate.BROADCAST,
+                        txHash=self._recent[receiver][0]
+                    )
+                elif receiver in self._inflight:
+                    waiting[receiver] = self._inflight[receiver]
+                else:
+                    owned[receiver] = futures.Future()
+                    self._inflight[receiver] = owned[receiver]
+
+        results: Dict[str, StatusUpdate] = {}
+        submitted: Dict[str, futures.Future] = {}
+        try:
+            to_unfreeze = list(owned)
+            for i in range(0, len(to_unfreeze), _UNFREEZE_BATCH_SIZE):
+                chunk = to_unfreeze[i:i + _UNFREEZE_BATCH_SIZE]
+                for receiver, (args, error) in \
+                        self.unfreeze_args_batch(chunk).items():
+                    if error is not None:
+                        results[receiver] = StatusUpdate(
+                            state=StatusUpdate.FAILED, error=error)
+                    else:
+                        # txs are queued together and committed in batches
+                        submitted[receiver] = self.submitter.submit(
+                            "unfreeze", args)
+        except Exception as e:
+            logger.warning("\"Batch unfreeze failed: %s\"", e)
+        finally:
+            # txs queued before a failure are still broadcast: report them
+            # and record them as recent so they are not unfrozen twice
+            for receiver, submit_future in submitted.items():
+                results[receiver] = self._broadcast_status(
+                    receiver, submit_future)
+            for receiver, future in owned.items():
+                status = results.get(receiver, StatusUpdate(
+                    state=StatusUpdate.FAILED,
+                    error="Unfreeze service error"
+                ))
+                self._release(receiver, future, status)
+                updates[receiver] = status
+        for receiver, future in waiting.items():
+            updates[receiver] = future.result()
+
+        return Statuses(statuses=[
+            Status(txHash=updates[r].txHash, error=updates[r].error)
+            for r in receivers
+        ])
+
+    def unfreeze_updates(self, account_ref) -> Iterator[StatusUpdate]:
+        """ Yield the status of an unfreeze request until the unfreeze tx is
+        broadcast or the request fails.
+        """
+        receiver = account_ref.receiver
+        yield StatusUpdate(state=StatusUpdate.QUEUED)
+        if not is_aergo_address(receiver):
+            logger.warning("\"Invalid receiver address %s\"", receiver)
+            yield StatusUpdate(
+                state=StatusUpdate.FAILED,
+                error="Receiver must be an Aergo address"
+            )
+            return
+
+        recent_tx = None
+        with self._requests_lock:
+            now = time.time()
+            self._recent = {
+                r: sent for r, sent in self._recent.items()
+                if now - sent[1] < self.recent_unfreeze_ttl
+            }
+            inflight = self._inflight.get(receiver)
+            if receiver in self._recent:
+                recent_tx = self._recent[receiver][0]
+            elif inflight is None:
+                future: futures.Future = futures.Future()
+                self._inflight[receiver] = future
+        if recent_tx is not None:
+            logger.info("\"Unfreeze already broadcast for: %s\"", receiver)
+            yield StatusUpdate(
+                state=StatusUpdate.BROADCAST, txHash=recent_tx)
+            return
+        if inflight is not None:
+            yield inflight.result()
+            return
+
+        updates: queue.Queue = queue.Queue()
+        self._unfreeze_pool.submit(self._unfreeze, receiver, future, updates)
+        while True:
+            update = updates.get()
+            yield update
+            if update.state != StatusUpdate.PROOF_BUILT:
+                return
+
+    def _unfreeze(
+        self,
+        receiver: str,
+        future: futures.Future,
+        updates: queue.Queue,
+    ) -> None:
+        """ Check and broadcast the unfreeze of an in-flight receiver, put
+        the status updates in updates for the requesting stream and release
+        the requests waiting for it.
+        """
+        status = StatusUpdate(
+            state=StatusUpdate.FAILED, error="Unfreeze service error")
+        try:
+            args, error = self.unfreeze_args(receiver)
+            if error is not None:
+                status = StatusUpdate(state=StatusUpdate.FAILED, error=error)
+            else:
+                updates.put(StatusUpdate(state=StatusUpdate.PROOF_BUILT))
+                status = self.broadcast_unfreeze(receiver, args)
+        except Exception as e:
+            logger.warning("\"Unfreeze failed for %s: %s\"", receiver, e)
+        finally:
+            self._release(receiver, future, status)
+            updates.put(status)
+
+    def _release(
+        self,
+        receiver: str,
+        future: futures.Future,
+        status: StatusUpdate,
+    ) -> None:
+        """ Record the result of an in-flight request of receiver and pass
+        it to the requests waiting for it.
+        """
+        with self._requests_lock:
+            if status.state == StatusUpdate.BROADCAST:
+                self._recent[receiver] = (status.txHash, time.time())
+            del self._inflight[receiver]
+        future.set_result(status)
+
+    def unfreeze_args(self, receiver: str) -> Tuple[List, Optional[str]]:
+        """ Check the unfreezable amount of receiver covers the fee and
+        return the arguments of the unfreeze call or an error message.
+        """
+        return self.unfreeze_args_batch([receiver])[receiver]
 
-        # Test unfreeze fee used
-        # result = self.hera.wait_tx_result(tx.tx_hash)
-        # logger.info("\"\u26fd Unfreeze tx fee paid: %s\"", result.fee_used)
+    def unfreeze_args_batch(
+        self,
+        receivers: List[str],
+    ) -> Dict[str, Tuple[List, Optional[str]]]:
+        """ unfreeze_args of several receivers with one lock proof query and
+        one withdrawn amounts query.
+        """
+        # format account references for Locks and Unfreezes
+        eth_trie_keys = [lock_trie_key(receiver, self.aergo_erc20)
+                         for receiver in receivers]
+        aergo_storage_keys = [
+            ('_sv__unfreezes-' + receiver).encode('utf-8')
+            + self.aergo_erc20_bytes
+            for receiver in receivers
+        ]
+        # anchored deposits and their proofs are served from cache until the
+        # next anchor, the withdrawn amounts change with each unfreeze
+        lock_proofs = self.proof_cache.lock_proofs(eth_trie_keys)
+        withdraw_proofs = query_bridge_state(
+            self.hera, self.bridge_aergo, aergo_storage_keys)
+        ret = {}
+        for receiver, eth_trie_key, withdraw_proof in zip(
+                receivers, eth_trie_keys, withdraw_proofs.var_proofs):
+            storage_proof = lock_proofs[eth_trie_key].storageProof[0]
+            anchored_deposit = int.from_bytes(storage_proof.value, "big")
+            # check unfreezeable is larger that the fee
+            unfreezeable = anchored_deposit - total_withdrawn(withdraw_proof)
+            if unfreezeable <= self.unfreeze_fee:
+                logger.warning(
+                    "\"Unfreezable (%s aer) doesn't cover fee for: %s\"",
+                    unfreezeable, receiver
+                )
+                ret[receiver] = (
+                    [], "Aergo native to unfreeze doesnt cover the fee")
+                continue
+
+            # arguments for unfreeze
+            ap = format_proof_for_lua(storage_proof.proof)
+            ubig_balance = {'_bignum': str(anchored_deposit)}
+            ret[receiver] = ([receiver, ubig_balance, ap], None)
+        return ret
+
+    def broadcast_unfreeze(self, receiver: str, args: List) -> StatusUpdate:
+        """ Queue the unfreeze tx and return once it is in the mempool, it
+        is mined in the background.
+        """
+        return self._broadcast_status(
+            receiver, self.submitter.submit("unfreeze", args))
 
-        return Status(txHash=str(tx.tx_hash))
+    def _broadcast_status(
+        self,
+        receiver: str,
+        submit_future: futures.Future,
+    ) -> StatusUpdate:
+        """ Wait for a queued unfreeze tx to be in the mempool and return
+        its status.
+        """
+        try:
+            tx_hash = submit_future.result()
+        except Exception:
+            return StatusUpdate(
+                state=StatusUpdate.FAILED,
+                error="Unfreeze service error: tx failed"
+            )
 
-    def load_config_data(self) -> Dict:
-        with open(self.config_file_path, "r") as f:
-            config_data = json.load(f)
-        return config_data
+        # all went well
+        logger.info("\"Unfreeze success for: %s\"", receiver)
+        return StatusUpdate(state=StatusUpdate.BROADCAST, txHash=tx_hash)
 
 
 class UnfreezeServer:
@@ -210,13 +494,14 @@ class UnfreezeServer:
         eth_net: str,
         privkey_name: str,
         privkey_pwd: str = None,
-        root_path: str = './'
+        root_path: str = './',
+        recent_unfreeze_ttl: float = _RECENT_UNFREEZE_TTL,
     ) -> None:
         self.server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
         add_UnfreezeServiceServicer_to_server(
             UnfreezeService(
                 ip_port, config_file_path, aergo_net, eth_net, privkey_name,
-                privkey_pwd, root_path
+                privkey_pwd, root_path, recent_unfreeze_ttl
             ),
             self.server
         )
@@ -256,21 +541,33 @@ if __name__ == '__main__':
     parser.add_argument(
         '--privkey_name', type=str, help='Name of account in config file '
         'to sign anchors', required=True)
+    parser.add_argument(
+        '--recent_unfreeze_ttl', type=float,
+        help='Seconds during which repeated requests of a receiver get the '
+        'tx already broadcast (default {}, {} with --local_test)'
+        .format(_RECENT_UNFREEZE_TTL, _LOCAL_TEST_RECENT_UNFREEZE_TTL))
     parser.add_argument(
         '--local_test', dest='local_test', action='store_true',
         help='Start service for running tests')
     parser.set_defaults(local_test=False)
     args = parser.parse_args()
 
+    recent_unfreeze_ttl = args.recent_unfreeze_ttl
     if args.local_test:
+        if recent_unfreeze_ttl is None:
+            recent_unfreeze_ttl = _LOCAL_TEST_RECENT_UNFREEZE_TTL
         validator = UnfreezeServer(
             args.ip_port, args.config_file_path, args.aergo, args.eth,
-            privkey_name=args.privkey_name, privkey_pwd='1234'
+            privkey_name=args.privkey_name, privkey_pwd='1234',
+            recent_unfreeze_ttl=recent_unfreeze_ttl
         )
         validator.run()
     else:
+        if recent_unfreeze_ttl is None:
+            recent_unfreeze_ttl = _RECENT_UNFREEZE_TTL
         validator = UnfreezeServer(
             args.ip_port, args.config_file_path, args.aergo, args.eth,
             privkey_name=args.privkey_name,
+            recent_unfreeze_ttl=recent_unfreeze_ttl
         )
         validator.run()
@@ -0,0 +1,264 @@
+from concurrent.futures import (
+    Future,
+)
+import logging
+import queue
+import threading
+import time
+from typing import (
+    Any,
+    Dict,
+    List,
+    NamedTuple,
+)
+
+import aergo.herapy as herapy
+
+logger = logging.getLogger(__name__)
+
+# commit statuses of txs made with a nonce already used by the account
+_NONCE_STATUSES = (
+    herapy.CommitStatus.TX_NONCE_TOO_LOW,
+    herapy.CommitStatus.TX_HAS_SAME_NONCE,
+)
+
+
+class TxSubmitError(Exception):
+    pass
+
+
+class _Request(NamedTuple):
+    func_name: str
+    args: List[Any]
+    future: Future
+    attempts: int
+
+
+class _PendingTx(NamedTuple):
+    tx: Any
+    sent: float
+
+
+class NonceManagedSubmitter():
+    """ Submits contract calls of one herapy account without waiting for
+    them to be mined.
+
+    A single writer thread assigns nonces locally, signs and commits the
+    requested calls in batches, and resolves each request with its tx hash
+    as soon as the tx is accepted by the mempool. A receipt tracker thread
+    follows the submitted txs: txs that are not mined after resubmit_after
+    seconds are broadcast again with the same nonce and hash, and txs
+    rejected at commit leaving a nonce gap behind accepted txs have their
+    nonce filled with an empty transfer so that the following txs can be
+    mined. Clients waiting for a tx to be mined are notified by the tracker
+    instead of polling the chain themselves.
+    """
+
+    def __init__(
+        self,
+        hera: herapy.Aergo,
+        contract: str,
+        gas_limit: int,
+        gas_price: int,
+        batch_size: int = 100,
+        resubmit_after: float = 30,
+        max_attempts: int = 3,
+    ) -> None:
+        self.hera = hera
+        self.contract = contract
+        self.gas_limit = gas_limit
+        self.gas_price = gas_price
+        self.batch_size = batch_size
+        self.resubmit_after = resubmit_after
+        self.max_attempts = max_attempts
+        self.address = str(hera.account.address)
+        self._requests: queue.Queue = queue.Queue()
+        self._pending: Dict[str, _PendingTx] = {}
+        self._pending_lock = threading.Lock()
+        self._watchers: Dict[str, List[Future]] = {}
+        self._nonce = self.query_nonce()
+        self._stopped = False
+        self._writer = threading.Thread(
+            target=self._write, name="TxWriter", daemon=True)
+        self._tracker = threading.Thread(
+            target=self._track_receipts, name="TxTracker", daemon=True)
+        self._writer.start()
+        self._tracker.start()
+
+    def query_nonce(self) -> int:
+        """ Nonce of the last tx of the account mined on chain """
+        return self.hera.get_account(address=self.address).nonce
+
+    def submit(self, func_name: str, args: List[Any]) -> Future:
+        """ Queue a call of the contract, the returned future resolves with
+        the tx hash once the tx is accepted in the mempool.
+        """
+        future: Future = Future()
+        self._requests.put(_Request(func_name, args, future, 0))
+        return future
+
+    def watch(self, tx_hash: str) -> Future:
+        """ Return a future resolving with the result of tx_hash when it
+        is mined, or with TxSubmitError if the tx fails or is replaced.
+        """
+        future: Future = Future()
+        with self._pending_lock:
+            if tx_hash in self._pending:
+                self._watchers.setdefault(tx_hash, []).append(future)
+                return future
+        # the tx was already mined
+        self._resolve([future], tx_hash)
+        return future
+
+    def pending_count(self) -> int:
+        with self._pending_lock:
+            return len(self._pending)
+
+    def stop(self) -> None:
+        self._stopped = True
+
+    def _write(self) -> None:
+        while not self._stopped:
+            try:
+                requests = [self._requests.get(timeout=1)]
+            except queue.Empty:
+                continue
+            while len(requests) < self.batch_size:
+                try:
+                    requests.append(self._requests.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._commit(requests)
+            except Exception as e:
+                logger.warning("\"Failed to commit unfreeze txs: %s\"", e)
+                for request in requests:
+                    if not request.future.done():
+                        request.future.set_exception(e)
+                self._resync_nonce()
+
+    def _commit(self, requests: List[_Request]) -> None:
+        txs = []
+        for request in requests:
+            self._nonce += 1
+            txs.append(self.hera.new_call_sc_tx(
+                self.contract, request.func_name, args=request.args,
+                nonce=self._nonce, gas_limit=self.gas_limit,
+                gas_price=self.gas_price
+            ))
+        _, results = self.hera.batch_call_sc(txs)
+
+        retries = []
+        rejected = []
+        last_accepted = None
+        now = time.time()
+        for request, tx, result in zip(requests, txs, results):
+            if result.status == herapy.CommitStatus.TX_OK:
+                tx_hash = str(tx.tx_hash)
+                with self._pending_lock:
+                    self._pending[tx_hash] = _PendingTx(tx, now)
+                last_accepted = tx.nonce
+                request.future.set_result(tx_hash)
+            elif (result.status in _NONCE_STATUSES
+                    and request.attempts + 1 < self.max_attempts):
+                # the account was used by another client: retry with a
+                # new nonce
+                retries.append(request._replace(attempts=request.attempts + 1))
+                rejected.append(tx.nonce)
+            else:
+                logger.warning("\"Error: tx failed: %s\"", result.json())
+                request.future.set_exception(
+                    TxSubmitError(result.detail or str(result.status)))
+                rejected.append(tx.nonce)
+
+        if rejected:
+            chain_nonce = self._resync_nonce()
+            if last_accepted is not None:
+                self._nonce = max(self._nonce, last_accepted)
+            for nonce in rejected:
+                if chain_nonce < nonce < self._nonce:
+                    self._fill_gap(nonce)
+        if retries:
+            self._commit(retries)
+
+    def _resync_nonce(self) -> int:
+        """ Rewind the local nonce to the last nonce mined or pending in the
+        mempool, return the nonce mined on chain.
+        """
+        chain_nonce = self.query_nonce()
+        with self._pending_lock:
+            pending = [p.tx.nonce for p in self._pending.values()]
+        self._nonce = max([chain_nonce] + pending)
+        return chain_nonce
+
+    def _fill_gap(self, nonce: int) -> None:
+        """ Use a nonce rejected at commit with an empty transfer to self so
+        that the txs accepted with the following nonces can be mined.
+        """
+        tx = self.hera.generate_tx(
+            to_address=self.hera.account.address.value, nonce=nonce,
+            amount=0, gas_limit=self.gas_limit, gas_price=self.gas_price
+        )
+        _, result = self.hera.send_tx(tx)
+        if result.status != herapy.CommitStatus.TX_OK:
+            logger.warning("\"Failed to fill nonce gap %s: %s\"",
+                           nonce, result.json())
+            return
+        logger.info("\"Filled nonce gap %s\"", nonce)
+        with self._pending_lock:
+            self._pending[str(tx.tx_hash)] = _PendingTx(tx, time.time())
+
+    def _track_receipts(self) -> None:
+        while not self._stopped:
+            time.sleep(1)
+            with self._pending_lock:
+                pending = list(self._pending.items())
+            if not pending:
+                continue
+            try:
+                chain_nonce = self.query_nonce()
+                for tx_hash, p in pending:
+                    if p.tx.nonce <= chain_nonce:
+                        self._check_receipt(tx_hash)
+                    elif time.time() - p.sent > self.resubmit_after:
+                        self._resubmit(tx_hash, p)
+            except Exception as e:
+                logger.warning("\"Failed to track unfreeze txs: %s\"", e)
+
+    def _check_receipt(self, tx_hash: str) -> None:
+        with self._pending_lock:
+            self._pending.pop(tx_hash, None)
+            watchers = self._watchers.pop(tx_hash, [])
+        self._resolve(watchers, tx_hash)
+
+    def _resolve(self, watchers: List[Future], tx_hash: str) -> None:
+        try:
+            result = self.hera.get_tx_result(tx_hash)
+        except herapy.errors.exception.CommunicationException:
+            # another tx with the same nonce was mined
+            logger.warning("\"Tx replaced: %s\"", tx_hash)
+            error = TxSubmitError("tx replaced by another tx")
+            for future in watchers:
+                future.set_exception(error)
+            return
+        if result.status != herapy.TxResultStatus.SUCCESS:
+            logger.warning("\"Error: tx failed: %s\"", result.detail)
+            error = TxSubmitError(result.detail)
+            for future in watchers:
+                future.set_exception(error)
+            return
+        for future in watchers:
+            future.set_result(result)
+
+    def _resubmit(self, tx_hash: str, p: _PendingTx) -> None:
+        # the same signed tx is broadcast so its hash doesn't change
+        _, result = self.hera.send_tx(p.tx)
+        if result.status in (herapy.CommitStatus.TX_OK,
+                             herapy.CommitStatus.TX_ALREADY_EXISTS):
+            logger.info("\"Resubmitted tx %s\"", tx_hash)
+        else:
+            logger.warning("\"Failed to resubmit tx %s: %s\"",
+                           tx_hash, result.json())
+        with self._pending_lock:
+            if tx_hash in self._pending:
+                self._pending[tx_hash] = _PendingTx(p.tx, time.time())
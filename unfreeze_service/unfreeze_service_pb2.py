@@ -20,11 +20,45 @@ DESCRIPTOR = _descriptor.FileDescriptor(
   package='',
   syntax='proto3',
   serialized_options=None,
-  serialized_pb=_b('\n\'unfreeze_service/unfreeze_service.proto\"\x1e\n\nAccountRef\x12\x10\n\x08receiver\x18\x01 \x01(\t\"\'\n\x06Status\x12\x0e\n\x06txHash\x18\x01 \x01(\t\x12\r\n\x05\x65rror\x18\x02 \x01(\t2<\n\x0fUnfreezeService\x12)\n\x0fRequestUnfreeze\x12\x0b.AccountRef\x1a\x07.Status\"\x00\x62\x06proto3')
+  serialized_pb=_b('\n\'unfreeze_service/unfreeze_service.proto\"\x1e\n\nAccountRef\x12\x10\n\x08receiver\x18\x01 \x01(\t\"(\n\x0b\x41\x63\x63ountRefs\x12\x19\n\x04refs\x18\x01 \x03(\x0b\x32\x0b.AccountRef\"\'\n\x06Status\x12\x0e\n\x06txHash\x18\x01 \x01(\t\x12\r\n\x05\x65rror\x18\x02 \x01(\t\"%\n\x08Statuses\x12\x19\n\x08statuses\x18\x01 \x03(\x0b\x32\x07.Status\"\xa1\x01\n\x0cStatusUpdate\x12\"\n\x05state\x18\x01 \x01(\x0e\x32\x13.StatusUpdate.State\x12\x0e\n\x06txHash\x18\x02 \x01(\t\x12\r\n\x05\x65rror\x18\x03 \x01(\t\"N\n\x05State\x12\n\n\x06QUEUED\x10\x00\x12\x0f\n\x0bPROOF_BUILT\x10\x01\x12\r\n\tBROADCAST\x10\x02\x12\r\n\tCOMMITTED\x10\x03\x12\n\n\x06\x46\x41ILED\x10\x04\x32\xa8\x01\n\x0fUnfreezeService\x12)\n\x0fRequestUnfreeze\x12\x0b.AccountRef\x1a\x07.Status\"\x00\x12\x37\n\x15RequestUnfreezeStream\x12\x0b.AccountRef\x1a\r.StatusUpdate\"\x00\x30\x01\x12\x31\n\x14RequestUnfreezeBatch\x12\x0c.AccountRefs\x1a\t.Statuses\"\x00\x62\x06proto3')
 )
 
 
 
+_STATUSUPDATE_STATE = _descriptor.EnumDescriptor(
+  name='State',
+  full_name='StatusUpdate.State',
+  filename=None,
+  file=DESCRIPTOR,
+  values=[
+    _descriptor.EnumValueDescriptor(
+      name='QUEUED', index=0, number=0,
+      serialized_options=None,
+      type=None),
+    _descriptor.EnumValueDescriptor(
+      name='PROOF_BUILT', index=1, number=1,
+      serialized_options=None,
+      type=None),
+    _descriptor.EnumValueDescriptor(
+      name='BROADCAST', index=2, number=2,
+      serialized_options=None,
+      type=None),
+    _descriptor.EnumValueDescriptor(
+      name='COMMITTED', index=3, number=3,
+      serialized_options=None,
+      type=None),
+    _descriptor.EnumValueDescriptor(
+      name='FAILED', index=4, number=4,
+      serialized_options=None,
+      type=None),
+  ],
+  containing_type=None,
+  serialized_options=None,
+  serialized_start=281,
+  serialized_end=359,
+)
+_sym_db.RegisterEnumDescriptor(_STATUSUPDATE_STATE)
+
 
 _ACCOUNTREF = _descriptor.Descriptor(
   name='AccountRef',
@@ -57,6 +91,37 @@ _ACCOUNTREF = _descriptor.Descriptor(
 )
 
 
+_ACCOUNTREFS = _descriptor.Descriptor(
+  name='AccountRefs',
+  full_name='AccountRefs',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='refs', full_name='AccountRefs.refs', index=0,
+      number=1, type=11, cpp_type=10, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=75,
+  serialized_end=115,
+)
+
+
 _STATUS = _descriptor.Descriptor(
   name='Status',
   full_name='Status',
@@ -90,12 +155,96 @@ _STATUS = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=75,
-  serialized_end=114,
+  serialized_start=117,
+  serialized_end=156,
 )
 
+
+_STATUSES = _descriptor.Descriptor(
+  name='Statuses',
+  full_name='Statuses',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='statuses', full_name='Statuses.statuses', index=0,
+      number=1, type=11, cpp_type=10, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=158,
+  serialized_end=195,
+)
+
+
+_STATUSUPDATE = _descriptor.Descriptor(
+  name='StatusUpdate',
+  full_name='StatusUpdate',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='state', full_name='StatusUpdate.state', index=0,
+      number=1, type=14, cpp_type=8, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='txHash', full_name='StatusUpdate.txHash', index=1,
+      number=2, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=_b("").decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='error', full_name='StatusUpdate.error', index=2,
+      number=3, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=_b("").decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+    _STATUSUPDATE_STATE,
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=198,
+  serialized_end=359,
+)
+
+_ACCOUNTREFS.fields_by_name['refs'].message_type = _ACCOUNTREF
+_STATUSES.fields_by_name['statuses'].message_type = _STATUS
+_STATUSUPDATE.fields_by_name['state'].enum_type = _STATUSUPDATE_STATE
+_STATUSUPDATE_STATE.containing_type = _STATUSUPDATE
 DESCRIPTOR.message_types_by_name['AccountRef'] = _ACCOUNTREF
+DESCRIPTOR.message_types_by_name['AccountRefs'] = _ACCOUNTREFS
 DESCRIPTOR.message_types_by_name['Status'] = _STATUS
+DESCRIPTOR.message_types_by_name['Statuses'] = _STATUSES
+DESCRIPTOR.message_types_by_name['StatusUpdate'] = _STATUSUPDATE
 _sym_db.RegisterFileDescriptor(DESCRIPTOR)
 
 AccountRef = _reflection.GeneratedProtocolMessageType('AccountRef', (_message.Message,), {
@@ -105,6 +254,13 @@ AccountRef = _reflection.GeneratedProtocolMessageType('AccountRef', (_message.Me
   })
 _sym_db.RegisterMessage(AccountRef)
 
+AccountRefs = _reflection.GeneratedProtocolMessageType('AccountRefs', (_message.Message,), {
+  'DESCRIPTOR' : _ACCOUNTREFS,
+  '__module__' : 'unfreeze_service.unfreeze_service_pb2'
+  # @@protoc_insertion_point(class_scope:AccountRefs)
+  })
+_sym_db.RegisterMessage(AccountRefs)
+
 Status = _reflection.GeneratedProtocolMessageType('Status', (_message.Message,), {
   'DESCRIPTOR' : _STATUS,
   '__module__' : 'unfreeze_service.unfreeze_service_pb2'
@@ -112,6 +268,20 @@ Status = _reflection.GeneratedProtocolMessageType('Status', (_message.Message,),
   })
 _sym_db.RegisterMessage(Status)
 
+Statuses = _reflection.GeneratedProtocolMessageType('Statuses', (_message.Message,), {
+  'DESCRIPTOR' : _STATUSES,
+  '__module__' : 'unfreeze_service.unfreeze_service_pb2'
+  # @@protoc_insertion_point(class_scope:Statuses)
+  })
+_sym_db.RegisterMessage(Statuses)
+
+StatusUpdate = _reflection.GeneratedProtocolMessageType('StatusUpdate', (_message.Message,), {
+  'DESCRIPTOR' : _STATUSUPDATE,
+  '__module__' : 'unfreeze_service.unfreeze_service_pb2'
+  # @@protoc_insertion_point(class_scope:StatusUpdate)
+  })
+_sym_db.RegisterMessage(StatusUpdate)
+
 
 
 _UNFREEZESERVICE = _descriptor.ServiceDescriptor(
@@ -120,8 +290,8 @@ _UNFREEZESERVICE = _descriptor.ServiceDescriptor(
   file=DESCRIPTOR,
   index=0,
   serialized_options=None,
-  serialized_start=116,
-  serialized_end=176,
+  serialized_start=362,
+  serialized_end=530,
   methods=[
   _descriptor.MethodDescriptor(
     name='RequestUnfreeze',
@@ -132,6 +302,24 @@ _UNFREEZESERVICE = _descriptor.ServiceDescriptor(
     output_type=_STATUS,
     serialized_options=None,
   ),
+  _descriptor.MethodDescriptor(
+    name='RequestUnfreezeStream',
+    full_name='UnfreezeService.RequestUnfreezeStream',
+    index=1,
+    containing_service=None,
+    input_type=_ACCOUNTREF,
+    output_type=_STATUSUPDATE,
+    serialized_options=None,
+  ),
+  _descriptor.MethodDescriptor(
+    name='RequestUnfreezeBatch',
+    full_name='UnfreezeService.RequestUnfreezeBatch',
+    index=2,
+    containing_service=None,
+    input_type=_ACCOUNTREFS,
+    output_type=_STATUSES,
+    serialized_options=None,
+  ),
 ])
 _sym_db.RegisterServiceDescriptor(_UNFREEZESERVICE)
 
@@ -19,6 +19,16 @@ class UnfreezeServiceStub(object):
         request_serializer=unfreeze__service_dot_unfreeze__service__pb2.AccountRef.SerializeToString,
         response_deserializer=unfreeze__service_dot_unfreeze__service__pb2.Status.FromString,
         )
+    self.RequestUnfreezeStream = channel.unary_stream(
+        '/UnfreezeService/RequestUnfreezeStream',
+        request_serializer=unfreeze__service_dot_unfreeze__service__pb2.AccountRef.SerializeToString,
+        response_deserializer=unfreeze__service_dot_unfreeze__service__pb2.StatusUpdate.FromString,
+        )
+    self.RequestUnfreezeBatch = channel.unary_unary(
+        '/UnfreezeService/RequestUnfreezeBatch',
+        request_serializer=unfreeze__service_dot_unfreeze__service__pb2.AccountRefs.SerializeToString,
+        response_deserializer=unfreeze__service_dot_unfreeze__service__pb2.Statuses.FromString,
+        )
 
 
 class UnfreezeServiceServicer(object):
@@ -32,6 +42,21 @@ class UnfreezeServiceServicer(object):
     context.set_details('Method not implemented!')
     raise NotImplementedError('Method not implemented!')
 
+  def RequestUnfreezeStream(self, request, context):
+    """Request unfreezing and receive status updates until the unfreeze tx
+    is committed or fails
+    """
+    context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+    context.set_details('Method not implemented!')
+    raise NotImplementedError('Method not implemented!')
+
+  def RequestUnfreezeBatch(self, request, context):
+    """Request unfreezing for several receivers
+    """
+    context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+    context.set_details('Method not implemented!')
+    raise NotImplementedError('Method not implemented!')
+
 
 def add_UnfreezeServiceServicer_to_server(servicer, server):
   rpc_method_handlers = {
@@ -40,6 +65,16 @@ def add_UnfreezeServiceServicer_to_server(servicer, server):
           request_deserializer=unfreeze__service_dot_unfreeze__service__pb2.AccountRef.FromString,
           response_serializer=unfreeze__service_dot_unfreeze__service__pb2.Status.SerializeToString,
       ),
+      'RequestUnfreezeStream': grpc.unary_stream_rpc_method_handler(
+          servicer.RequestUnfreezeStream,
+          request_deserializer=unfreeze__service_dot_unfreeze__service__pb2.AccountRef.FromString,
+          response_serializer=unfreeze__service_dot_unfreeze__service__pb2.StatusUpdate.SerializeToString,
+      ),
+      'RequestUnfreezeBatch': grpc.unary_unary_rpc_method_handler(
+          servicer.RequestUnfreezeBatch,
+          request_deserializer=unfreeze__service_dot_unfreeze__service__pb2.AccountRefs.FromString,
+          response_serializer=unfreeze__service_dot_unfreeze__service__pb2.Statuses.SerializeToString,
+      ),
   }
   generic_handler = grpc.method_handlers_generic_handler(
       'UnfreezeService', rpc_method_handlers)
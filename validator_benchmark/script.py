@@ -0,0 +1,217 @@
+import argparse
+from concurrent import (
+    futures,
+)
+import json
+import logging
+import multiprocessing
+import os
+import resource
+import threading
+import time
+
+import aergo.herapy as herapy
+from eth_account import (
+    Account,
+)
+import grpc
+
+from ethaergo_bridge_operator.bridge_operator_pb2 import (
+    Anchor,
+)
+from ethaergo_bridge_operator.bridge_operator_pb2_grpc import (
+    BridgeOperatorStub,
+    add_BridgeOperatorServicer_to_server,
+)
+from ethaergo_bridge_operator.op_utils import (
+    bridge_id,
+)
+from ethaergo_bridge_operator.validator.aergo_signer import (
+    AergoSigner,
+)
+from ethaergo_bridge_operator.validator.eth_signer import (
+    EthSigner,
+)
+from ethaergo_bridge_operator.validator.multi_service import (
+    MultiBridgeValidatorService,
+)
+from ethaergo_bridge_operator.validator.validator_service import (
+    ValidatorService,
+)
+
+
+class FixedLatencyDataSources():
+    """ Replaces the provider queries of a validator by a fixed latency so
+    that the benchmark measures the validator server itself.
+    """
+
+    def __init__(self, latency: float) -> None:
+        self.latency = latency
+
+    def is_valid_aergo_anchor(self, anchor):
+        time.sleep(self.latency)
+        return None
+
+    def is_valid_eth_anchor(self, anchor):
+        time.sleep(self.latency)
+        return None
+
+
+class BenchValidatorService(ValidatorService):
+    """ ValidatorService signing anchors of a bridge without blockchain
+    connections.
+    """
+
+    def __init__(self, aergo_net, eth_net, signers, latency):
+        self.anchoring_on = True
+        self.auto_update = False
+        self.oracle_update = False
+        self.validator_index = 0
+        self.aergo_net = aergo_net
+        self.eth_net = eth_net
+        self.aergo_oracle_id = aergo_net
+        self.eth_oracle_id = bytes.fromhex('00' * 32)
+        self.eth_signer, self.aergo_signer = signers
+        self.data_sources = FixedLatencyDataSources(latency)
+
+
+def new_signers():
+    eth_keystore = json.dumps(Account.encrypt(os.urandom(32), '1234'))
+    hera = herapy.Aergo()
+    hera.new_account(skip_state=True)
+    aergo_keystore = hera.export_account_to_keystore('1234', kdf_n=2**10)
+    return (EthSigner(eth_keystore, 'validator', '1234'),
+            AergoSigner(aergo_keystore, 'validator', '1234'))
+
+
+def bridges(count):
+    return [('aergo-{}'.format(i), 'eth-{}'.format(i)) for i in range(count)]
+
+
+def serve(pairs, port, latency, max_workers, ready, stop, results):
+    """ Run a validator server of pairs until stop is set, then report the
+    process cpu time and memory.
+    """
+    signers = new_signers()
+    services = {
+        bridge_id(aergo_net, eth_net): BenchValidatorService(
+            aergo_net, eth_net, signers, latency)
+        for aergo_net, eth_net in pairs
+    }
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=max_workers))
+    add_BridgeOperatorServicer_to_server(
+        MultiBridgeValidatorService(services), server)
+    server.add_insecure_port('localhost:{}'.format(port))
+    server.start()
+    start = resource.getrusage(resource.RUSAGE_SELF)
+    ready.release()
+    stop.wait()
+    end = resource.getrusage(resource.RUSAGE_SELF)
+    server.stop(0)
+    results.put({
+        'cpu': (end.ru_utime - start.ru_utime)
+        + (end.ru_stime - start.ru_stime),
+        'maxrss_kb': end.ru_maxrss,
+    })
+
+
+def load(targets, duration, concurrency):
+    """ Request signatures of anchors of all targets (port, bridge) for
+    duration seconds with concurrency requests in flight, return the number
+    of approvals.
+    """
+    stubs = {}
+    for port, _ in targets:
+        if port not in stubs:
+            channel = grpc.insecure_channel('localhost:{}'.format(port))
+            stubs[port] = BridgeOperatorStub(channel)
+    anchor = Anchor(root=os.urandom(32), height=1, destination_nonce=0)
+    deadline = time.time() + duration
+    counts = [0] * concurrency
+
+    def worker(i):
+        j = i
+        while time.time() < deadline:
+            port, bridge = targets[j % len(targets)]
+            j += 1
+            approval = stubs[port].GetAergoAnchorSignature(
+                anchor, metadata=(('bridge', bridge),))
+            if approval.error == '':
+                counts[i] += 1
+
+    threads = [threading.Thread(target=worker, args=(i,))
+               for i in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return sum(counts)
+
+
+def run_mode(mode, count, port, latency, duration, concurrency,
+             max_workers):
+    pairs = bridges(count)
+    if mode == 'multi':
+        groups = [(port, pairs)]
+    else:
+        groups = [(port + i, [pair]) for i, pair in enumerate(pairs)]
+    ready = multiprocessing.Semaphore(0)
+    stop = multiprocessing.Event()
+    results = multiprocessing.Queue()
+    procs = [
+        multiprocessing.Process(
+            target=serve,
+            args=(group, group_port, latency, max_workers, ready, stop,
+                  results)
+        ) for group_port, group in groups
+    ]
+    for p in procs:
+        p.start()
+    for _ in procs:
+        ready.acquire()
+    targets = [(group_port, bridge_id(*pair))
+               for group_port, group in groups for pair in group]
+    approvals = load(targets, duration, concurrency)
+    stop.set()
+    reports = [results.get() for _ in procs]
+    for p in procs:
+        p.join()
+    cpu = sum(r['cpu'] for r in reports)
+    return {
+        'mode': mode,
+        'processes': len(procs),
+        'approvals/s': round(approvals / duration, 1),
+        'server cpu s': round(cpu, 2),
+        'approvals per cpu s': round(approvals / cpu, 1) if cpu else None,
+        'server maxrss MB': round(
+            sum(r['maxrss_kb'] for r in reports) / 1024, 1),
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Compare one multi bridge validator server with one '
+        'validator process per bridge.')
+    parser.add_argument('-n', '--bridges', type=int, default=4,
+                        help='Number of bridge pairs (default 4)')
+    parser.add_argument('-d', '--duration', type=float, default=10,
+                        help='Seconds of load per mode (default 10)')
+    parser.add_argument('--concurrency', type=int, default=16,
+                        help='Requests in flight (default 16)')
+    parser.add_argument('--latency', type=float, default=0.005,
+                        help='Simulated provider latency in seconds '
+                        '(default 0.005)')
+    parser.add_argument('--max_workers', type=int, default=10,
+                        help='Server threads per process (default 10)')
+    parser.add_argument('--port', type=int, default=50300,
+                        help='First port used by validator servers')
+    args = parser.parse_args()
+    # don't log every signature
+    logging.getLogger('ethaergo_bridge_operator.validator').setLevel(
+        logging.WARNING)
+
+    for mode in ['multi', 'separate']:
+        print(run_mode(
+            mode, args.bridges, args.port, args.latency, args.duration,
+            args.concurrency, args.max_workers
+        ))